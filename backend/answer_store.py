@@ -0,0 +1,262 @@
+"""
+Precomputed LLM answers for the canonical HR FAQ questions.
+An offline build step asks the chat pipeline to answer every hr_faq.csv
+question in each indexed language and stores the answers in a JSON file, with
+a hash of the FAQ row they were generated from and the version of the FAQ
+index. chat() serves a stored answer when a message is one of the canonical
+questions (after case, whitespace and punctuation normalization). A rebuild
+only regenerates the rows whose content changed.
+
+Usage:
+    python answer_store.py build [--force] [--language vi]
+    python answer_store.py status
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+import threading
+from dataclasses import dataclass
+
+from chain_setup import BACKEND_DIR, FAQ_INDEX_LANGUAGES, load_hr_faq_documents
+from fallback_engine import normalize_text
+
+DEFAULT_ANSWER_STORE_PATH = os.path.join(BACKEND_DIR, "embeddings", "precomputed_answers.json")
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def get_answer_store_settings():
+    """Get precomputed answer settings from environment variables"""
+    return {
+        "enabled": os.getenv("ANSWER_STORE_ENABLED", "true").lower() in ("1", "true", "yes"),
+        "path": os.getenv("ANSWER_STORE_PATH") or DEFAULT_ANSWER_STORE_PATH,
+    }
+
+
+def normalize_question(text: str) -> str:
+    """Normalize a question for canonical matching (case, punctuation and whitespace)"""
+    return _SPACE_RE.sub(" ", _PUNCTUATION_RE.sub(" ", normalize_text(text))).strip()
+
+
+@dataclass(frozen=True)
+class CanonicalQuestion:
+    """An FAQ question in one language, as indexed"""
+    faq_id: int
+    language: str
+    question: str       # Question in the language
+    faq_question: str   # English question, identifying the FAQ row
+    content_hash: str   # Hash of the indexed question and answer
+
+    @property
+    def key(self) -> str:
+        return f"{self.language}:{self.faq_question}"
+
+
+def load_canonical_questions(languages=FAQ_INDEX_LANGUAGES) -> list[CanonicalQuestion]:
+    """Canonical questions of the FAQ CSV in every language, hashed like the index content"""
+    questions = []
+    for language in languages:
+        for doc in load_hr_faq_documents(language):
+            metadata = doc.metadata
+            questions.append(CanonicalQuestion(
+                faq_id=metadata["faq_id"],
+                language=language,
+                question=metadata["question"],
+                faq_question=metadata["faq_question"],
+                content_hash=hashlib.sha256(doc.page_content.encode("utf-8")).hexdigest(),
+            ))
+    return questions
+
+
+def faq_index_version(questions: list[CanonicalQuestion]) -> str:
+    """Version of the FAQ corpus: changes whenever any indexed row changes"""
+    digest = hashlib.sha256()
+    for question in sorted(questions, key=lambda q: q.key):
+        digest.update(f"{question.key}\0{question.content_hash}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class AnswerStore:
+    """JSON-backed store of generated answers, keyed by language and FAQ question"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = {}
+        self.questions = []
+        self.index_version = ""
+        self._by_text = {}
+        self._lock = threading.Lock()
+
+    def load(self, questions: list[CanonicalQuestion] | None = None):
+        """
+        Load stored answers and the current FAQ questions.
+
+        Args:
+            questions: Current canonical questions (read from the FAQ CSV if None)
+        """
+        self.questions = load_canonical_questions() if questions is None else questions
+        self.index_version = faq_index_version(self.questions)
+        by_text = {}
+        for question in self.questions:
+            texts = by_text.setdefault(question.language, {})
+            # The English wording also resolves in other languages (the answer stays in the request language)
+            texts.setdefault(normalize_question(question.faq_question), question)
+            texts[normalize_question(question.question)] = question
+        self._by_text = by_text
+
+        entries = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    entries = json.load(f).get("entries", {})
+            except (OSError, ValueError) as e:
+                print(f"[WARNING] Could not read precomputed answers from {self.path}: {e}")
+        with self._lock:
+            self.entries = entries
+        print(f"[ANSWERS] Loaded {len(entries)} precomputed answers "
+              f"({len(self.stale())} of {len(self.questions)} questions to generate)")
+
+    def save(self):
+        """Write the store atomically"""
+        with self._lock:
+            data = {"index_version": self.index_version, "entries": self.entries}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.path)
+
+    def resolve(self, message: str, language: str = "en") -> CanonicalQuestion | None:
+        """Canonical question a message is, if any"""
+        return self._by_text.get(language, {}).get(normalize_question(message))
+
+    def lookup(self, message: str, language: str = "en") -> dict | None:
+        """
+        Get the stored answer for a message.
+
+        Returns:
+            Entry dict with answer and source_documents, or None if the message is not a
+            canonical question or its answer is missing or outdated
+        """
+        question = self.resolve(message, language)
+        if question is None:
+            return None
+        entry = self.entries.get(question.key)
+        if entry is None or entry.get("content_hash") != question.content_hash:
+            return None
+        return entry
+
+    def stale(self, languages=None) -> list[CanonicalQuestion]:
+        """Questions without an answer generated from their current content"""
+        return [
+            question for question in self.questions
+            if (languages is None or question.language in languages)
+            and self.entries.get(question.key, {}).get("content_hash") != question.content_hash
+        ]
+
+    async def build(self, generate, force: bool = False, languages=None) -> dict:
+        """
+        Generate answers for new and changed FAQ rows and drop the removed ones.
+
+        Args:
+            generate: Async callable taking a CanonicalQuestion and returning a dict with
+                answer, source_documents and model, or None if no answer could be generated
+            force: Regenerate every answer, changed or not
+            languages: Languages to build (all indexed languages if None)
+
+        Returns:
+            Summary with generated, unchanged, failed and removed counts and the index version
+        """
+        scope = [question for question in self.questions if languages is None or question.language in languages]
+        targets = scope if force else self.stale(languages)
+        started = time.perf_counter()
+        generated = failed = 0
+        for question in targets:
+            try:
+                result = await generate(question)
+            except Exception as e:
+                print(f"[WARNING] Could not generate an answer for '{question.question}': {e}")
+                result = None
+            if result is None:
+                failed += 1
+                continue
+            with self._lock:
+                self.entries[question.key] = {
+                    "faq_id": question.faq_id,
+                    "language": question.language,
+                    "question": question.question,
+                    "answer": result["answer"],
+                    "source_documents": result.get("source_documents", []),
+                    "model": result.get("model", ""),
+                    "content_hash": question.content_hash,
+                    "index_version": self.index_version,
+                    "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                }
+            generated += 1
+
+        current_keys = {question.key for question in self.questions}
+        with self._lock:
+            removed = [key for key in self.entries if key not in current_keys]
+            for key in removed:
+                del self.entries[key]
+        self.save()
+
+        elapsed = time.perf_counter() - started
+        summary = {
+            "generated": generated,
+            "unchanged": len(scope) - len(targets),
+            "failed": failed,
+            "removed": len(removed),
+            "index_version": self.index_version,
+        }
+        print(f"[ANSWERS] Generated {generated} answers in {elapsed:.1f} s "
+              f"({summary['unchanged']} unchanged, {failed} failed, {len(removed)} removed)")
+        return summary
+
+    def stats(self) -> dict:
+        """Store status for the admin endpoint"""
+        return {
+            "path": self.path,
+            "index_version": self.index_version,
+            "questions": len(self.questions),
+            "stored": len(self.entries),
+            "stale": len(self.stale()),
+        }
+
+
+ANSWER_STORE = AnswerStore(get_answer_store_settings()["path"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the precomputed FAQ answers")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Generate answers for new and changed FAQ rows")
+    build_parser.add_argument("--force", action="store_true", help="Regenerate every answer")
+    build_parser.add_argument("--language", action="append", choices=FAQ_INDEX_LANGUAGES,
+                              help="Language to build (repeatable, default all)")
+    subparsers.add_parser("status", help="Show how many answers are stored and outdated")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        ANSWER_STORE.load()
+        print(json.dumps(ANSWER_STORE.stats(), indent=2))
+    elif args.command == "build":
+        # Answers come from the same pipeline as /api/chat
+        import app
+
+        async def build():
+            await app.init_system()
+            return await app.rebuild_answer_store(force=args.force, languages=args.language)
+
+        summary = asyncio.run(build())
+        print(f"[OK] {json.dumps(summary)}")
+
+
+if __name__ == "__main__":
+    main()
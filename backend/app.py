@@ -6,20 +6,80 @@ Provides REST API endpoints for chat and initialization.
 import os
 import json
 import base64
+import time
+import asyncio
+import functools
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from dotenv import load_dotenv
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 
 # Load environment variables
 load_dotenv()
 
 # Import RAG components
-from chain_setup import initialize_rag_system, create_or_load_faiss_index, setup_rag_chain
+from chain_setup import (
+    initialize_rag_system, create_or_load_faiss_index, setup_rag_chain, batch_similarity_search,
+    get_retrieval_settings, has_meaningful_scores
+)
 
 # Import CV extractor
-from cv_extractor import extract_cv_content, parse_cv_for_skills
+from cv_extractor import (
+    extract_cv_content, parse_cv_for_skills, decode_base64_upload, UploadTooLargeError
+)
+from cv_features import extract_cv_features
+from cv_scoring import score_cv
+
+# Import latency budget and metrics
+from request_budget import RequestBudget, get_budget_settings
+from metrics import METRICS
+
+# Import hedged LLM caller and outbound quota scheduler
+from llm_hedging import LLM_CALLER, call_llm_batch
+from rate_limiter import get_scheduler, get_token_usage
+from token_utils import count_message_tokens
+
+# Import micro-batching
+from micro_batcher import MicroBatcher, dispatch_grouped, get_micro_batching_settings
+
+# Import intent router
+from intent_router import INTENT_ROUTER, INTENT_POSITION_LIST, INTENT_CV_EVAL, INTENT_TOOL_QUERY
+
+# Import deterministic tool fast path
+from tool_fast_path import TOOL_QUERY_PARSER, run_tool_query
+
+# Import tool-calling loop
+from function_tools import AVAILABLE_TOOLS
+from tool_executor import ToolExecutor
+
+# Import keyword fallback engine
+from fallback_engine import FALLBACK_ENGINE
+
+# Import context packer
+from context_packer import pack_context
+
+# Import employee directory (leave rollups)
+from employee_directory import get_directory
+
+# Import autocomplete index
+from suggestions import build_suggestion_index, load_faq_questions
+
+# Import FAQ question translations
+from faq_translations import FAQ_TRANSLATIONS, translate_faq_question
+
+# Import precomputed FAQ answers
+from answer_store import ANSWER_STORE, get_answer_store_settings
+
+# Import the evaluated candidate store
+from candidate_store import CANDIDATE_STORE, get_candidate_store_settings
+
+# Import policy handbook ingestion
+from handbook_ingestion import get_handbook_settings, ingest_handbooks
+from chain_setup import HANDBOOK_INDEX_PATH
+from ingestion import read_manifest
+from company_data import JOB_POSITIONS
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -39,7 +99,8 @@ app.add_middleware(
 
 # Global variables for RAG system
 rag_system = None
-vector_store = None
+vector_store = None   # English FAQ index
+vector_stores = {}    # Language -> FAQ index
 llm = None
 retriever = None
 
@@ -50,6 +111,7 @@ class ChatRequest(BaseModel):
     message: str
     session_id: str = "default"
     language: str = "en"  # 'en' for English, 'vi' for Vietnamese
+    deadline_ms: int | None = None  # Overrides CHAT_DEADLINE_MS for this request
 
 
 class ChatResponse(BaseModel):
@@ -57,6 +119,18 @@ class ChatResponse(BaseModel):
     answer: str
     source_documents: list[dict] = []
     function_calls: list[str] = []
+    token_usage: dict | None = None  # Context/prompt tokens sent to the LLM (and total if reported)
+
+
+class BatchChatRequest(BaseModel):
+    """Request model for batch chat endpoint"""
+    requests: list[ChatRequest]
+    max_concurrency: int | None = None  # Caps concurrent LLM calls (CHAT_BATCH_MAX_CONCURRENCY)
+
+
+class BatchChatResponse(BaseModel):
+    """Response model for batch chat endpoint"""
+    results: list[ChatResponse]
 
 
 class InitResponse(BaseModel):
@@ -68,12 +142,32 @@ class InitResponse(BaseModel):
 @app.on_event("startup")
 async def startup_event():
     """Initialize RAG system on app startup"""
-    global vector_store, llm, retriever
+    global vector_store, vector_stores, llm, retriever
+    
+    # Build the autocomplete index in the background (it reads the whole employee directory)
+    asyncio.get_running_loop().run_in_executor(None, refresh_suggestion_index)
+    
+    if ANSWER_STORE_SETTINGS["enabled"]:
+        try:
+            ANSWER_STORE.load()
+        except Exception as e:
+            print(f"[WARNING] Could not load precomputed answers: {e}")
+    
+    if CANDIDATE_STORE_SETTINGS["enabled"]:
+        try:
+            CANDIDATE_STORE.load()
+            # Scores of positions changed in company_data.py are recomputed in the background
+            if CANDIDATE_STORE.pending:
+                asyncio.get_running_loop().run_in_executor(None, rescore_candidates)
+        except Exception as e:
+            print(f"[WARNING] Could not load the candidate store: {e}")
     
     try:
         print("[STARTUP] Starting up HR Assistant API...")
         print("[STARTUP] Initializing RAG system...")
-        vector_store, (llm, retriever) = initialize_rag_system()
+        vector_stores, (llm, retriever) = initialize_rag_system()
+        vector_store = vector_stores["en"]
+        refresh_source_documents()
         print("[OK] RAG system initialized successfully!")
     except Exception as e:
         print(f"[WARNING] Could not initialize RAG system: {e}")
@@ -81,6 +175,7 @@ async def startup_event():
         print("[WARNING] Please ensure Azure OpenAI credentials are properly configured")
         # Don't re-raise the exception - let the app start anyway
         vector_store = None
+        vector_stores = {}
         llm = None
         retriever = None
 
@@ -101,11 +196,13 @@ async def init_system() -> InitResponse:
     Initialize or reinitialize the RAG system.
     Recreates FAISS index and retrieval chain.
     """
-    global vector_store, llm, retriever
+    global vector_store, vector_stores, llm, retriever
     
     try:
         print("Reinitializing RAG system...")
-        vector_store, (llm, retriever) = initialize_rag_system()
+        vector_stores, (llm, retriever) = initialize_rag_system()
+        vector_store = vector_stores["en"]
+        refresh_source_documents()
         
         return InitResponse(
             status="success",
@@ -118,429 +215,400 @@ async def init_system() -> InitResponse:
         raise HTTPException(status_code=500, detail=error_msg)
 
 
-# FAQ translations dictionary
-FAQ_TRANSLATIONS = {
-    "How do I apply for annual leave?": "Làm cách nào để tôi xin nghỉ phép hằng năm?",
-    "What is the company's remote work policy?": "Chính sách làm việc từ xa của công ty là gì?",
-    "How can I update my payroll bank account?": "Làm cách nào để cập nhật tài khoản ngân hàng lương?",
-    "What are the working hours?": "Giờ làm việc là gì?",
-    "How do I request a sick leave?": "Làm cách nào để xin nghỉ ốm?",
-    "What is the company's health insurance coverage?": "Phạm vi bảo hiểm y tế của công ty là gì?",
-    "When is the next company holiday?": "Kỳ nghỉ công ty tiếp theo là khi nào?",
-    "How do I access my pay stubs?": "Làm cách nào để truy cập bảng lương của tôi?",
-    "What is the professional development budget?": "Ngân sách phát triển chuyên nghiệp là gì?",
-    "How do I request a transfer to another department?": "Làm cách nào để yêu cầu chuyển đến một phòng ban khác?",
-    "What is the overtime policy?": "Chính sách tăng ca là gì?",
-    "How do I enroll in the company retirement plan?": "Làm cách nào để tôi đăng ký kế hoạch hưu trí của công ty?",
-    "What is the maternity and paternity leave policy?": "Chính sách nghỉ thai sản và nghỉ sinh con là gì?",
-    "How do I report a workplace concern or complaint?": "Làm cách nào để báo cáo mối lo ngại hoặc khiếu nại tại nơi làm việc?",
-    "What benefits are available to remote employees?": "Các lợi ích nào có sẵn cho nhân viên làm việc từ xa?",
-}
-
-
-def translate_faq_question(question: str, language: str = "en") -> str:
-    """Translate FAQ question to target language"""
-    if language == "vi":
-        return FAQ_TRANSLATIONS.get(question, question)
-    return question
+# Autocomplete index, built at startup
+suggestion_index = None
+
+
+def refresh_suggestion_index():
+    """(Re)build the autocomplete index from the FAQ, job positions and employee directory"""
+    global suggestion_index
+    try:
+        suggestion_index = build_suggestion_index(
+            load_faq_questions("data/hr_faq.csv"), FAQ_TRANSLATIONS, JOB_POSITIONS, get_directory()
+        )
+    except Exception as e:
+        print(f"[WARNING] Could not build the autocomplete index: {e}")
+
+
+# Formatted source_documents of every indexed chunk, per language: doc_id -> language -> dict
+source_documents_cache = {}
+
+
+def format_source_document(doc, language: str = "en") -> dict:
+    """Format one retrieved chunk as a source_documents entry"""
+    metadata = doc.metadata
+    question = metadata.get("question", "")
+    if "faq_question" in metadata:
+        # Titles come from the English question, whatever the language of the index
+        question = translate_faq_question(metadata["faq_question"], language)
+    elif language == "vi":
+        question = translate_faq_question(question, language)
+    return {
+        "content": doc.page_content[:200] + "..." if len(doc.page_content) > 200 else doc.page_content,
+        "source": metadata.get("source", "Unknown"),
+        "question": question
+    }
+
+
+def refresh_source_documents():
+    """Precompute the source_documents entries of all indexed chunks in every language"""
+    global source_documents_cache
+    cache = {}
+    for store in vector_stores.values():
+        for doc in store.docstore._dict.values():
+            doc_id = doc.metadata.get("doc_id")
+            if doc_id is not None:
+                cache[doc_id] = {language: format_source_document(doc, language) for language in ("en", "vi")}
+    source_documents_cache = cache
+    print(f"[OK] Precomputed source documents for {len(cache)} chunks")
+
+
+def format_source_documents(docs: list, language: str = "en") -> list[dict]:
+    """Format retrieved documents as source_documents for the chat response"""
+    formatted_sources = []
+    for doc in docs[:3]:
+        formatted = source_documents_cache.get(doc.metadata.get("doc_id"), {}).get(language)
+        formatted_sources.append(formatted if formatted is not None else format_source_document(doc, language))
+    return formatted_sources
 
 
 def get_fallback_response(message: str, language: str = "en") -> str:
     """
     Generate fallback response based on keywords and language
     """
-    question_lower = message.lower()
+    return FALLBACK_ENGINE.respond(message, language)
+
+
+def batch_timeout(deadlines: list) -> float | None:
+    """Seconds left until the latest deadline of a batch (None if one of its requests has no deadline)"""
+    if any(deadline is None for deadline in deadlines):
+        return None
+    return max(0.0, max(deadlines) - time.monotonic())
+
+
+async def _call_llm_batch(model, payloads: list) -> list:
+    """Send a batch of (messages, deadline) prompts to one model"""
+    return await call_llm_batch(
+        model, [messages for messages, _ in payloads], timeout=batch_timeout([deadline for _, deadline in payloads])
+    )
+
+
+async def _dispatch_llm_batch(items: list) -> list:
+    """Send micro-batched (llm, (messages, deadline)) prompts to the LLM"""
+    return await dispatch_grouped(items, _call_llm_batch)
+
+
+async def _search_query_batch(store, payloads: list) -> list:
+    """Embed a batch of (query, deadline) queries in one request and search the index for all of them"""
+    return await asyncio.to_thread(
+        batch_similarity_search, store, [query for query, _ in payloads], 3,
+        batch_timeout([deadline for _, deadline in payloads])
+    )
+
+
+async def _dispatch_query_batch(items: list) -> list:
+    """Run micro-batched (vector_store, (query, deadline)) retrievals"""
+    return await dispatch_grouped(items, _search_query_batch)
+
+
+MICRO_BATCHING = get_micro_batching_settings()
+LLM_BATCHER = MicroBatcher(
+    "llm", _dispatch_llm_batch, MICRO_BATCHING["max_wait_ms"], MICRO_BATCHING["max_batch_size"]
+)
+QUERY_BATCHER = MicroBatcher(
+    "query_embeddings", _dispatch_query_batch, MICRO_BATCHING["max_wait_ms"], MICRO_BATCHING["max_batch_size"]
+)
+
+
+RETRIEVAL = get_retrieval_settings()
+
+
+def select_relevant_documents(scored_docs: list) -> list:
+    """
+    Keep the retrieved documents whose relevance reaches RETRIEVAL_SCORE_THRESHOLD.
     
-    # Define responses in both languages
-    responses = {
-        "en": {
-            "leave": "You can apply for annual leave via the company HR portal. Submit your request at least 2 weeks in advance. Your manager must approve before submission to payroll. For sick leave, report to your manager as soon as possible.",
-            "benefits": "All employees are covered under the company health insurance plan. Coverage includes medical, dental, and vision. Dependents can be added during open enrollment. Remote employees receive the same benefits as office employees.",
-            "salary": "Pay stubs are available in the HRIS portal under Payroll > Pay Stubs. You can download PDF copies for your records. To update your payroll bank account, submit your request via HRIS > Payroll section.",
-            "remote": "Employees may work remotely up to 2 days per week. Remote days must be approved by your manager and cannot be consecutive without special approval. Remote employees receive the same benefits as office employees.",
-            "retirement": "Retirement plan enrollment happens during onboarding. The company matches 50% of employee contributions up to 6% of salary. Contact HR for more details.",
-            "maternity": "Eligible employees receive 12 weeks of paid maternity leave and 4 weeks of paid paternity leave. Contact HR for specific eligibility requirements.",
-            "holiday": "Company holidays include New Year, Independence Day, Thanksgiving, and Christmas. See the HR portal for the complete holiday calendar.",
-            "training": "Each employee receives $2,000 annually for training and professional development. Submit requests via the Learning Portal for approval.",
-            "transfer": "Contact HR to discuss transfer opportunities. You must complete at least 1 year in your current role before requesting a transfer.",
-            "overtime": "Overtime is compensated at 1.5x your regular rate. All overtime must be pre-approved by your manager and documented in the HR system.",
-            "complaint": "Use the anonymous HR Hotline or submit a formal complaint via the HR portal. All complaints are handled confidentially and investigated promptly.",
-            "hours": "Standard working hours are 9 AM to 5 PM, Monday to Friday. Flexible arrangements are available upon manager approval.",
-            "default": "Hello! I'm the HR Assistant here to help answer your questions about company policies, benefits, leave, payroll, and more. I have access to our HR FAQ database with information about annual leave, remote work policy, health insurance, retirement plans, professional development, and many other HR topics. What would you like to know?"
-        },
-        "vi": {
-            "leave": "Bạn có thể nộp đơn xin nghỉ phép thường niên thông qua cổng HR của công ty. Gửi yêu cầu của bạn ít nhất 2 tuần trước. Quản lý của bạn phải phê duyệt trước khi gửi đến bộ phận lương. Đối với nghỉ ốm, hãy báo cáo với quản lý càng sớm càng tốt.",
-            "benefits": "Tất cả nhân viên đều được bảo hiểm y tế của công ty. Bảo hiểm bao gồm y tế, nha khoa và mắt. Người phụ thuộc có thể được thêm vào trong thời gian đăng ký mở. Nhân viên làm việc từ xa nhận cùng phúc lợi như nhân viên tại văn phòng.",
-            "salary": "Bảng lương có sẵn trong cổng HRIS tại Payroll > Pay Stubs. Bạn có thể tải xuống bản PDF để lưu trữ. Để cập nhật tài khoản ngân hàng lương, gửi yêu cầu qua phần HRIS > Payroll.",
-            "remote": "Nhân viên có thể làm việc từ xa tối đa 2 ngày mỗi tuần. Các ngày làm việc từ xa phải được quản lý phê duyệt và không được liên tiếp trừ khi có phê duyệt đặc biệt. Nhân viên làm việc từ xa nhận cùng phúc lợi như nhân viên tại văn phòng.",
-            "retirement": "Đăng ký kế hoạch hưu trí diễn ra trong quá trình nhập môn. Công ty đóng góp 50% số tiền nhân viên đóng góp lên đến 6% lương. Liên hệ HR để biết thêm chi tiết.",
-            "maternity": "Nhân viên đủ điều kiện nhận 12 tuần nghỉ thai sản có lương và 4 tuần nghỉ sinh con có lương. Liên hệ HR để biết yêu cầu điều kiện cụ thể.",
-            "holiday": "Các ngày lễ của công ty bao gồm Tết Dương lịch, Ngày Độc lập, Lễ Tạ ơn và Giáng sinh. Xem cổng HR để biết lịch nghỉ lễ đầy đủ.",
-            "training": "Mỗi nhân viên nhận $2,000 hàng năm cho đào tạo và phát triển chuyên môn. Gửi yêu cầu qua Cổng Học tập để được phê duyệt.",
-            "transfer": "Liên hệ HR để thảo luận về cơ hội chuyển bộ phận. Bạn phải hoàn thành ít nhất 1 năm ở vị trí hiện tại trước khi yêu cầu chuyển.",
-            "overtime": "Làm thêm giờ được trả 1.5 lần mức lương thường. Tất cả làm thêm giờ phải được quản lý phê duyệt trước và ghi lại trong hệ thống HR.",
-            "complaint": "Sử dụng đường dây HR ẩn danh hoặc gửi khiếu nại chính thức qua cổng HR. Tất cả khiếu nại được xử lý bảo mật và điều tra kịp thời.",
-            "hours": "Giờ làm việc tiêu chuẩn là 9 AM đến 5 PM, Thứ Hai đến Thứ Sáu. Có thể sắp xếp linh hoạt với sự phê duyệt của quản lý.",
-            "default": "Xin chào! Tôi là Trợ lý HR ở đây để giúp trả lời các câu hỏi của bạn về chính sách công ty, phúc lợi, nghỉ phép, lương bổng và nhiều hơn nữa. Tôi có quyền truy cập vào cơ sở dữ liệu FAQ HR với thông tin về nghỉ phép thường niên, chính sách làm việc từ xa, bảo hiểm y tế, kế hoạch hưu trí, phát triển chuyên môn và nhiều chủ đề HR khác. Bạn muốn biết điều gì?"
-        }
-    }
+    Args:
+        scored_docs: (Document, relevance) tuples from batch_similarity_search()
+    
+    Returns:
+        Relevant documents, most relevant first (empty if none is relevant)
+    """
+    threshold = RETRIEVAL["score_threshold"]
+    if threshold <= 0 or not has_meaningful_scores(vector_store):
+        return [doc for doc, _ in scored_docs]
+    relevant = [doc for doc, relevance in scored_docs if relevance >= threshold]
+    if len(relevant) < len(scored_docs):
+        METRICS.increment("retrieval.docs_below_threshold", len(scored_docs) - len(relevant))
+    if scored_docs and not relevant:
+        METRICS.increment("retrieval.no_relevant_context")
+        print(f"[RETRIEVAL] Best relevance {scored_docs[0][1]:.2f} is below the threshold {threshold:.2f}")
+    return relevant
+
+
+def get_vector_store(language: str = "en"):
+    """FAQ index of a language (the English one for other languages)"""
+    return vector_stores.get(language, vector_store)
+
+
+async def retrieve_documents(message: str, language: str = "en", budget: RequestBudget | None = None) -> list:
+    """
+    Retrieve relevant FAQ documents for a message from the index of its language.
+    Under micro-batching, concurrent queries share one embeddings request.
+    Documents below the relevance threshold are dropped. With a budget, the
+    embeddings request is dropped at its deadline.
+    """
+    store = get_vector_store(language)
+    deadline = budget.deadline if budget else None
+    if MICRO_BATCHING["enabled"]:
+        scored_docs = await QUERY_BATCHER.submit((store, (message, deadline)))
+    else:
+        scored_docs = (await asyncio.to_thread(
+            batch_similarity_search, store, [message], 3, batch_timeout([deadline])
+        ))[0]
+    return select_relevant_documents(scored_docs)
+
+
+# Binds the function tools to the LLM and runs the tool-calling loop
+TOOL_EXECUTOR = ToolExecutor(AVAILABLE_TOOLS)
+
+
+ANSWER_STORE_SETTINGS = get_answer_store_settings()
+CANDIDATE_STORE_SETTINGS = get_candidate_store_settings()
+
+
+def rescore_candidates():
+    """Run the candidate re-scoring job (in an executor thread)"""
+    try:
+        CANDIDATE_STORE.rescore()
+    except Exception as e:
+        print(f"[ERROR] Candidate re-scoring failed: {e}")
+
+
+# Stores evaluated CVs off the event loop, one write at a time
+CANDIDATE_WRITER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="candidate-store")
+
+
+def store_candidate(cv_text: str, cv_features, name: str | None = None, source: str | None = None):
+    """Store an evaluated CV in the candidate store (in the candidate writer thread)"""
+    try:
+        candidate_id = CANDIDATE_STORE.add_cv(cv_text, name=name, source=source, features=cv_features)
+        METRICS.increment("candidates.stored")
+        print(f"[CANDIDATES] Stored evaluated CV as candidate #{candidate_id}")
+    except Exception as e:
+        METRICS.increment("candidates.store_failures")
+        print(f"[WARNING] Could not store the candidate: {e}")
+
+
+def remember_candidate(cv_text: str, cv_features, name: str | None = None, source: str | None = None):
+    """Keep an evaluated CV in the candidate store without waiting for it (a store failure never fails the evaluation)"""
+    if not CANDIDATE_STORE_SETTINGS["enabled"]:
+        return
+    CANDIDATE_WRITER.submit(store_candidate, cv_text, cv_features, name, source)
+
+
+def answer_from_store(request: ChatRequest) -> ChatResponse | None:
+    """
+    Serve the precomputed answer when the message is a canonical FAQ question.
     
-    lang_responses = responses.get(language, responses["en"])
+    Returns:
+        ChatResponse with the stored answer, or None if there is no up-to-date answer
+    """
+    if not ANSWER_STORE_SETTINGS["enabled"]:
+        return None
+    entry = ANSWER_STORE.lookup(request.message, request.language)
+    if entry is None:
+        return None
+    print(f"[CHAT] Serving precomputed answer for FAQ {entry['faq_id']} ({request.language})")
+    METRICS.increment("chat.precomputed_answers")
+    return ChatResponse(answer=entry["answer"], source_documents=entry["source_documents"], function_calls=[])
+
+
+async def invoke_llm(messages: list, model=None, budget: RequestBudget | None = None):
+    """
+    Invoke the LLM for one prompt.
+    Under micro-batching, prompts arriving together are dispatched as one batch;
+    otherwise the call goes through the (optionally hedged) LLM caller.
     
-    # Keywords for Vietnamese
-    if language == "vi":
-        vietnamese_keywords = {
-            "nghỉ": "leave", "phép": "leave", "absent": "leave", "sick": "leave",
-            "phúc lợi": "benefits", "bảo hiểm": "benefits", "y tế": "benefits",
-            "lương": "salary", "tiền": "salary", "payroll": "salary", "salary": "salary",
-            "từ xa": "remote", "wfh": "remote", "remote": "remote", "home": "remote",
-            "hưu trí": "retirement", "401k": "retirement", "pension": "retirement",
-            "thai sản": "maternity", "sinh con": "maternity", "con": "maternity",
-            "lễ": "holiday", "nghỉ lễ": "holiday", "holiday": "holiday",
-            "đào tạo": "training", "học": "training", "training": "training",
-            "chuyển": "transfer", "bộ phận": "transfer", "department": "transfer",
-            "tăng ca": "overtime", "overtime": "overtime",
-            "khiếu nại": "complaint", "vấn đề": "complaint", "complaint": "complaint",
-            "giờ": "hours", "time": "hours", "schedule": "hours"
-        }
-        
-        for vn_keyword, en_category in vietnamese_keywords.items():
-            if vn_keyword in question_lower:
-                return responses[language].get(en_category, responses[language]["default"])
+    Args:
+        messages: Prompt messages
+        model: Model to call (defaults to the global LLM; e.g. the LLM with tools bound)
+        budget: Latency budget of the request; the LLM request is dropped at its deadline
+    """
+    model = model or llm
+    deadline = budget.deadline if budget else None
+    if MICRO_BATCHING["enabled"]:
+        METRICS.increment("llm.calls")
+        return await LLM_BATCHER.submit((model, (messages, deadline)))
+    return await LLM_CALLER.invoke(model, messages, timeout=batch_timeout([deadline]))
+
+
+def answer_tool_query(request: ChatRequest, tool_name: str) -> ChatResponse | None:
+    """
+    Answer an HR lookup by invoking the function tool directly (no retrieval, no LLM).
     
-    # English keywords
-    keywords_mapping = {
-        ("leave", "vacation", "time off", "absent", "sick"): "leave",
-        ("benefit", "insurance", "health"): "benefits", 
-        ("salary", "pay", "payroll", "wage"): "salary",
-        ("remote", "work from home", "wfh"): "remote",
-        ("retirement", "401k", "pension"): "retirement",
-        ("maternity", "paternity", "baby"): "maternity",
-        ("holiday", "vacation"): "holiday",
-        ("training", "development", "course", "learning"): "training",
-        ("transfer", "department"): "transfer",
-        ("overtime",): "overtime",
-        ("complaint", "concern", "issue", "problem"): "complaint",
-        ("hour", "schedule", "time"): "hours"
-    }
+    Returns:
+        ChatResponse with the tool answer, or None if the query could not be parsed
+    """
+    query = TOOL_QUERY_PARSER.parse(request.message, tool_name)
+    if query is None:
+        print(f"[TOOL] Could not parse arguments for {tool_name}, using RAG")
+        return None
     
-    for keywords, category in keywords_mapping.items():
-        if any(keyword in question_lower for keyword in keywords):
-            return responses[language].get(category, responses[language]["default"])
+    try:
+        answer, function_call = run_tool_query(query, request.language)
+    except Exception as e:
+        print(f"[ERROR] Tool {tool_name} failed: {str(e)}")
+        return None
     
-    return responses[language]["default"]
+    print(f"[TOOL] Fast path: {function_call}")
+    METRICS.increment("chat.tool_fast_path")
+    return ChatResponse(answer=answer, source_documents=[], function_calls=[function_call])
 
 
-@app.post("/api/chat")
-async def chat(request: ChatRequest) -> ChatResponse:
-    """
-    Main chat endpoint.
-    Processes user message through RAG and returns response with context.
+def route_special_request(request: ChatRequest) -> ChatResponse | None:
     """
-    if not request.message or not request.message.strip():
-        raise HTTPException(
-            status_code=400,
-            detail="Message cannot be empty"
-        )
+    Handle messages that are answered without RAG (CV evaluation, position list and HR lookups).
     
-    # Check for CV-related keywords to provide special handling
-    cv_check_keywords = ["cv", "resume", "evaluate", "check", "score", "assess", "đánh giá", "kiểm tra"]
-    cv_eval_keywords = ["evaluate", "score", "assess", "đánh giá"]
-    message_lower = request.message.lower()
-    is_cv_check_request = any(keyword in message_lower for keyword in cv_check_keywords)
-    is_cv_eval_request = any(keyword in message_lower for keyword in cv_eval_keywords)
+    Returns:
+        ChatResponse for CV-related messages and HR lookups, or None if the message should go through RAG
+    """
+    # Classify the message in one keyword pass
+    intent = INTENT_ROUTER.route(request.message)
     
     print(f"[DEBUG] Message: '{request.message[:100]}...'")
-    print(f"[DEBUG] Is CV check request: {is_cv_check_request}")
-    print(f"[DEBUG] Is CV eval request: {is_cv_eval_request}")
+    print(f"[DEBUG] Intent: {intent.kind}")
     
-    # If user is asking to evaluate CV (without providing actual CV content yet)
-    if is_cv_check_request:
-        # Check if this is just asking for evaluation options, not providing actual CV
-        cv_content_keywords = ["experience", "skill", "education", "bachelor", "master", "project", "responsibility"]
-        actual_cv_content = sum(1 for kw in cv_content_keywords if kw in message_lower) >= 2
-        
-        # If user sent "Evaluate my CV for positions: <content>", treat it as evaluation request
-        if is_cv_eval_request and "evaluate" in message_lower:
-            print(f"[DEBUG] Treating as CV evaluation request")
-            actual_cv_content = True
-        
-        print(f"[DEBUG] Actual CV content: {actual_cv_content}")
-        
-        if not actual_cv_content:
-            print(f"[DEBUG] Returning position list")
-            # Just asking about CV evaluation - show position list
-            if request.language == "vi":
-                cv_response = {
-                    "answer": (
-                        "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-                        "📋 DANH SÁCH CÁC VỊ TRÍ TUYỂN DỤNG\n"
-                        "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-                        "Xin chào! Tôi có thể giúp đánh giá CV của bạn.\n"
-                        "Vui lòng chọn vị trí tuyển dụng bên dưới:\n\n"
-                        "🐍 1. Python Developer\n"
-                        "☕ 2. Java Developer\n"
-                        "🤖 3. AI/ML Engineer\n"
-                        "🎨 4. Frontend Developer\n"
-                        "🔧 5. DevOps Engineer\n"
-                        "🚀 6. Full Stack Developer\n"
-                        "📊 7. Data Engineer\n"
-                        "✅ 8. QA Engineer\n\n"
-                        "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-                        "📤 Hãy tải lên CV của bạn để bắt đầu đánh giá!"
-                    ),
-                    "source_documents": [],
-                    "function_calls": []
-                }
-            else:
-                cv_response = {
-                    "answer": (
-                        "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-                        "📋 AVAILABLE POSITIONS FOR EVALUATION\n"
-                        "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-                        "Hello! I can help evaluate your CV.\n"
-                        "Please select a position below:\n\n"
-                        "🐍 1. Python Developer\n"
-                        "☕ 2. Java Developer\n"
-                        "🤖 3. AI/ML Engineer\n"
-                        "🎨 4. Frontend Developer\n"
-                        "🔧 5. DevOps Engineer\n"
-                        "🚀 6. Full Stack Developer\n"
-                        "📊 7. Data Engineer\n"
-                        "✅ 8. QA Engineer\n\n"
-                        "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-                        "📤 Upload your CV to start evaluation!"
-                    ),
-                    "source_documents": [],
-                    "function_calls": []
-                }
-            return ChatResponse(**cv_response)
+    # HR lookups (leave balance, pay date, department) are answered by the tools
+    if intent.kind == INTENT_TOOL_QUERY:
+        tool_response = answer_tool_query(request, intent.tool_name)
+        if tool_response is not None:
+            return tool_response
     
-    # Check if message contains CV content (has experience/skills/education keywords)
-    cv_content_keywords = ["experience", "skill", "education", "bachelor", "master", "python", "java", "javascript", 
-                           "developer", "engineer", "project", "responsibility", "achievement"]
-    has_cv_content = sum(1 for kw in cv_content_keywords if kw in message_lower) >= 3
+    # If user is asking to evaluate CV (without providing actual CV content yet)
+    if intent.kind == INTENT_POSITION_LIST:
+        print(f"[DEBUG] Returning position list")
+        # Just asking about CV evaluation - show position list
+        if request.language == "vi":
+            cv_response = {
+                "answer": (
+                    "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+                    "📋 DANH SÁCH CÁC VỊ TRÍ TUYỂN DỤNG\n"
+                    "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+                    "Xin chào! Tôi có thể giúp đánh giá CV của bạn.\n"
+                    "Vui lòng chọn vị trí tuyển dụng bên dưới:\n\n"
+                    "🐍 1. Python Developer\n"
+                    "☕ 2. Java Developer\n"
+                    "🤖 3. AI/ML Engineer\n"
+                    "🎨 4. Frontend Developer\n"
+                    "🔧 5. DevOps Engineer\n"
+                    "🚀 6. Full Stack Developer\n"
+                    "📊 7. Data Engineer\n"
+                    "✅ 8. QA Engineer\n\n"
+                    "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+                    "📤 Hãy tải lên CV của bạn để bắt đầu đánh giá!"
+                ),
+                "source_documents": [],
+                "function_calls": []
+            }
+        else:
+            cv_response = {
+                "answer": (
+                    "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+                    "📋 AVAILABLE POSITIONS FOR EVALUATION\n"
+                    "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+                    "Hello! I can help evaluate your CV.\n"
+                    "Please select a position below:\n\n"
+                    "🐍 1. Python Developer\n"
+                    "☕ 2. Java Developer\n"
+                    "🤖 3. AI/ML Engineer\n"
+                    "🎨 4. Frontend Developer\n"
+                    "🔧 5. DevOps Engineer\n"
+                    "🚀 6. Full Stack Developer\n"
+                    "📊 7. Data Engineer\n"
+                    "✅ 8. QA Engineer\n\n"
+                    "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+                    "📤 Upload your CV to start evaluation!"
+                ),
+                "source_documents": [],
+                "function_calls": []
+            }
+        return ChatResponse(**cv_response)
     
-    # Special case: if message starts with "Evaluate my CV", extract position and evaluate
-    if message_lower.startswith("evaluate my cv"):
+    # Special case: message from the CV upload widget, evaluate the uploaded file
+    if intent.kind == INTENT_CV_EVAL and intent.from_upload:
         print(f"[DEBUG] Detected CV evaluation request")
         
         # Extract CV file info from message
-        # Message format: "Evaluate my CV for [position]. File: [filename]. CV: [base64_content]"
-        cv_file_content = ""
+        # Message format: "position | filename | base64_content"
+        # The payload is decoded in place: it is never split off, stripped or lowercased
         cv_file_type = "txt"
-        cv_content_for_eval = message_lower  # Initialize with fallback
+        cv_file_name = None
+        extracted_cv_text = None
+        first = request.message.find("|")
+        second = request.message.find("|", first + 1) if first != -1 else -1
+        # Fallback: the "position | filename" header
+        cv_content_for_eval = request.message[:second if second != -1 else None].lower()
         
-        # Try to extract file type and base64 content from message
-        if "|" in request.message:
-            parts = request.message.split("|")
-            if len(parts) >= 3:
-                # Format: "position | filename | base64_content"
-                cv_file_name = parts[1].strip()
-                cv_file_content = parts[2].strip()
-                
-                # Detect file type from filename
-                if cv_file_name.lower().endswith('.pdf'):
-                    cv_file_type = 'pdf'
-                elif cv_file_name.lower().endswith('.docx'):
-                    cv_file_type = 'docx'
-                elif cv_file_name.lower().endswith('.doc'):
-                    cv_file_type = 'doc'
+        if second != -1:
+            cv_file_name = request.message[first + 1:second].strip()
+            
+            # Detect file type from filename
+            if cv_file_name.lower().endswith('.pdf'):
+                cv_file_type = 'pdf'
+            elif cv_file_name.lower().endswith('.docx'):
+                cv_file_type = 'docx'
+            elif cv_file_name.lower().endswith('.doc'):
+                cv_file_type = 'doc'
+            else:
+                cv_file_type = 'txt'
+            
+            print(f"[DEBUG] Extracted file: {cv_file_name}, type: {cv_file_type}")
+            
+            # Extract text from file
+            try:
+                with decode_base64_upload(request.message, second + 1) as cv_file:
+                    extracted_cv_text = extract_cv_content(cv_file, cv_file_type)
+                if extracted_cv_text:
+                    cv_content_for_eval = extracted_cv_text
+                    print(f"[OK] Successfully extracted CV text ({len(extracted_cv_text)} chars)")
                 else:
-                    cv_file_type = 'txt'
-                
-                print(f"[DEBUG] Extracted file: {cv_file_name}, type: {cv_file_type}")
-                
-                # Extract text from file
-                if cv_file_content:
-                    try:
-                        extracted_cv_text = extract_cv_content(cv_file_content, cv_file_type)
-                        if extracted_cv_text:
-                            cv_content_for_eval = extracted_cv_text
-                            print(f"[OK] Successfully extracted CV text ({len(extracted_cv_text)} chars)")
-                        else:
-                            cv_content_for_eval = message_lower
-                            print(f"[WARNING] Could not extract text, falling back to message")
-                    except Exception as e:
-                        print(f"[ERROR] CV extraction failed: {str(e)}")
-                        cv_content_for_eval = message_lower
+                    print(f"[WARNING] Could not extract text, falling back to message")
+            except UploadTooLargeError as e:
+                print(f"[WARNING] CV upload rejected: {str(e)}")
+                METRICS.increment("chat.uploads_rejected")
+                limit_mb = round(e.max_bytes / (1024 * 1024), 1)
+                if request.language == "vi":
+                    answer = f"Tệp CV quá lớn để đánh giá (tối đa {limit_mb:g} MB). Vui lòng tải lên tệp nhỏ hơn."
                 else:
-                    cv_content_for_eval = message_lower
-        else:
-            # Fallback: use message content directly
-            cv_content_for_eval = message_lower
-        
-        # Position mapping with exact keywords
-        positions_dict = {
-            "python developer": "python_developer",
-            "java developer": "java_developer",
-            "ai/ml engineer": "ai_ml_engineer",
-            "ai/ml": "ai_ml_engineer",
-            "machine learning": "ai_ml_engineer",
-            "frontend developer": "frontend_developer",
-            "backend developer": "python_developer",
-            "devops engineer": "devops_engineer",
-            "full stack developer": "full_stack_developer",
-            "data engineer": "data_engineer",
-            "qa engineer": "qa_engineer",
-            # Also try lowercase without "developer" suffix
-            "python": "python_developer",
-            "java": "java_developer",
-            "frontend": "frontend_developer",
-            "backend": "python_developer",
-            "devops": "devops_engineer",
-            "full stack": "full_stack_developer",
-            "data": "data_engineer",
-            "qa": "qa_engineer",
-            "ai": "ai_ml_engineer",
-            "ml": "ai_ml_engineer"
-        }
+                    answer = f"Your CV file is too large to evaluate (maximum {limit_mb:g} MB). Please upload a smaller file."
+                return ChatResponse(answer=answer, source_documents=[], function_calls=[])
+            except Exception as e:
+                print(f"[ERROR] CV extraction failed: {str(e)}")
         
-        # Find position name in message (try longer matches first)
-        position_key = None
-        for pos_str, pos_key in sorted(positions_dict.items(), key=lambda x: len(x[0]), reverse=True):
-            if pos_str in message_lower:
-                position_key = pos_key
-                print(f"[DEBUG] Matched position keyword: {pos_str}")
-                break
-        
-        # If no position found, default to python developer
-        if not position_key:
-            position_key = "python_developer"
-            print(f"[DEBUG] No position matched, using default: python_developer")
+        # Position extracted by the router (longest alias in the message header)
+        position_key = intent.position_key
+        print(f"[DEBUG] Matched position: {position_key}")
         
         from company_data import JOB_POSITIONS
         position = JOB_POSITIONS[position_key]
         print(f"[DEBUG] Evaluating for position: {position['name']}")
         
-        cv_lower = cv_content_for_eval.lower()
-        must_have_score = 0
-        found_skills = []
-        missing_must_haves = []
-        
-        # Enhanced skill matching function
-        def skill_matches(skill_name, cv_text):
-            skill_lower = skill_name.lower()
-            cv_text_lower = cv_text.lower()
-            
-            # Direct match
-            if skill_lower in cv_text_lower:
-                return True
-            
-            # Check for partial word matches (more flexible)
-            import re
-            
-            # Split skill into words and check if all words are present
-            skill_words = re.findall(r'\w+', skill_lower)
-            if len(skill_words) > 1:
-                # For multi-word skills, check if all words appear somewhere in CV
-                if all(word in cv_text_lower for word in skill_words):
-                    return True
-            
-            # Check for common synonyms and variations
-            synonyms = {
-                "python": ["python", "py", "pyton"],
-                "machine learning": ["machine learning", "ml", "artificial intelligence", "ai", "ai engineer", "machine", "learning", "predictive"],
-                "ai": ["ai", "artificial intelligence", "machine learning", "ml", "ai engineer", "agi"],
-                "data analysis": ["data analysis", "data analytics", "analytics", "data science", "analysis"],
-                "tensorflow": ["tensorflow", "tf"],
-                "pytorch": ["pytorch", "torch"],
-                "nlp": ["nlp", "natural language processing", "language model", "text processing", "language models", "genai", "generative ai"],
-                "computer vision": ["computer vision", "cv", "image processing", "vision"],
-                "deep learning": ["deep learning", "neural network", "nn", "deep", "cnn", "rnn"],
-                "langchain": ["langchain", "lang chain"],
-                "llm": ["llm", "large language model", "language model", "gpt", "chatbot", "llms", "generative", "rag"],
-                "faiss": ["faiss", "vector search", "similarity search", "vector database", "vector"],
-                "hugging face": ["hugging face", "transformers", "hf"],
-                "openai": ["openai", "gpt", "chatgpt"],
-                "aws": ["aws", "amazon web services", "cloud", "sagemaker"],
-                "azure": ["azure", "microsoft cloud"],
-                "gcp": ["gcp", "google cloud", "google cloud platform"],
-                "docker": ["docker", "containerization"],
-                "kubernetes": ["kubernetes", "k8s"],
-                "fastapi": ["fastapi", "api development"],
-                "sql": ["sql", "database", "postgresql", "mysql"],
-                "git": ["git", "version control", "github"],
-                "deployment": ["deployment", "production", "devops", "ci/cd"],
-                "leadership": ["leadership", "lead", "mentor", "team lead"],
-                "communication": ["communication", "presentation", "collaboration"],
-                "testing": ["testing", "qa", "unit test", "automation"]
-            }
-            
-            # Check synonyms
-            if skill_lower in synonyms:
-                for synonym in synonyms[skill_lower]:
-                    if synonym in cv_text_lower:
-                        return True
-            
-            return False
-        
-        # Check must-have skills with enhanced matching
-        for skill in position["must_have"]:
-            if skill_matches(skill, cv_lower):
-                must_have_score += 15
-                found_skills.append(skill)
-            else:
-                missing_must_haves.append(skill)
-        
-        # Check nice-to-have skills
-        nice_to_have_score = 0
-        for skill in position["nice_to_have"]:
-            if skill_matches(skill, cv_lower):
-                nice_to_have_score += 5
-                found_skills.append(skill)
-        
-        # Experience score
-        experience_score = 5
-        if "senior" in cv_lower or "lead" in cv_lower:
-            experience_score = 20
-        elif any(f"{i}+ years" in cv_lower or f"{i} years" in cv_lower for i in range(3, 10)):
-            experience_score = 15
-        
-        # Education score
-        education_score = 0
-        if "bachelor" in cv_lower or "b.s." in cv_lower:
-            education_score = 15
-        if "master" in cv_lower or "m.s." in cv_lower:
-            education_score = 10
-        if "certification" in cv_lower:
-            education_score += 5
-        education_score = min(education_score, 25)
-        
-        # Soft skills
-        soft_skills_score = min(sum(3 for s in ["communication", "leadership", "teamwork"] if s in cv_lower), 20)
-        
-        total_score = min(must_have_score + nice_to_have_score + experience_score + education_score + soft_skills_score, 100)
-        
-        # Determine rating - more flexible scoring
-        missing_count = len(missing_must_haves)
-        if missing_count > len(position['must_have']) * 0.5:
-            # Missing more than 50% of must-haves
-            rating = "Not Suitable"
-        elif total_score >= 85:
-            rating = "Excellent - Highly Recommended"
-        elif total_score >= 75:
-            rating = "Very Good - Recommended"
-        elif total_score >= 60:
-            rating = "Good - Consider for Interview"
-        else:
-            rating = "Below Threshold"
+        cv_features = extract_cv_features(cv_content_for_eval)
+        score = score_cv(cv_features, position)
+        if extracted_cv_text:
+            remember_candidate(extracted_cv_text, cv_features, name=cv_file_name, source="chat upload")
+        must_have_score = score["must_have_score"]
+        nice_to_have_score = score["nice_to_have_score"]
+        experience_score = score["experience_score"]
+        education_score = score["education_score"]
+        soft_skills_score = score["soft_skills_score"]
+        total_score = score["total_score"]
+        rating = score["rating"]
+        found_skills = score["found_skills"]
+        missing_must_haves = score["missing_must_haves"]
         
         # Analyze language skills
-        language_skills = []
-        language_keywords = {
-            "english": ["english", "toefl", "ielts", "esl"],
-            "chinese": ["chinese", "mandarin", "hsk"],
-            "japanese": ["japanese", "jlpt"],
-            "german": ["german", "goethe"],
-            "french": ["french"],
-            "spanish": ["spanish"],
-            "vietnamese": ["vietnamese"]
-        }
-        
-        for lang, keywords in language_keywords.items():
-            if any(kw in cv_lower for kw in keywords):
-                language_skills.append(lang.capitalize())
+        language_skills = list(cv_features.languages)
         
         # Analyze general strengths and improvement areas
         strengths = []
@@ -694,338 +762,256 @@ async def chat(request: ChatRequest) -> ChatResponse:
         )
     
     # If user is providing CV content and mentions a position
-    if has_cv_content:
-        # Extract position from message if mentioned
-        positions = ["python", "java", "ai", "ml", "frontend", "backend", "devops", "full stack", "data", "qa"]
-        position_mentioned = next((p for p in positions if p in message_lower), None)
+    if intent.kind == INTENT_CV_EVAL:
+        # Try to evaluate CV
+        position_key = intent.position_key
         
-        if position_mentioned:
-            # Try to evaluate CV
-            position_key = {
-                "python": "python_developer",
-                "java": "java_developer",
-                "ai": "ai_ml_engineer",
-                "ml": "ai_ml_engineer",
-                "frontend": "frontend_developer",
-                "backend": "python_developer",  # default backend
-                "devops": "devops_engineer",
-                "full stack": "full_stack_developer",
-                "data": "data_engineer",
-                "qa": "qa_engineer"
-            }.get(position_mentioned, "python_developer")
-            
-            from company_data import JOB_POSITIONS
-            position = JOB_POSITIONS[position_key]
-            
-            cv_lower = message_lower
-            must_have_score = 0
-            found_skills = []
-            missing_must_haves = []
-            
-            # Enhanced skill matching function
-            def skill_matches(skill_name, cv_text):
-                skill_lower = skill_name.lower()
-                cv_text_lower = cv_text.lower()
-                
-                # Direct match
-                if skill_lower in cv_text_lower:
-                    return True
-                
-                # Check for common synonyms and variations
-                synonyms = {
-                    "python": ["python", "py", "pyton"],
-                    "machine learning": ["machine learning", "ml", "artificial intelligence", "ai", "ai engineer", "machine", "learning", "predictive"],
-                    "ai": ["ai", "artificial intelligence", "machine learning", "ml", "ai engineer", "agi"],
-                    "data analysis": ["data analysis", "data analytics", "analytics", "data science"],
-                    "tensorflow": ["tensorflow", "tf"],
-                    "pytorch": ["pytorch", "torch"],
-                    "nlp": ["nlp", "natural language processing", "language model", "text processing", "genai", "generative ai"],
-                    "computer vision": ["computer vision", "cv", "image processing", "vision"],
-                    "deep learning": ["deep learning", "neural network", "nn", "cnn", "rnn"],
-                    "langchain": ["langchain", "lang chain"],
-                    "llm": ["llm", "large language model", "language model", "gpt", "chatbot", "generative", "rag"],
-                    "faiss": ["faiss", "vector search", "similarity search", "vector database"],
-                    "docker": ["docker", "containerization"],
-                    "kubernetes": ["kubernetes", "k8s"],
-                    "fastapi": ["fastapi", "api development"],
-                    "deployment": ["deployment", "production", "devops"]
-                }
-                
-                # Check synonyms
-                if skill_lower in synonyms:
-                    for synonym in synonyms[skill_lower]:
-                        if synonym in cv_text_lower:
-                            return True
-                
-                return False
-            
-            # Check must-have skills with enhanced matching
-            for skill in position["must_have"]:
-                if skill_matches(skill, cv_lower):
-                    must_have_score += 15
-                    found_skills.append(skill)
-                else:
-                    missing_must_haves.append(skill)
-            
-            # Check nice-to-have skills
-            nice_to_have_score = 0
-            for skill in position["nice_to_have"]:
-                if skill_matches(skill, cv_lower):
-                    nice_to_have_score += 5
-                    found_skills.append(skill)
-            
-            # Experience score
-            experience_score = 5
-            if "senior" in cv_lower or "lead" in cv_lower:
-                experience_score = 20
-            elif any(f"{i}+ years" in cv_lower or f"{i} years" in cv_lower for i in range(3, 10)):
-                experience_score = 15
-            
-            # Education score
-            education_score = 0
-            if "bachelor" in cv_lower or "b.s." in cv_lower:
-                education_score = 15
-            if "master" in cv_lower or "m.s." in cv_lower:
-                education_score = 10
-            if "certification" in cv_lower:
-                education_score += 5
-            education_score = min(education_score, 25)
-            
-            # Soft skills
-            soft_skills_score = min(sum(3 for s in ["communication", "leadership", "teamwork"] if s in cv_lower), 20)
-            
-            total_score = min(must_have_score + nice_to_have_score + experience_score + education_score + soft_skills_score, 100)
-            
-            # Determine rating - more flexible scoring
-            missing_count = len(missing_must_haves)
-            if missing_count > len(position['must_have']) * 0.5:
-                # Missing more than 50% of must-haves
-                rating = "Not Suitable"
-            elif total_score >= 85:
-                rating = "Excellent - Highly Recommended"
-            elif total_score >= 75:
-                rating = "Very Good - Recommended"
-            elif total_score >= 60:
-                rating = "Good - Consider for Interview"
-            else:
-                rating = "Below Threshold"
-            
-            # Analyze language skills
-            language_skills = []
-            language_keywords = {
-                "english": ["english", "toefl", "ielts", "esl"],
-                "chinese": ["chinese", "mandarin", "hsk"],
-                "japanese": ["japanese", "jlpt"],
-                "german": ["german", "goethe"],
-                "french": ["french"],
-                "spanish": ["spanish"],
-                "vietnamese": ["vietnamese"]
-            }
+        from company_data import JOB_POSITIONS
+        position = JOB_POSITIONS[position_key]
+        
+        cv_features = extract_cv_features(request.message)
+        score = score_cv(cv_features, position)
+        remember_candidate(request.message, cv_features, source="chat")
+        must_have_score = score["must_have_score"]
+        nice_to_have_score = score["nice_to_have_score"]
+        experience_score = score["experience_score"]
+        education_score = score["education_score"]
+        soft_skills_score = score["soft_skills_score"]
+        total_score = score["total_score"]
+        rating = score["rating"]
+        found_skills = score["found_skills"]
+        missing_must_haves = score["missing_must_haves"]
+        
+        # Analyze language skills
+        language_skills = list(cv_features.languages)
+        
+        # Analyze general strengths and improvement areas
+        strengths = []
+        improvements = []
+        
+        if must_have_score >= 15:
+            strengths.append("Strong core technical skills")
+        if experience_score >= 15:
+            strengths.append("Good experience level")
+        if education_score >= 15:
+            strengths.append("Strong educational background")
+        if soft_skills_score >= 10:
+            strengths.append("Good soft skills demonstrated")
+        
+        if len(missing_must_haves) > 0:
+            improvements.append(f"Missing key skills: {', '.join(missing_must_haves)}")
+        if experience_score < 10:
+            improvements.append("Need more years of experience")
+        if education_score < 10:
+            improvements.append("Consider formal certifications or degrees")
+        if nice_to_have_score < 10:
+            improvements.append("Develop additional technical skills")
+        
+        if request.language == "vi":
+            # Calculate detail breakdown
+            detail_breakdown = (
+                f"\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+                f"📋 PHÂN TÍCH CHI TIẾT CV\n"
+                f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+                f"📌 TÓM TẮT CV VÀ KỸ NĂNG HIỆN CÓ:\n"
+                f"   • Vị trí ứng tuyển: {position['name_vi']}\n"
+                f"   • Tổng kỹ năng tìm thấy: {len(found_skills)} kỹ năng\n"
+                f"   • Kỹ năng bắt buộc: {len(position['must_have'])} (Đã có: {must_have_score//15}/{len(position['must_have'])})\n"
+                f"   • Kỹ năng khác: {len(position['nice_to_have'])} kỹ năng\n\n"
+                f"🌍 ĐÁNH GIÁ KỸ NĂNG NGOẠI NGỮ:\n"
+                f"   • Ngoại ngữ phát hiện: {', '.join(language_skills) if language_skills else '   Không phát hiện'}\n"
+                f"   • Khuyến nghị: {('Tốt, có sự đa dạng ngoại ngữ' if len(language_skills) >= 1 else 'Nên cải thiện hoặc thêm chứng chỉ ngoại ngữ')}\n\n"
+                f"💪 ĐIỂM MẠNH:\n"
+            )
+            for i, strength in enumerate(strengths, 1):
+                detail_breakdown += f"   {i}. {strength}\n"
+            if not strengths:
+                detail_breakdown += "   Chưa phát hiện điểm mạnh nổi bật\n"
             
-            for lang, keywords in language_keywords.items():
-                if any(kw in cv_lower for kw in keywords):
-                    language_skills.append(lang.capitalize())
+            detail_breakdown += f"\n⚠️ CẦN CẢI THIỆN:\n"
+            for i, improvement in enumerate(improvements, 1):
+                detail_breakdown += f"   {i}. {improvement}\n"
+            if not improvements:
+                detail_breakdown += "   Không có lĩnh vực cần cải thiện\n"
             
-            # Analyze general strengths and improvement areas
-            strengths = []
-            improvements = []
+            detail_breakdown += (
+                f"\n📊 CHI TIẾT ĐIỂM TỪNG TIÊU CHÍ:\n"
+                f"   ┌─ Kỹ năng bắt buộc (Must-have skills)......: {must_have_score}/30 điểm\n"
+                f"   ├─ Kỹ năng ngoài tùy chọn (Nice-to-have)....: {nice_to_have_score}/25 điểm\n"
+                f"   ├─ Kinh nghiệm làm việc...................: {experience_score}/20 điểm\n"
+                f"   ├─ Bằng cấp và chứng chỉ..................: {education_score}/15 điểm\n"
+                f"   ├─ Kỹ năng mềm (Soft skills).............: {soft_skills_score}/10 điểm\n"
+                f"   └─ TỔNG ĐIỂM..............................: {total_score}/100 điểm\n\n"
+            )
             
-            if must_have_score >= 15:
-                strengths.append("Strong core technical skills")
-            if experience_score >= 15:
-                strengths.append("Good experience level")
-            if education_score >= 15:
-                strengths.append("Strong educational background")
-            if soft_skills_score >= 10:
-                strengths.append("Good soft skills demonstrated")
+            cv_eval_answer = (
+                f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+                f"📊 KẾT QUẢ ĐÁNH GIÁ CV CHI TIẾT\n"
+                f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+                f"Vị trí: {position['name_vi']}\n"
+                f"{'='*50}\n\n"
+                f"📈 ĐIỂM TỔNG HỢP:\n"
+                f"   Tổng điểm: {total_score}/100\n"
+                f"   Tỷ lệ: {(total_score//20)*'█'}{'░'*(5-total_score//20)} ({total_score}%)\n"
+                f"   Xếp hạng: {rating}\n\n"
+                f"✅ KỸ NĂNG TÌM THẤY ({len(found_skills)} kỹ năng):\n"
+                f"   {', '.join(found_skills) if found_skills else '   Không tìm thấy kỹ năng nào'}\n\n"
+                f"⚠️ KỸ NĂNG BẮT BUỘC THIẾU ({len(missing_must_haves)}):\n"
+                f"   {', '.join(missing_must_haves) if missing_must_haves else '   Không thiếu kỹ năng nào'}\n"
+                f"{detail_breakdown}"
+                f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+                f"💡 NHẬN XÉT CHUNG:\n"
+                f"   {('✨ Ứng viên xuất sắc! Rất phù hợp với vị trí này. Đủ năng lực, kinh nghiệm và tất cả kỹ năng bắt buộc.' if total_score >= 80 else '✓ Ứng viên khá phù hợp. Có đủ kỹ năng cơ bản, nên cải thiện thêm một vài kỹ năng.' if total_score >= 60 else '→ Cần cải thiện nhiều kỹ năng trước khi ứng tuyển vị trí này.')}\n"
+                f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+            )
+        else:
+            # Calculate detail breakdown in English
+            detail_breakdown = (
+                f"\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+                f"📋 DETAILED CV ANALYSIS\n"
+                f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+                f"📌 CV SUMMARY & CURRENT SKILLS:\n"
+                f"   • Target Position: {position['name']}\n"
+                f"   • Total Skills Found: {len(found_skills)} skills\n"
+                f"   • Required Skills: {len(position['must_have'])} (Have: {must_have_score//15}/{len(position['must_have'])})\n"
+                f"   • Additional Skills: {len(position['nice_to_have'])} skills\n\n"
+                f"🌍 LANGUAGE SKILLS EVALUATION:\n"
+                f"   • Languages Detected: {', '.join(language_skills) if language_skills else 'None detected'}\n"
+                f"   • Recommendation: {('Good diversity in languages' if len(language_skills) >= 1 else 'Consider adding language certifications')}\n\n"
+                f"💪 STRENGTHS:\n"
+            )
+            for i, strength in enumerate(strengths, 1):
+                detail_breakdown += f"   {i}. {strength}\n"
+            if not strengths:
+                detail_breakdown += "   No major strengths identified\n"
             
-            if len(missing_must_haves) > 0:
-                improvements.append(f"Missing key skills: {', '.join(missing_must_haves)}")
-            if experience_score < 10:
-                improvements.append("Need more years of experience")
-            if education_score < 10:
-                improvements.append("Consider formal certifications or degrees")
-            if nice_to_have_score < 10:
-                improvements.append("Develop additional technical skills")
+            detail_breakdown += f"\n⚠️ AREAS FOR IMPROVEMENT:\n"
+            for i, improvement in enumerate(improvements, 1):
+                detail_breakdown += f"   {i}. {improvement}\n"
+            if not improvements:
+                detail_breakdown += "   No areas need improvement\n"
             
-            if request.language == "vi":
-                # Calculate detail breakdown
-                detail_breakdown = (
-                    f"\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-                    f"📋 PHÂN TÍCH CHI TIẾT CV\n"
-                    f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-                    f"📌 TÓM TẮT CV VÀ KỸ NĂNG HIỆN CÓ:\n"
-                    f"   • Vị trí ứng tuyển: {position['name_vi']}\n"
-                    f"   • Tổng kỹ năng tìm thấy: {len(found_skills)} kỹ năng\n"
-                    f"   • Kỹ năng bắt buộc: {len(position['must_have'])} (Đã có: {must_have_score//15}/{len(position['must_have'])})\n"
-                    f"   • Kỹ năng khác: {len(position['nice_to_have'])} kỹ năng\n\n"
-                    f"🌍 ĐÁNH GIÁ KỸ NĂNG NGOẠI NGỮ:\n"
-                    f"   • Ngoại ngữ phát hiện: {', '.join(language_skills) if language_skills else '   Không phát hiện'}\n"
-                    f"   • Khuyến nghị: {('Tốt, có sự đa dạng ngoại ngữ' if len(language_skills) >= 1 else 'Nên cải thiện hoặc thêm chứng chỉ ngoại ngữ')}\n\n"
-                    f"💪 ĐIỂM MẠNH:\n"
-                )
-                for i, strength in enumerate(strengths, 1):
-                    detail_breakdown += f"   {i}. {strength}\n"
-                if not strengths:
-                    detail_breakdown += "   Chưa phát hiện điểm mạnh nổi bật\n"
-                
-                detail_breakdown += f"\n⚠️ CẦN CẢI THIỆN:\n"
-                for i, improvement in enumerate(improvements, 1):
-                    detail_breakdown += f"   {i}. {improvement}\n"
-                if not improvements:
-                    detail_breakdown += "   Không có lĩnh vực cần cải thiện\n"
-                
-                detail_breakdown += (
-                    f"\n📊 CHI TIẾT ĐIỂM TỪNG TIÊU CHÍ:\n"
-                    f"   ┌─ Kỹ năng bắt buộc (Must-have skills)......: {must_have_score}/30 điểm\n"
-                    f"   ├─ Kỹ năng ngoài tùy chọn (Nice-to-have)....: {nice_to_have_score}/25 điểm\n"
-                    f"   ├─ Kinh nghiệm làm việc...................: {experience_score}/20 điểm\n"
-                    f"   ├─ Bằng cấp và chứng chỉ..................: {education_score}/15 điểm\n"
-                    f"   ├─ Kỹ năng mềm (Soft skills).............: {soft_skills_score}/10 điểm\n"
-                    f"   └─ TỔNG ĐIỂM..............................: {total_score}/100 điểm\n\n"
-                )
-                
-                cv_eval_answer = (
-                    f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-                    f"📊 KẾT QUẢ ĐÁNH GIÁ CV CHI TIẾT\n"
-                    f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-                    f"Vị trí: {position['name_vi']}\n"
-                    f"{'='*50}\n\n"
-                    f"📈 ĐIỂM TỔNG HỢP:\n"
-                    f"   Tổng điểm: {total_score}/100\n"
-                    f"   Tỷ lệ: {(total_score//20)*'█'}{'░'*(5-total_score//20)} ({total_score}%)\n"
-                    f"   Xếp hạng: {rating}\n\n"
-                    f"✅ KỸ NĂNG TÌM THẤY ({len(found_skills)} kỹ năng):\n"
-                    f"   {', '.join(found_skills) if found_skills else '   Không tìm thấy kỹ năng nào'}\n\n"
-                    f"⚠️ KỸ NĂNG BẮT BUỘC THIẾU ({len(missing_must_haves)}):\n"
-                    f"   {', '.join(missing_must_haves) if missing_must_haves else '   Không thiếu kỹ năng nào'}\n"
-                    f"{detail_breakdown}"
-                    f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-                    f"💡 NHẬN XÉT CHUNG:\n"
-                    f"   {('✨ Ứng viên xuất sắc! Rất phù hợp với vị trí này. Đủ năng lực, kinh nghiệm và tất cả kỹ năng bắt buộc.' if total_score >= 80 else '✓ Ứng viên khá phù hợp. Có đủ kỹ năng cơ bản, nên cải thiện thêm một vài kỹ năng.' if total_score >= 60 else '→ Cần cải thiện nhiều kỹ năng trước khi ứng tuyển vị trí này.')}\n"
-                    f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
-                )
-            else:
-                # Calculate detail breakdown in English
-                detail_breakdown = (
-                    f"\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-                    f"📋 DETAILED CV ANALYSIS\n"
-                    f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-                    f"📌 CV SUMMARY & CURRENT SKILLS:\n"
-                    f"   • Target Position: {position['name']}\n"
-                    f"   • Total Skills Found: {len(found_skills)} skills\n"
-                    f"   • Required Skills: {len(position['must_have'])} (Have: {must_have_score//15}/{len(position['must_have'])})\n"
-                    f"   • Additional Skills: {len(position['nice_to_have'])} skills\n\n"
-                    f"🌍 LANGUAGE SKILLS EVALUATION:\n"
-                    f"   • Languages Detected: {', '.join(language_skills) if language_skills else 'None detected'}\n"
-                    f"   • Recommendation: {('Good diversity in languages' if len(language_skills) >= 1 else 'Consider adding language certifications')}\n\n"
-                    f"💪 STRENGTHS:\n"
-                )
-                for i, strength in enumerate(strengths, 1):
-                    detail_breakdown += f"   {i}. {strength}\n"
-                if not strengths:
-                    detail_breakdown += "   No major strengths identified\n"
-                
-                detail_breakdown += f"\n⚠️ AREAS FOR IMPROVEMENT:\n"
-                for i, improvement in enumerate(improvements, 1):
-                    detail_breakdown += f"   {i}. {improvement}\n"
-                if not improvements:
-                    detail_breakdown += "   No areas need improvement\n"
-                
-                detail_breakdown += (
-                    f"\n📊 SCORE BREAKDOWN BY CRITERIA:\n"
-                    f"   ┌─ Must-have Skills.........................: {must_have_score}/30 points\n"
-                    f"   ├─ Nice-to-have Skills.....................: {nice_to_have_score}/25 points\n"
-                    f"   ├─ Work Experience.........................: {experience_score}/20 points\n"
-                    f"   ├─ Education & Certifications..............: {education_score}/15 points\n"
-                    f"   ├─ Soft Skills.............................: {soft_skills_score}/10 points\n"
-                    f"   └─ TOTAL SCORE..............................: {total_score}/100 points\n\n"
-                )
-                
-                # Create clean, well-formatted CV evaluation response
-                cv_eval_answer = (
-                    f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-                    f"📊 DETAILED CV EVALUATION RESULT\n"
-                    f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-                    f"🎯 Position: {position['name']}\n"
-                    f"{'='*80}\n\n"
-                    f"📈 OVERALL SCORE:\n"
-                    f"   🏆 Total Points: {total_score}/100\n"
-                    f"   📊 Progress: {(total_score//20)*'█'}{'░'*(5-total_score//20)} ({total_score}%)\n"
-                    f"   ⭐ Rating: {rating}\n\n"
-                    f"✅ SKILLS FOUND ({len(found_skills)} skills):\n"
-                    f"   {', '.join(found_skills) if found_skills else '   ❌ No relevant skills found'}\n\n"
-                    f"⚠️ REQUIRED SKILLS MISSING ({len(missing_must_haves)} skills):\n"
-                    f"   {', '.join(missing_must_haves) if missing_must_haves else '   ✅ All required skills present'}\n"
-                    f"{detail_breakdown}"
-                    f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-                    f"💡 RECOMMENDATION:\n"
-                    f"   {('🌟 Excellent candidate! Perfect fit for this position with all required skills and experience.' if total_score >= 80 else '👍 Good candidate. Has core skills, consider improving additional technical skills.' if total_score >= 60 else '📚 Need significant skill development before applying for this position.')}\n"
-                    f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
-                )
+            detail_breakdown += (
+                f"\n📊 SCORE BREAKDOWN BY CRITERIA:\n"
+                f"   ┌─ Must-have Skills.........................: {must_have_score}/30 points\n"
+                f"   ├─ Nice-to-have Skills.....................: {nice_to_have_score}/25 points\n"
+                f"   ├─ Work Experience.........................: {experience_score}/20 points\n"
+                f"   ├─ Education & Certifications..............: {education_score}/15 points\n"
+                f"   ├─ Soft Skills.............................: {soft_skills_score}/10 points\n"
+                f"   └─ TOTAL SCORE..............................: {total_score}/100 points\n\n"
+            )
             
-            return ChatResponse(
-                answer=cv_eval_answer,
-                source_documents=[
-                    {
-                        "content": f"Position: {position['name']}, Required Skills: {', '.join(position['must_have'])}, Nice to Have: {', '.join(position['nice_to_have'])}",
-                        "source": "CV Evaluation System",
-                        "question": f"Evaluation for {position['name']}"
-                    }
-                ],
-                function_calls=[]
+            # Create clean, well-formatted CV evaluation response
+            cv_eval_answer = (
+                f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+                f"📊 DETAILED CV EVALUATION RESULT\n"
+                f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+                f"🎯 Position: {position['name']}\n"
+                f"{'='*80}\n\n"
+                f"📈 OVERALL SCORE:\n"
+                f"   🏆 Total Points: {total_score}/100\n"
+                f"   📊 Progress: {(total_score//20)*'█'}{'░'*(5-total_score//20)} ({total_score}%)\n"
+                f"   ⭐ Rating: {rating}\n\n"
+                f"✅ SKILLS FOUND ({len(found_skills)} skills):\n"
+                f"   {', '.join(found_skills) if found_skills else '   ❌ No relevant skills found'}\n\n"
+                f"⚠️ REQUIRED SKILLS MISSING ({len(missing_must_haves)} skills):\n"
+                f"   {', '.join(missing_must_haves) if missing_must_haves else '   ✅ All required skills present'}\n"
+                f"{detail_breakdown}"
+                f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+                f"💡 RECOMMENDATION:\n"
+                f"   {('🌟 Excellent candidate! Perfect fit for this position with all required skills and experience.' if total_score >= 80 else '👍 Good candidate. Has core skills, consider improving additional technical skills.' if total_score >= 60 else '📚 Need significant skill development before applying for this position.')}\n"
+                f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
             )
-    
-    # If RAG system is not initialized, provide a helpful response
-    if not llm or not retriever:
-        demo_response = (
-            "Welcome to the Internal HR Assistant! "
-            "I'm currently in demo mode because the Azure OpenAI credentials are not yet configured. "
-            "Please ensure your .env file has valid AZURE_OPENAI_* credentials and restart the server. "
-            "In demo mode, I can acknowledge your question: '" + request.message[:50] + "...' "
-            "but cannot provide actual HR information yet. "
-            "Restart the server once credentials are configured."
-        )
+        
         return ChatResponse(
-            answer=demo_response,
+            answer=cv_eval_answer,
             source_documents=[
                 {
-                    "content": "Demo mode - RAG system not initialized",
-                    "source": "system",
-                    "question": "Configuration Status"
+                    "content": f"Position: {position['name']}, Required Skills: {', '.join(position['must_have'])}, Nice to Have: {', '.join(position['nice_to_have'])}",
+                    "source": "CV Evaluation System",
+                    "question": f"Evaluation for {position['name']}"
                 }
             ],
             function_calls=[]
         )
     
-    try:
-        print(f"\n[CHAT] Processing message: '{request.message[:50]}...'")
-        print(f"[CHAT] Language: {request.language}")
-        
-        # Get relevant documents from vector store
-        # Use invoke() instead of get_relevant_documents() for newer LangChain versions
-        print("[1] Retrieving relevant documents...")
-        relevant_docs = retriever.invoke(request.message)
-        print(f"[OK] Found {len(relevant_docs)} documents")
-        
-        # Format context from documents
-        print("[2] Formatting context...")
-        context_str = "\n\n".join([
-            f"From FAQ: {doc.metadata.get('question', 'Unknown')}\n{doc.page_content[:300]}"
-            for doc in relevant_docs[:3]
-        ])
-        print(f"[OK] Context formatted ({len(context_str)} chars)")
-        
-        # Create prompt for LLM with language support
-        if request.language == 'vi':
-            system_prompt = (
-                "Bạn là một Trợ lý HR hữu ích của công ty Galacy Software. "
-                "Trả lời các câu hỏi về chính sách công ty, phúc lợi, quy trình và tuyển dụng. "
-                "Khi người dùng hỏi về đánh giá CV, gợi ý vị trí tuyển dụng, hoặc upload CV, "
-                "bạn nên gọi function get_job_positions để lấy danh sách vị trí, "
-                "rồi gọi function evaluate_cv_for_position để chấm điểm CV cho vị trí đó. "
-                "Hãy trả lời ngắn gọn, thân thiện bằng tiếng Việt."
-            )
+    return None
+
+
+def demo_mode_response(request: ChatRequest) -> ChatResponse:
+    """Response used while the RAG system is not initialized"""
+    demo_response = (
+        "Welcome to the Internal HR Assistant! "
+        "I'm currently in demo mode because the Azure OpenAI credentials are not yet configured. "
+        "Please ensure your .env file has valid AZURE_OPENAI_* credentials and restart the server. "
+        "In demo mode, I can acknowledge your question: '" + request.message[:50] + "...' "
+        "but cannot provide actual HR information yet. "
+        "Restart the server once credentials are configured."
+    )
+    return ChatResponse(
+        answer=demo_response,
+        source_documents=[
+            {
+                "content": "Demo mode - RAG system not initialized",
+                "source": "system",
+                "question": "Configuration Status"
+            }
+        ],
+        function_calls=[]
+    )
+
+
+async def answer_with_documents(request: ChatRequest, relevant_docs: list, budget: RequestBudget) -> ChatResponse:
+    """
+    Generate the answer for a message from already-retrieved documents.
+    
+    Args:
+        request: Chat request
+        relevant_docs: Documents retrieved for the message
+        budget: Latency budget of the request
+    
+    Returns:
+        ChatResponse with the LLM answer (or the keyword fallback answer)
+    """
+    # Not enough time left for an LLM call: answer from keyword fallback
+    if not budget.can_afford_llm():
+        print(f"[WARNING] Only {budget.remaining_ms():.0f} ms left, skipping LLM call")
+        METRICS.increment("chat.degraded_responses")
+        return ChatResponse(
+            answer=get_fallback_response(request.message, request.language),
+            source_documents=format_source_documents(relevant_docs, request.language),
+            function_calls=[]
+        )
+    
+    # Nothing relevant was retrieved: answer from keyword fallback if configured that way
+    if not relevant_docs and RETRIEVAL["low_relevance_mode"] == "fallback":
+        print("[2] No relevant context, answering from keyword fallback")
+        METRICS.increment("chat.low_relevance_fallbacks")
+        METRICS.observe("chat.latency", budget.elapsed_ms())
+        return ChatResponse(
+            answer=get_fallback_response(request.message, request.language),
+            source_documents=[],
+            function_calls=[]
+        )
+    
+    # Pack the retrieved chunks into the context token budget
+    print("[2] Formatting context...")
+    context = pack_context(relevant_docs)
+    context_str = context.text
+    print(f"[OK] Context packed: {context.tokens} tokens from {len(context.sources)} sources "
+          f"({context.chunks_used} chunks{', truncated' if context.truncated else ''})")
+    
+    # Create prompt for LLM with language support
+    if request.language == 'vi':
+        system_prompt = (
+            "Bạn là một Trợ lý HR hữu ích của công ty Galacy Software. "
+            "Trả lời các câu hỏi về chính sách công ty, phúc lợi, quy trình và tuyển dụng. "
+            "Khi người dùng hỏi về đánh giá CV, gợi ý vị trí tuyển dụng, hoặc upload CV, "
+            "bạn nên gọi function get_job_positions để lấy danh sách vị trí, "
+            "rồi gọi function evaluate_cv_for_position để chấm điểm CV cho vị trí đó. "
+            "Hãy trả lời ngắn gọn, thân thiện bằng tiếng Việt."
+        )
+        if relevant_docs:
             user_prompt = f"""Dựa trên thông tin HR sau, trả lời câu hỏi của người dùng bằng tiếng Việt:
 
 Ngữ cảnh:
@@ -1035,14 +1021,20 @@ Câu hỏi: {request.message}
 
 Trả lời:"""
         else:
-            system_prompt = (
-                "You are a helpful HR Assistant for Galacy Software. "
-                "Answer questions about company policies, benefits, procedures, and recruitment. "
-                "When users ask about CV evaluation, job positions, or CV upload, "
-                "you should call get_job_positions function to list available positions, "
-                "then call evaluate_cv_for_position function to score the CV for that position. "
-                "Be concise and friendly."
-            )
+            # Lean prompt: no FAQ context matched the question
+            user_prompt = f"""Câu hỏi: {request.message}
+
+Trả lời:"""
+    else:
+        system_prompt = (
+            "You are a helpful HR Assistant for Galacy Software. "
+            "Answer questions about company policies, benefits, procedures, and recruitment. "
+            "When users ask about CV evaluation, job positions, or CV upload, "
+            "you should call get_job_positions function to list available positions, "
+            "then call evaluate_cv_for_position function to score the CV for that position. "
+            "Be concise and friendly."
+        )
+        if relevant_docs:
             user_prompt = f"""Based on the following HR information, answer the user's question:
 
 Context:
@@ -1051,67 +1043,122 @@ Context:
 User Question: {request.message}
 
 Answer:"""
-        
-        # Get response from LLM
-        print("[3] Calling LLM...")
-        from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=user_prompt)
-        ]
-        
-        try:
-            response = llm.invoke(messages)
-            answer = response.content
-        except Exception as llm_error:
+        else:
+            # Lean prompt: no FAQ context matched the question
+            user_prompt = f"""User Question: {request.message}
+
+Answer:"""
+    
+    if not relevant_docs:
+        METRICS.increment("chat.lean_prompts")
+    
+    # Get response from LLM
+    print("[3] Calling LLM...")
+    from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+    messages = [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=user_prompt)
+    ]
+    token_usage = {"context_tokens": context.tokens, "prompt_tokens": count_message_tokens(messages)}
+    METRICS.increment("chat.prompts")
+    METRICS.increment("chat.context_tokens", context.tokens)
+    METRICS.increment("chat.prompt_tokens", token_usage["prompt_tokens"])
+    
+    try:
+        # The LLM call (and any tool calls it makes) may only use what is left of the request budget;
+        # the LLM requests themselves carry the deadline, so a timed-out call stops upstream too
+        response, function_calls = await asyncio.wait_for(
+            TOOL_EXECUTOR.run(functools.partial(invoke_llm, budget=budget), llm, messages),
+            timeout=budget.remaining()
+        )
+        answer = response.content
+    except Exception as llm_error:
+        if isinstance(llm_error, asyncio.TimeoutError):
+            print(f"[WARNING] LLM exceeded the latency budget ({budget.elapsed_ms():.0f} ms), using fallback response")
+            METRICS.increment("chat.llm_timeouts")
+        else:
             print(f"[WARNING] LLM failed ({str(llm_error)[:50]}...), using fallback response")
-            # Use the retrieved documents to provide a better fallback response
-            answer = get_fallback_response(request.message, request.language)
-            # Also ensure we return formatted sources from retrieval
-            formatted_sources = []
-            for doc in relevant_docs[:3]:
-                translated_question = translate_faq_question(
-                    doc.metadata.get("question", ""),
-                    request.language
-                )
-                formatted_sources.append({
-                    "content": doc.page_content[:200] + "..." if len(doc.page_content) > 200 else doc.page_content,
-                    "source": doc.metadata.get("source", "Unknown"),
-                    "question": translated_question
-                })
-            print(f"[OK] Fallback response provided with {len(formatted_sources)} sources")
-            print("[SUCCESS] Chat message processed with fallback\n")
-            return ChatResponse(
-                answer=answer,
-                source_documents=formatted_sources,
-                function_calls=[]
-            )
-        
-        print(f"[OK] Response received ({len(answer)} chars)")
-        
-        # Format source documents
-        print("[4] Formatting sources...")
-        formatted_sources = []
-        for doc in relevant_docs[:3]:
-            translated_question = translate_faq_question(
-                doc.metadata.get("question", ""),
-                request.language
-            )
-            formatted_sources.append({
-                "content": doc.page_content[:200] + "..." if len(doc.page_content) > 200 else doc.page_content,
-                "source": doc.metadata.get("source", "Unknown"),
-                "question": translated_question
-            })
-        print(f"[OK] {len(formatted_sources)} sources formatted")
-        
-        print("[SUCCESS] Chat message processed successfully\n")
-        
+        # Use the retrieved documents to provide a better fallback response
+        answer = get_fallback_response(request.message, request.language)
+        # Also ensure we return formatted sources from retrieval
+        formatted_sources = format_source_documents(relevant_docs, request.language)
+        print(f"[OK] Fallback response provided with {len(formatted_sources)} sources")
+        print("[SUCCESS] Chat message processed with fallback\n")
         return ChatResponse(
             answer=answer,
             source_documents=formatted_sources,
             function_calls=[]
         )
     
+    print(f"[OK] Response received ({len(answer)} chars)")
+    
+    # Format source documents
+    print("[4] Formatting sources...")
+    formatted_sources = format_source_documents(relevant_docs, request.language)
+    print(f"[OK] {len(formatted_sources)} sources formatted")
+    
+    total_tokens = get_token_usage(response)
+    if total_tokens is not None:
+        token_usage["total_tokens"] = total_tokens
+    
+    METRICS.observe("chat.latency", budget.elapsed_ms())
+    print(f"[SUCCESS] Chat message processed successfully in {budget.elapsed_ms():.0f} ms\n")
+    
+    return ChatResponse(
+        answer=answer,
+        source_documents=formatted_sources,
+        function_calls=function_calls,
+        token_usage=token_usage
+    )
+
+
+@app.post("/api/chat")
+async def chat(request: ChatRequest) -> ChatResponse:
+    """
+    Main chat endpoint.
+    Processes user message through RAG and returns response with context.
+    """
+    if not request.message or not request.message.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="Message cannot be empty"
+        )
+    
+    special_response = route_special_request(request)
+    if special_response is not None:
+        return special_response
+    
+    stored_response = answer_from_store(request)
+    if stored_response is not None:
+        return stored_response
+    
+    # If RAG system is not initialized, provide a helpful response
+    if not llm or not retriever:
+        return demo_mode_response(request)
+    
+    budget = RequestBudget.for_request(request.deadline_ms)
+    
+    try:
+        print(f"\n[CHAT] Processing message: '{request.message[:50]}...'")
+        print(f"[CHAT] Language: {request.language}")
+        print(f"[CHAT] Latency budget: {budget.deadline_ms} ms")
+        
+        # Get relevant documents from vector store
+        # Use invoke() instead of get_relevant_documents() for newer LangChain versions
+        print("[1] Retrieving relevant documents...")
+        try:
+            relevant_docs = await asyncio.wait_for(
+                retrieve_documents(request.message, request.language, budget),
+                timeout=budget.remaining()
+            )
+            print(f"[OK] Found {len(relevant_docs)} documents")
+        except asyncio.TimeoutError:
+            print(f"[WARNING] Retrieval exceeded the latency budget ({budget.elapsed_ms():.0f} ms)")
+            METRICS.increment("chat.retrieval_timeouts")
+            relevant_docs = []
+        
+        return await answer_with_documents(request, relevant_docs, budget)
+    
     except Exception as e:
         error_msg = f"Error processing message: {str(e)}"
         print(f"\n[ERROR] {error_msg}")
@@ -1119,6 +1166,119 @@ Answer:"""
         raise HTTPException(status_code=500, detail=error_msg)
 
 
+@app.post("/api/chat/batch")
+async def chat_batch(request: BatchChatRequest) -> BatchChatResponse:
+    """
+    Answer a list of chat requests in one call.
+    Identical questions are answered once, retrieval for all questions runs as a
+    single vectorized FAISS search, and LLM calls run concurrently with a
+    bounded fan-out. Results are returned in request order.
+    """
+    max_batch_size = int(os.getenv("CHAT_BATCH_MAX_SIZE", "50"))
+    max_concurrency = int(os.getenv("CHAT_BATCH_MAX_CONCURRENCY", "4"))
+    
+    if not request.requests:
+        raise HTTPException(status_code=400, detail="Batch must contain at least one request")
+    if len(request.requests) > max_batch_size:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch too large: {len(request.requests)} requests (max {max_batch_size})"
+        )
+    if any(not item.message or not item.message.strip() for item in request.requests):
+        raise HTTPException(status_code=400, detail="Message cannot be empty")
+    
+    # Deduplicate identical questions (same text and language)
+    unique_requests = []
+    unique_positions = {}
+    order = []
+    for item in request.requests:
+        key = (item.message.strip(), item.language)
+        if key not in unique_positions:
+            unique_positions[key] = len(unique_requests)
+            unique_requests.append(item)
+        order.append(unique_positions[key])
+    print(f"\n[BATCH] {len(request.requests)} requests ({len(unique_requests)} unique)")
+    METRICS.increment("chat.batch_requests")
+    METRICS.increment("chat.batch_duplicates", len(request.requests) - len(unique_requests))
+    
+    try:
+        responses = [route_special_request(item) or answer_from_store(item) for item in unique_requests]
+        rag_positions = [i for i, response in enumerate(responses) if response is None]
+        
+        if rag_positions and (not llm or not retriever):
+            for i in rag_positions:
+                responses[i] = demo_mode_response(unique_requests[i])
+            rag_positions = []
+        
+        if rag_positions:
+            # The shared retrieval step runs under the longest deadline of the batch
+            retrieval_budget = max(
+                (RequestBudget.for_request(unique_requests[i].deadline_ms) for i in rag_positions),
+                key=lambda budget: budget.deadline
+            )
+            
+            # One embeddings request and one FAISS search per language index
+            positions_by_language = {}
+            for i in rag_positions:
+                positions_by_language.setdefault(unique_requests[i].language, []).append(i)
+            print(f"[BATCH] Retrieving documents for {len(rag_positions)} questions...")
+            try:
+                search_results = await asyncio.wait_for(
+                    asyncio.gather(*[
+                        asyncio.to_thread(
+                            batch_similarity_search,
+                            get_vector_store(language),
+                            [unique_requests[i].message for i in positions],
+                            3,
+                            retrieval_budget.remaining()
+                        )
+                        for language, positions in positions_by_language.items()
+                    ]),
+                    timeout=retrieval_budget.remaining()
+                )
+                docs_by_position = {
+                    i: select_relevant_documents(docs)
+                    for positions, results in zip(positions_by_language.values(), search_results)
+                    for i, docs in zip(positions, results)
+                }
+            except asyncio.TimeoutError:
+                print("[WARNING] Batch retrieval exceeded the latency budget")
+                METRICS.increment("chat.retrieval_timeouts")
+                docs_by_position = {i: [] for i in rag_positions}
+            
+            # Bounded fan-out for the LLM calls
+            concurrency = max(1, min(request.max_concurrency or max_concurrency, max_concurrency))
+            semaphore = asyncio.Semaphore(concurrency)
+            
+            async def answer(i: int) -> ChatResponse:
+                async with semaphore:
+                    # Each question's LLM budget starts once it has a slot: time queued behind
+                    # earlier waves must not push the later ones into the keyword fallback
+                    budget = RequestBudget.for_request(unique_requests[i].deadline_ms)
+                    return await answer_with_documents(unique_requests[i], docs_by_position[i], budget)
+            
+            print(f"[BATCH] Generating {len(rag_positions)} answers (concurrency {concurrency})...")
+            answers = await asyncio.gather(*[answer(i) for i in rag_positions])
+            for i, response in zip(rag_positions, answers):
+                responses[i] = response
+        
+        return BatchChatResponse(results=[responses[i] for i in order])
+    
+    except Exception as e:
+        error_msg = f"Error processing batch: {str(e)}"
+        print(f"\n[ERROR] {error_msg}")
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=error_msg)
+
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """Get in-process counters, latency summaries and quota scheduler state"""
+    snapshot = METRICS.snapshot()
+    snapshot["quota"] = {name: get_scheduler(name).stats() for name in ("llm", "embedding")}
+    return snapshot
+
+
 @app.get("/api/faq")
 async def get_faq_count():
     """
@@ -1132,7 +1292,8 @@ async def get_faq_count():
         
         return {
             "total_faqs": faq_count,
-            "vector_store_ready": vector_store is not None
+            "vector_store_ready": vector_store is not None,
+            "indexed_languages": sorted(vector_stores)
         }
     except Exception as e:
         return {
@@ -1209,7 +1370,8 @@ async def evaluate_cv_for_position_endpoint(request: CVRequest):
         )
     
     position = JOB_POSITIONS[position_key]
-    cv_lower = cv_text.lower()
+    cv_features = extract_cv_features(cv_text)
+    remember_candidate(cv_text, cv_features, source="api")
     
     # Score calculation
     must_have_score = 0
@@ -1219,7 +1381,7 @@ async def evaluate_cv_for_position_endpoint(request: CVRequest):
     
     # Check must-have skills
     for skill in position["must_have"]:
-        if skill.lower() in cv_lower:
+        if cv_features.has(skill):
             must_have_score += 15
             found_skills.append(skill)
         else:
@@ -1227,34 +1389,25 @@ async def evaluate_cv_for_position_endpoint(request: CVRequest):
     
     # Check nice-to-have skills
     for skill in position["nice_to_have"]:
-        if skill.lower() in cv_lower:
+        if cv_features.has(skill):
             nice_to_have_score += 5
             found_skills.append(skill)
     
     # Experience score
     experience_score = 5
-    if "senior" in cv_lower or "lead" in cv_lower:
+    if cv_features.seniority == "Senior":
         experience_score = 20
-    elif any(f"{i}+ years" in cv_lower or f"{i} years" in cv_lower for i in range(3, 10)):
+    elif cv_features.years_experience >= 3:
         experience_score = 15
     
     # Education score
-    education_score = 0
-    if "bachelor" in cv_lower or "b.s." in cv_lower:
-        education_score = 15
-    if "master" in cv_lower or "m.s." in cv_lower:
-        education_score = 10
-    if "certification" in cv_lower or "certified" in cv_lower:
+    education_score = 15 if cv_features.degree_rank else 0
+    if cv_features.certified:
         education_score += 5
     education_score = min(education_score, 25)
     
     # Soft skills
-    soft_skills_score = 0
-    soft_skills = ["communication", "leadership", "teamwork", "problem solving"]
-    for skill in soft_skills:
-        if skill in cv_lower:
-            soft_skills_score += 3
-    soft_skills_score = min(soft_skills_score, 20)
+    soft_skills_score = min(3 * cv_features.count(["communication", "leadership", "teamwork", "problem solving"]), 20)
     
     # Total score
     total_score = must_have_score + nice_to_have_score + experience_score + education_score + soft_skills_score
@@ -1284,6 +1437,229 @@ async def evaluate_cv_for_position_endpoint(request: CVRequest):
     }
 
 
+@app.get("/api/candidates/search")
+async def search_candidates(position: str | None = None, skills: str = "", any_skills: str = "",
+                            min_years: float = 0, limit: int = 20):
+    """
+    Find the best evaluated candidates.
+    
+    Args:
+        position: Position key to rank by (each candidate's best position if omitted)
+        skills: Comma-separated skills a candidate must all have
+        any_skills: Comma-separated skills a candidate must have at least one of
+        min_years: Minimum years of experience
+        limit: Number of candidates returned (at most 100)
+    """
+    try:
+        return await asyncio.to_thread(
+            CANDIDATE_STORE.search,
+            position,
+            [skill for skill in skills.split(",") if skill.strip()],
+            [skill for skill in any_skills.split(",") if skill.strip()],
+            min_years,
+            max(1, min(limit, 100)),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/candidates/{candidate_id}")
+async def get_candidate(candidate_id: int):
+    """Get an evaluated candidate with the score for every position"""
+    candidate = await asyncio.to_thread(CANDIDATE_STORE.get, candidate_id)
+    if candidate is None:
+        raise HTTPException(status_code=404, detail=f"Candidate {candidate_id} not found")
+    return candidate
+
+
+@app.get("/api/admin/candidates")
+async def get_candidate_store_status():
+    """Get how many evaluated candidates are stored, the position versions and the re-scoring job progress"""
+    return await asyncio.to_thread(CANDIDATE_STORE.stats)
+
+
+@app.post("/api/admin/candidates/rescore")
+async def rescore_candidates_endpoint(full: bool = False):
+    """
+    Start re-scoring the stored candidates in the background.
+    
+    Args:
+        full: Re-score every candidate for every position (by default only the
+            outdated scores of changed positions)
+    """
+    if CANDIDATE_STORE.job["state"] == "running":
+        raise HTTPException(status_code=409, detail="A re-scoring job is already running")
+    if full:
+        CANDIDATE_STORE.plan_full_rescore()
+    if CANDIDATE_STORE.pending:
+        asyncio.get_running_loop().run_in_executor(None, rescore_candidates)
+    return {"started": bool(CANDIDATE_STORE.pending), "stale_positions": CANDIDATE_STORE.stale_positions}
+
+
+@app.get("/api/suggest")
+async def suggest(q: str = "", language: str = "en", limit: int = 5):
+    """
+    Get autocomplete suggestions (known FAQ questions, CV checks, employee leave questions).
+    """
+    if suggestion_index is None:
+        return {"query": q, "suggestions": [], "ready": False}
+    return {"query": q, "suggestions": suggestion_index.suggest(q, language, max(1, min(limit, 10))), "ready": True}
+
+
+async def generate_faq_answer(question) -> dict | None:
+    """
+    Answer a canonical FAQ question through the chat pipeline, for the answer store.
+    
+    Returns:
+        Dict with answer, source_documents and model, or None if the LLM did not answer
+    """
+    request = ChatRequest(message=question.question, language=question.language)
+    budget = RequestBudget.for_request(get_budget_settings()["max_deadline_ms"])
+    relevant_docs = await retrieve_documents(request.message, request.language, budget)
+    response = await answer_with_documents(request, relevant_docs, budget)
+    # Fallback answers come without token usage; answers built on tool calls may change with the data
+    if response.token_usage is None or response.function_calls:
+        return None
+    return {
+        "answer": response.answer,
+        "source_documents": response.source_documents,
+        "model": getattr(llm, "deployment_name", None) or type(llm).__name__,
+    }
+
+
+ANSWER_REBUILD_LOCK = asyncio.Lock()
+
+
+async def rebuild_answer_store(force: bool = False, languages: list[str] | None = None) -> dict:
+    """Reload the FAQ questions and generate answers for the new and changed ones"""
+    ANSWER_STORE.load()
+    return await ANSWER_STORE.build(generate_faq_answer, force=force, languages=languages)
+
+
+@app.get("/api/admin/answers")
+async def get_answer_store_status():
+    """Get how many precomputed FAQ answers are stored and how many are outdated"""
+    return ANSWER_STORE.stats()
+
+
+@app.post("/api/admin/answers/rebuild")
+async def rebuild_answers(force: bool = False, language: str | None = None):
+    """
+    Generate the precomputed answers of new and changed FAQ rows.
+    
+    Args:
+        force: Regenerate every answer
+        language: Only build this language ("en" or "vi")
+    """
+    if not llm or not retriever:
+        raise HTTPException(status_code=503, detail="RAG system is not initialized")
+    if ANSWER_REBUILD_LOCK.locked():
+        raise HTTPException(status_code=409, detail="A rebuild is already running")
+    async with ANSWER_REBUILD_LOCK:
+        return await rebuild_answer_store(force, [language] if language else None)
+
+
+class HandbookIngestRequest(BaseModel):
+    """Request model for handbook ingestion (file names in HANDBOOK_DIR; all files if empty)"""
+    files: list[str] = []
+    force: bool = False
+
+
+@app.get("/api/admin/handbooks")
+async def get_handbooks():
+    """Get the policy handbooks in the RAG index"""
+    documents = read_manifest(HANDBOOK_INDEX_PATH).get("documents", {})
+    return {
+        "directory": get_handbook_settings()["directory"],
+        "handbooks": [
+            {"name": name, "title": info["title"], "type": info["type"], "pages": info["pages"],
+             "chunks": len(info["doc_ids"])}
+            for name, info in documents.items()
+        ],
+    }
+
+
+@app.post("/api/admin/handbooks/ingest")
+async def ingest_handbooks_endpoint(request: HandbookIngestRequest):
+    """
+    Extract and index the policy handbooks of HANDBOOK_DIR, then reload the RAG indexes.
+    Unchanged handbooks are skipped unless force is set.
+    """
+    directory = get_handbook_settings()["directory"]
+    paths = None
+    if request.files:
+        # Only files of the handbook directory can be ingested
+        paths = [os.path.join(directory, os.path.basename(name)) for name in request.files]
+        missing = [os.path.basename(path) for path in paths if not os.path.isfile(path)]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Handbooks not found in {directory}: {', '.join(missing)}")
+    embeddings = vector_store.embedding_function if vector_store is not None else None
+    summary = await asyncio.to_thread(ingest_handbooks, paths, request.force, None, embeddings)
+    if summary["ingested"] or summary["removed"]:
+        await init_system()
+    return summary
+
+
+class LeaveBalanceUpdate(BaseModel):
+    """Request model for changing an employee's leave balance (set a value or apply a delta)"""
+    leave_balance: float | None = None
+    delta: float | None = None
+
+
+# The leave handlers are plain functions: FastAPI runs them in its threadpool, so the
+# directory's SQLite reads and writes (and its first CSV import) never block the event loop
+@app.get("/api/leave/departments")
+def get_department_leave():
+    """Get leave totals for every department from the precomputed rollup"""
+    return {"departments": get_directory().department_leave_summary()}
+
+
+@app.get("/api/leave/departments/{department}")
+def get_department_leave_detail(department: str, threshold: float | None = None, limit: int = 50):
+    """
+    Get leave totals for one department, optionally with its employees below a threshold.
+    """
+    directory = get_directory()
+    summary = directory.department_leave_summary(department)
+    if not summary:
+        raise HTTPException(status_code=404, detail=f"Department '{department}' not found")
+    result = summary[0]
+    if threshold is not None:
+        result["below_threshold"] = directory.employees_below(threshold, department, max(1, min(limit, 500)))
+    return result
+
+
+@app.get("/api/leave/low")
+def get_employees_low_on_leave(threshold: float = 3, department: str | None = None, limit: int = 50):
+    """Get employees with fewer than `threshold` days of leave, lowest first"""
+    employees = get_directory().employees_below(threshold, department, max(1, min(limit, 500)))
+    return {"threshold": threshold, "department": department, "employees": employees}
+
+
+@app.get("/api/leave/top")
+def get_top_leave_balances(n: int = 5, department: str | None = None, lowest: bool = False):
+    """Get the employees with the highest (or, with lowest=true, the lowest) leave balances"""
+    employees = get_directory().top_leave_balances(max(1, min(n, 500)), department, lowest)
+    return {"department": department, "lowest": lowest, "employees": employees}
+
+
+@app.patch("/api/leave/{employee_id}")
+def update_leave_balance(employee_id: str, update: LeaveBalanceUpdate):
+    """
+    Set or adjust an employee's leave balance; the department rollup is updated with it.
+    """
+    if (update.leave_balance is None) == (update.delta is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of leave_balance or delta")
+    directory = get_directory()
+    if update.delta is not None:
+        employee = directory.adjust_leave_balance(employee_id, update.delta)
+    else:
+        employee = directory.set_leave_balance(employee_id, update.leave_balance)
+    if employee is None:
+        raise HTTPException(status_code=404, detail=f"Employee '{employee_id}' not found")
+    return {"employee": employee, "department": directory.department_leave_summary(employee["department"])[0]}
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
@@ -1293,10 +1669,26 @@ async def root():
         "endpoints": {
             "health": "GET /api/health",
             "chat": "POST /api/chat",
+            "chat-batch": "POST /api/chat/batch",
             "faq": "GET /api/faq",
+            "metrics": "GET /api/metrics",
+            "suggest": "GET /api/suggest",
+            "answers-status": "GET /api/admin/answers",
+            "answers-rebuild": "POST /api/admin/answers/rebuild",
+            "handbooks": "GET /api/admin/handbooks",
+            "handbooks-ingest": "POST /api/admin/handbooks/ingest",
             "evaluate-cv": "POST /api/evaluate-cv",
             "job-positions": "GET /api/job-positions",
-            "evaluate-cv-for-position": "POST /api/evaluate-cv-for-position"
+            "evaluate-cv-for-position": "POST /api/evaluate-cv-for-position",
+            "candidates-search": "GET /api/candidates/search",
+            "candidate": "GET /api/candidates/{candidate_id}",
+            "candidates-status": "GET /api/admin/candidates",
+            "candidates-rescore": "POST /api/admin/candidates/rescore",
+            "leave-departments": "GET /api/leave/departments",
+            "leave-department": "GET /api/leave/departments/{department}",
+            "leave-low": "GET /api/leave/low",
+            "leave-top": "GET /api/leave/top",
+            "leave-update": "PATCH /api/leave/{employee_id}"
         },
         "docs": "/docs"
     }
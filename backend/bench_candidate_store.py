@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark the candidate store.
+Stores a pool of synthetic candidates in a temporary SQLite database, reloads
+it as a restarted app does, then times recruiter queries (boolean skill
+filters, minimum years, top K for a position or overall) on the in-memory
+postings against the same query in SQL over the candidate_skills and
+candidate_scores tables, checking both return the same candidates.
+Finally edits two positions (a must-have added, a nice-to-have dropped) and
+times the incremental re-scoring job against a full re-scoring and against
+extracting every CV again, checking the scores equal a fresh matrix scoring.
+
+Usage:
+    python bench_candidate_store.py [--candidates 100000] [--limit 20] [--repeat 20]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_skill_matrix import synthetic_cv
+from candidate_store import CandidateStore
+from company_data import JOB_POSITIONS
+from cv_features import extract_cv_features
+from cv_scoring import score_matrix
+
+QUERIES = [
+    ("python_developer", [], [], 0),
+    ("python_developer", ["Python", "Docker"], [], 3),
+    ("devops_engineer", ["Docker", "Kubernetes", "Terraform"], [], 5),
+    ("data_engineer", ["SQL"], ["Spark", "Airflow", "Hadoop"], 2),
+    (None, ["React", "TypeScript"], [], 0),
+]
+
+
+def sql_search(store: CandidateStore, position, skills, any_skills, min_years, limit) -> list[int]:
+    """The same query answered by SQLite from the inverted index and score tables"""
+    clauses = ["c.years_experience >= ?"]
+    params = [min_years]
+    for skill in skills:
+        clauses.append("s.candidate_id IN (SELECT candidate_id FROM candidate_skills WHERE skill = ?)")
+        params.append(skill)
+    if any_skills:
+        clauses.append(f"s.candidate_id IN (SELECT candidate_id FROM candidate_skills WHERE skill IN "
+                       f"({', '.join('?' * len(any_skills))}))")
+        params += any_skills
+    if position:
+        clauses.append("s.position = ?")
+        params.append(position)
+    query = (f"SELECT s.candidate_id, MAX(s.score) AS best FROM candidate_scores s JOIN candidates c ON c.id = s.candidate_id "
+             f"WHERE {' AND '.join(clauses)} GROUP BY s.candidate_id ORDER BY best DESC, s.candidate_id LIMIT ?")
+    return [row[0] for row in store._connect().execute(query, params + [limit])]
+
+
+def edited_positions() -> dict:
+    """JOB_POSITIONS with Redis made a Python Developer must-have and a Data Engineer nice-to-have dropped"""
+    positions = {key: {**position, "must_have": list(position["must_have"]), "nice_to_have": list(position["nice_to_have"])}
+                 for key, position in JOB_POSITIONS.items()}
+    python_developer = positions["python_developer"]
+    python_developer["must_have"].append("Redis")
+    if "Redis" in python_developer["nice_to_have"]:
+        python_developer["nice_to_have"].remove("Redis")
+    positions["data_engineer"]["nice_to_have"].pop()
+    return positions
+
+
+def timed(run, repeat: int):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = run()
+    return result, (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the candidate store")
+    parser.add_argument("--candidates", type=int, default=100000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20, help="Runs averaged per in-memory query")
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "candidates.db")
+        store = CandidateStore(path)
+        store.load()
+        started = time.perf_counter()
+        texts = [f"Candidate {i}\n{synthetic_cv(rng)}" for i in range(args.candidates)]
+        features = [extract_cv_features(text) for text in texts]
+        extract_s = time.perf_counter() - started
+        started = time.perf_counter()
+        store.add_many([(f, None, "bench", str(i)) for i, f in enumerate(features)])
+        store_s = time.perf_counter() - started
+        print(f"{args.candidates} candidates: features extracted in {extract_s:.1f} s, "
+              f"stored in {store_s:.1f} s ({os.path.getsize(path) / 1e6:.0f} MB)")
+
+        reloaded = CandidateStore(path)
+        _, load_s = timed(reloaded.load, 1)
+        print(f"Reloaded (postings, years, {len(reloaded.positions.keys)} position scores) in {load_s * 1000:.0f} ms\n")
+
+        print(f"{'query':<58}{'matches':>9}{'memory ms':>11}{'SQL ms':>9}")
+        for position, skills, any_skills, min_years in QUERIES:
+            result, memory_s = timed(
+                lambda: reloaded.search(position, skills, any_skills, min_years, args.limit), args.repeat
+            )
+            expected, sql_s = timed(
+                lambda: sql_search(reloaded, position, skills, any_skills, min_years, args.limit), 1
+            )
+            found = [candidate["id"] for candidate in result["candidates"]]
+            assert found == expected, (position, skills, found, expected)
+            label = f"{position or 'any position'}: {' & '.join(skills) or 'all'}"
+            if any_skills:
+                label += f" & ({' | '.join(any_skills)})"
+            if min_years:
+                label += f", {min_years}+ years"
+            print(f"{label:<58}{result['matches']:>9}{memory_s * 1000:>11.2f}{sql_s * 1000:>9.1f}")
+        print(f"\n(top {args.limit} of each; the in-memory and SQL results are the same candidates in the same order)\n")
+
+        edited = CandidateStore(path, positions=edited_positions())
+        edited.load()
+        job, incremental_s = timed(edited.rescore, 1)
+        totals, missing = score_matrix(edited.skills, edited.bases, edited.positions)
+        assert (totals == edited.totals).all() and (missing == edited.missing).all(), "re-scored scores differ"
+        edited.plan_full_rescore()
+        full, full_s = timed(edited.rescore, 1)
+        print(f"Edited {', '.join(job['positions'])} (scores equal a fresh matrix scoring):")
+        print(f"  {'incremental job':<34}{incremental_s:>7.2f} s  ({job['scores']} scores re-scored, "
+              f"{job['shifted']} missing counts shifted)")
+        print(f"  {'full re-scoring job':<34}{full_s:>7.2f} s  ({full['scores']} scores)")
+        print(f"  {'re-extracting and storing every CV':<34}{extract_s + store_s:>7.2f} s  (CV files not read)")
+
+
+if __name__ == "__main__":
+    main()
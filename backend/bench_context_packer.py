@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark the context packer against the legacy context construction
+(first 300 characters of each of the top 3 chunks).
+Retrieval is simulated with a word-overlap ranking over two chunk sets: the
+HR FAQ as indexed today, and longer policy documents made of several FAQ
+answers (so one source is split into overlapping chunks). Reports context
+tokens, chunks repeating an already included source and passages cut
+mid-sentence.
+
+Usage:
+    python bench_context_packer.py [--corpus data/message_corpus.jsonl] [--budget 600]
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+sys.path.insert(0, os.path.dirname(__file__))
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from chain_setup import load_hr_faq_documents
+from context_packer import pack_context
+from token_utils import count_tokens
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def legacy_context(docs: list) -> str:
+    """Context construction used by chat() before the packer"""
+    return "\n\n".join([
+        f"From FAQ: {doc.metadata.get('question', 'Unknown')}\n{doc.page_content[:300]}"
+        for doc in docs[:3]
+    ])
+
+
+def split(documents: list) -> list:
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=500, chunk_overlap=100, separators=["\n\n", "\n", " ", ""], add_start_index=True
+    )
+    return splitter.split_documents(documents)
+
+
+def policy_documents(faq_documents: list, per_document: int = 5) -> list:
+    """Longer documents made of consecutive FAQ entries"""
+    documents = []
+    for start in range(0, len(faq_documents), per_document):
+        group = faq_documents[start:start + per_document]
+        title = f"HR Policy Handbook part {start // per_document + 1}"
+        content = "\n".join(doc.page_content.replace("\n\n", " ") for doc in group)
+        documents.append(Document(page_content=content, metadata={"source": "HR Handbook", "question": title}))
+    return documents
+
+
+def top_chunks(message: str, chunks: list, k: int = 3) -> list:
+    """Word-overlap ranking standing in for the vector search"""
+    words = set(_WORD_RE.findall(message.lower()))
+    scored = sorted(
+        chunks,
+        key=lambda chunk: -len(words & set(_WORD_RE.findall(chunk.page_content.lower()))),
+    )
+    return scored[:k]
+
+
+def duplicate_sources(docs: list) -> int:
+    """Top chunks whose source already appeared in an earlier chunk (a repeated header and question)"""
+    keys = [doc.metadata.get("question") for doc in docs[:3]]
+    return len(keys) - len(set(keys))
+
+
+def cut_mid_sentence(sections: list[str]) -> int:
+    return sum(1 for section in sections if section.rstrip()[-1:] not in ".!?…")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark context packing")
+    parser.add_argument("--corpus", default=os.path.join(os.path.dirname(__file__), "data", "message_corpus.jsonl"))
+    parser.add_argument("--budget", type=int, default=600)
+    args = parser.parse_args()
+
+    with open(args.corpus, "r", encoding="utf-8") as f:
+        messages = [json.loads(line)["message"] for line in f if line.strip()]
+
+    faq_documents = load_hr_faq_documents()
+    chunk_sets = {
+        "HR FAQ": split(faq_documents),
+        "policy documents": split(policy_documents(faq_documents)),
+    }
+
+    print(f"{len(messages)} messages, context budget {args.budget} tokens\n")
+    print(f"{'chunk set':<18}{'legacy tok':>11}{'packed tok':>11}{'dup sources':>12}{'legacy cut':>11}{'packed cut':>11}")
+    for name, chunks in chunk_sets.items():
+        legacy_tokens = packed_tokens = duplicates = legacy_cuts = packed_cuts = 0
+        for message in messages:
+            docs = top_chunks(message, chunks)
+            legacy = legacy_context(docs)
+            packed = pack_context(docs, max_tokens=args.budget)
+            legacy_tokens += count_tokens(legacy)
+            packed_tokens += packed.tokens
+            duplicates += duplicate_sources(docs)
+            legacy_cuts += cut_mid_sentence(legacy.split("\n\nFrom FAQ: "))
+            packed_cuts += cut_mid_sentence(packed.text.split("\n\nFrom FAQ: "))
+        n = len(messages)
+        print(f"{name:<18}{legacy_tokens / n:>11.1f}{packed_tokens / n:>11.1f}{duplicates / n:>12.2f}"
+              f"{legacy_cuts / n:>11.2f}{packed_cuts / n:>11.2f}")
+    print("\n(tok = average context tokens, dup sources = average chunks per prompt from an already included"
+          "\n source, cut = average passages per prompt ending mid-sentence)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark DOCX text extraction.
+Writes a corpus of synthetic CVs (summary, experience and a skills table) and
+one long handbook, then extracts them with the python-docx object model (the
+legacy doc.paragraphs walk, which skips tables) and with the streaming
+extractor. Each extractor runs in a fresh process and reports the growth of
+its peak resident memory (VmHWM, reset before the run) over the memory in use
+before it: python-docx keeps its tree in lxml, outside what tracemalloc sees.
+Linux only.
+
+Usage:
+    python bench_docx_extraction.py [--cvs 300] [--pages 300]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import subprocess
+sys.path.insert(0, os.path.dirname(__file__))
+
+SKILLS = ["Python", "SQL", "Docker", "Kubernetes", "React", "TypeScript", "AWS", "Terraform", "Go", "Java",
+          "Spark", "Airflow", "PostgreSQL", "Redis", "GraphQL", "FastAPI", "Django", "Figma", "Excel", "Tableau"]
+
+
+def write_cv(path: str, rng: random.Random):
+    from docx import Document
+    document = Document()
+    document.add_heading(f"Candidate {rng.randint(1000, 9999)}", level=1)
+    document.add_paragraph(f"Software engineer with {rng.randint(1, 15)} years of experience building "
+                           "web services, data pipelines and internal tools for HR and finance teams.")
+    for job in range(rng.randint(2, 5)):
+        document.add_heading(f"Engineer, Company {job}", level=2)
+        for _ in range(rng.randint(3, 6)):
+            document.add_paragraph(f"Delivered {' and '.join(rng.sample(SKILLS, 2))} projects for "
+                                   f"{rng.randint(2, 40)} internal customers.", style="List Bullet")
+    skills = rng.sample(SKILLS, rng.randint(5, 12))
+    table = document.add_table(rows=len(skills) + 1, cols=3)
+    for column, header in enumerate(("Skill", "Years", "Level")):
+        table.cell(0, column).text = header
+    for row, skill in enumerate(skills, start=1):
+        table.cell(row, 0).text = skill
+        table.cell(row, 1).text = str(rng.randint(1, 10))
+        table.cell(row, 2).text = rng.choice(["Beginner", "Intermediate", "Expert"])
+    document.save(path)
+
+
+def legacy_extract(data: bytes) -> str:
+    import io
+    from docx import Document
+    return "\n".join(paragraph.text for paragraph in Document(io.BytesIO(data)).paragraphs).strip()
+
+
+def streaming_extract(data: bytes) -> str:
+    from cv_extractor import iter_docx_paragraphs
+    return "\n".join(text for _, text in iter_docx_paragraphs(data)).strip()
+
+
+def memory_kb(field: str) -> int:
+    with open("/proc/self/status", "r") as f:
+        for line in f:
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1])
+    return 0
+
+
+def measure(extractor: str, paths: list[str]):
+    """Run one extractor over the files (in this process) and print its stats as JSON"""
+    files = []
+    for path in paths:
+        with open(path, "rb") as f:
+            files.append(f.read())
+    extract = legacy_extract if extractor == "python-docx" else streaming_extract
+    # An untimed run loads the extractor's modules, so only the extraction is measured
+    extract(files[0])
+    # Resets the peak resident memory to the current one
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    baseline = memory_kb("VmRSS")
+    started = time.perf_counter()
+    characters = sum(len(extract(data)) for data in files)
+    elapsed = time.perf_counter() - started
+    peak = memory_kb("VmHWM") - baseline
+    print(json.dumps({"elapsed": elapsed, "peak_kb": peak, "characters": characters}))
+
+
+def run(extractor: str, paths: list[str]) -> dict:
+    output = subprocess.run(
+        [sys.executable, __file__, "--measure", extractor, *paths], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DOCX text extraction")
+    parser.add_argument("--cvs", type=int, default=300)
+    parser.add_argument("--pages", type=int, default=300, help="Pages of the long handbook")
+    parser.add_argument("--measure", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("paths", nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        measure(args.measure, args.paths)
+        return
+
+    from bench_handbooks import write_docx
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cvs = []
+        for i in range(args.cvs):
+            cvs.append(os.path.join(temp_dir, f"cv_{i}.docx"))
+            write_cv(cvs[-1], rng)
+        handbook = os.path.join(temp_dir, "handbook.docx")
+        write_docx(handbook, args.pages)
+        print(f"{args.cvs} CVs ({sum(os.path.getsize(p) for p in cvs) / 1e6:.1f} MB), "
+              f"{args.pages}-page handbook ({os.path.getsize(handbook) / 1e6:.1f} MB)\n")
+
+        print(f"{'corpus':<12}{'extractor':<14}{'time s':>9}{'docs/s':>9}{'peak RSS MB':>13}{'characters':>12}")
+        for corpus, paths in (("CVs", cvs), ("handbook", [handbook])):
+            for extractor in ("python-docx", "streaming"):
+                stats = run(extractor, paths)
+                print(f"{corpus:<12}{extractor:<14}{stats['elapsed']:>9.2f}{len(paths) / stats['elapsed']:>9.0f}"
+                      f"{stats['peak_kb'] / 1024:>13.1f}{stats['characters']:>12}")
+    print("\n(python-docx characters exclude table cells, which doc.paragraphs does not contain)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark employee directory lookups on a large synthetic directory.
+Builds an in-memory SQLite directory (100k employees by default) and reports
+the average time of each lookup type and leave aggregation used by the HR tools.
+
+Usage:
+    python bench_employee_directory.py [--employees 100000] [--lookups 2000]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+sys.path.insert(0, os.path.dirname(__file__))
+
+from employee_directory import SQLiteEmployeeDirectory
+
+FIRST_NAMES = ["Alice", "Bob", "Charlie", "Diana", "Emma", "Liam", "Olivia", "Noah", "Ava", "Ethan",
+               "An", "Bình", "Châu", "Dũng", "Giang", "Hà", "Hùng", "Khánh", "Linh", "Minh", "Ngọc", "Phương",
+               "Quân", "Thảo", "Trang", "Tuấn", "Vy", "Yến"]
+MIDDLE_NAMES = ["", "", "Văn", "Thị", "Minh", "Đức", "Hoàng", "Marie", "James"]
+LAST_NAMES = ["Johnson", "Smith", "Brown", "Prince", "Nguyễn", "Trần", "Lê", "Phạm", "Hoàng", "Huỳnh", "Phan",
+              "Vũ", "Võ", "Đặng", "Bùi", "Đỗ", "Hồ", "Ngô", "Dương", "Lý", "Garcia", "Miller", "Davis", "Wilson"]
+DEPARTMENTS = ["Engineering", "Sales", "HR", "Marketing", "Finance", "Operations", "Support", "Legal"]
+
+
+def make_employees(count: int, seed: int = 7) -> list[dict]:
+    """Synthetic employees with realistic name collisions"""
+    rng = random.Random(seed)
+    employees = []
+    for i in range(count):
+        first, middle, last = rng.choice(FIRST_NAMES), rng.choice(MIDDLE_NAMES), rng.choice(LAST_NAMES)
+        # Vietnamese names are written family name first
+        if last in LAST_NAMES[4:20]:
+            name = " ".join(part for part in (last, middle, first) if part)
+        else:
+            name = " ".join(part for part in (first, middle, last) if part)
+        # Make most full names unique, like a real directory
+        if rng.random() < 0.9:
+            name += f" {chr(65 + i % 26)}{i % 997}"
+        employees.append({
+            "employee_id": f"E{i + 1:06d}",
+            "name": name,
+            "department": rng.choice(DEPARTMENTS),
+            "leave_balance": rng.randint(0, 25),
+        })
+    return employees
+
+
+def time_lookups(fn, queries: list) -> tuple[float, float]:
+    """Average and worst lookup time in milliseconds"""
+    worst = 0.0
+    started = time.perf_counter()
+    for query in queries:
+        call_started = time.perf_counter()
+        fn(query)
+        worst = max(worst, time.perf_counter() - call_started)
+    average = (time.perf_counter() - started) / len(queries)
+    return average * 1000, worst * 1000
+
+
+def misspell(name: str, rng: random.Random) -> str:
+    """Swap two adjacent letters of the longest word"""
+    words = name.split()
+    longest = max(range(len(words)), key=lambda i: len(words[i]))
+    word = words[longest]
+    if len(word) > 3:
+        i = rng.randrange(1, len(word) - 2)
+        words[longest] = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return " ".join(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark employee directory lookups")
+    parser.add_argument("--employees", type=int, default=100000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    employees = make_employees(args.employees)
+    directory = SQLiteEmployeeDirectory(":memory:")
+    started = time.perf_counter()
+    directory.add_employees(employees)
+    print(f"Imported {directory.count()} employees in {time.perf_counter() - started:.1f} s")
+
+    rng = random.Random(11)
+    sample = rng.sample(employees, min(args.lookups, len(employees)))
+    unique_names = [e["name"] for e in sample if e["name"][-1].isdigit()]
+    workloads = [
+        ("employee ID", directory.get, [e["employee_id"] for e in sample]),
+        ("exact full name", directory.find_exact, unique_names),
+        ("resolve (ID or name)", directory.resolve, [e["employee_id"] if i % 2 else e["name"]
+                                                     for i, e in enumerate(sample)]),
+        ("name prefix", directory.find_prefix, [e["name"].split()[0][:3] for e in sample]),
+        ("fuzzy (misspelled)", directory.find_fuzzy, [misspell(name, rng) for name in unique_names]),
+    ]
+
+    print()
+    print(f"{'lookup':<24}{'avg ms':>10}{'max ms':>10}")
+    for name, fn, queries in workloads:
+        average, worst = time_lookups(fn, queries)
+        print(f"{name:<24}{average:>10.3f}{worst:>10.3f}")
+
+    hits = sum(
+        1 for name, original in zip((misspell(n, random.Random(3)) for n in unique_names), unique_names)
+        if any(match["name"] == original for match in directory.find_fuzzy(name))
+    )
+    print(f"\nFuzzy recall on misspelled names: {hits}/{len(unique_names)}")
+
+    # Leave aggregation: rollup reads against a full scan, and the cost the triggers add to updates
+    scan_sql = "SELECT department_norm, COUNT(*), SUM(leave_balance) FROM employees GROUP BY department_norm"
+    departments = [rng.choice(DEPARTMENTS) for _ in range(200)]
+    ids = [e["employee_id"] for e in sample]
+    aggregations = [
+        ("dept summary (rollup)", lambda _: directory.department_leave_summary(), range(200)),
+        ("dept summary (scan)", lambda _: directory._conn.execute(scan_sql).fetchall(), range(20)),
+        ("below 2 days in dept", lambda d: directory.employees_below(2, d, 50), departments),
+        ("top 10 in dept", lambda d: directory.top_leave_balances(10, d), departments),
+        ("top 10 company-wide", lambda _: directory.top_leave_balances(10), range(200)),
+        ("adjust balance", lambda i: directory.adjust_leave_balance(i, -0.5), ids),
+    ]
+    print()
+    print(f"{'aggregation':<24}{'avg ms':>10}{'max ms':>10}")
+    for name, fn, queries in aggregations:
+        average, worst = time_lookups(fn, list(queries))
+        print(f"{name:<24}{average:>10.3f}{worst:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark policy handbook ingestion.
+Writes synthetic PDF and DOCX handbooks built from the HR FAQ answers, then
+ingests them into a temporary handbook index and reports pages per second for
+each document and overall. Vectors come from the fast deterministic embedder
+of bench_ingestion.py so the measurement covers extraction and indexing.
+
+Usage:
+    python bench_handbooks.py [--handbooks 4] [--pages 300] [--workers 4]
+"""
+
+import os
+import csv
+import sys
+import time
+import argparse
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+import chain_setup
+import handbook_ingestion
+from bench_ingestion import FastEmbeddings
+
+LINES_PER_PAGE = 45
+CHARS_PER_LINE = 90
+
+
+def handbook_lines(count: int) -> list[str]:
+    """Policy-like text lines from the FAQ answers"""
+    with open(chain_setup.HR_FAQ_PATH, "r", encoding="utf-8") as f:
+        text = " ".join(row["Answer"] for row in csv.DictReader(f))
+    words = text.split()
+    lines, line, i = [], [], 0
+    while len(lines) < count:
+        line.append(words[i % len(words)])
+        i += 1
+        if len(" ".join(line)) >= CHARS_PER_LINE:
+            lines.append(" ".join(line))
+            line = []
+    return lines
+
+
+def write_pdf(path: str, pages: int):
+    """Minimal PDF with one Helvetica text stream per page"""
+    lines = handbook_lines(pages * LINES_PER_PAGE)
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in range(pages):
+        page_lines = lines[page * LINES_PER_PAGE:(page + 1) * LINES_PER_PAGE]
+        escaped = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in page_lines]
+        stream = "BT /F1 10 Tf 40 800 Td 14 TL " + " ".join(f"({line}) '" for line in escaped) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {pages} >>"
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    output += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    with open(path, "wb") as f:
+        f.write(output)
+
+
+def write_docx(path: str, pages: int):
+    """DOCX with a page break after every page of paragraphs"""
+    from docx import Document
+    from docx.enum.text import WD_BREAK
+    lines = handbook_lines(pages * LINES_PER_PAGE)
+    document = Document()
+    for page in range(pages):
+        for start in range(0, LINES_PER_PAGE, 5):
+            first = page * LINES_PER_PAGE + start
+            paragraph = document.add_paragraph(" ".join(lines[first:first + 5]))
+        paragraph.add_run().add_break(WD_BREAK.PAGE)
+    document.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark handbook ingestion")
+    parser.add_argument("--handbooks", type=int, default=4)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        handbook_dir = os.path.join(temp_dir, "handbooks")
+        os.makedirs(handbook_dir)
+        for i in range(args.handbooks):
+            if i % 2 == 0:
+                write_pdf(os.path.join(handbook_dir, f"policy_handbook_{i}.pdf"), args.pages)
+            else:
+                write_docx(os.path.join(handbook_dir, f"policy_handbook_{i}.docx"), args.pages)
+        os.environ["HANDBOOK_DIR"] = handbook_dir
+        total_pages = args.handbooks * args.pages
+        print(f"{args.handbooks} handbooks x {args.pages} pages ({os.cpu_count()} CPUs)\n")
+
+        for workers in sorted({1, args.workers}):
+            # Each run builds a fresh index
+            chain_setup.HANDBOOK_INDEX_PATH = handbook_ingestion.HANDBOOK_INDEX_PATH = \
+                os.path.join(temp_dir, f"index_{workers}")
+            started = time.perf_counter()
+            summary = handbook_ingestion.ingest_handbooks(workers=workers, embeddings=FastEmbeddings())
+            elapsed = time.perf_counter() - started
+            print(f"\nworkers={workers}: {elapsed:.1f} s, {total_pages / elapsed:.0f} pages/s, "
+                  f"{summary['chunks']} chunks")
+            for document in sorted(summary["documents"], key=lambda d: d["name"]):
+                print(f"  {document['name']:<24}{document['pages']:>5} pages  extract {document['extract_s']:>6.2f} s"
+                      f"  index {document['index_s']:>5.2f} s  {document['pages_per_s']:>6.1f} pages/s")
+            print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark the intent router against the legacy keyword cascade from chat().
+Replays the recorded message corpus (plus synthetic CV uploads with a base64
+payload), checks that both classify every message the same way and reports
+the routing time per message.
+
+Usage:
+    python bench_intent_router.py [--corpus data/message_corpus.jsonl] [--repeat 2000]
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import random
+import argparse
+sys.path.insert(0, os.path.dirname(__file__))
+
+from intent_router import (
+    IntentRouter, POSITION_ALIASES, PASTED_CV_POSITIONS, DEFAULT_POSITION_KEY,
+    INTENT_FAQ, INTENT_CV_EVAL, INTENT_POSITION_LIST, INTENT_TOOL_QUERY
+)
+
+
+def legacy_route(message: str):
+    """The keyword cascade chat() used before the intent router"""
+    cv_check_keywords = ["cv", "resume", "evaluate", "check", "score", "assess", "đánh giá", "kiểm tra"]
+    cv_eval_keywords = ["evaluate", "score", "assess", "đánh giá"]
+    message_lower = message.lower()
+    is_cv_check_request = any(keyword in message_lower for keyword in cv_check_keywords)
+    is_cv_eval_request = any(keyword in message_lower for keyword in cv_eval_keywords)
+
+    if is_cv_check_request:
+        cv_content_keywords = ["experience", "skill", "education", "bachelor", "master", "project", "responsibility"]
+        actual_cv_content = sum(1 for kw in cv_content_keywords if kw in message_lower) >= 2
+        if is_cv_eval_request and "evaluate" in message_lower:
+            actual_cv_content = True
+        if not actual_cv_content:
+            return INTENT_POSITION_LIST, None
+
+    cv_content_keywords = ["experience", "skill", "education", "bachelor", "master", "python", "java", "javascript",
+                           "developer", "engineer", "project", "responsibility", "achievement"]
+    has_cv_content = sum(1 for kw in cv_content_keywords if kw in message_lower) >= 3
+
+    if message_lower.startswith("evaluate my cv"):
+        for pos_str, pos_key in sorted(POSITION_ALIASES.items(), key=lambda x: len(x[0]), reverse=True):
+            if pos_str in message_lower:
+                return INTENT_CV_EVAL, pos_key
+        return INTENT_CV_EVAL, DEFAULT_POSITION_KEY
+
+    if has_cv_content:
+        position_mentioned = next((p for p in PASTED_CV_POSITIONS if p in message_lower), None)
+        if position_mentioned:
+            return INTENT_CV_EVAL, PASTED_CV_POSITIONS[position_mentioned]
+
+    return INTENT_FAQ, None
+
+
+def load_corpus(path: str) -> list:
+    """Load chat messages from a JSONL file"""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["message"] for line in f if line.strip()]
+
+
+def make_upload_messages(count: int, payload_bytes: int) -> list:
+    """Synthetic CV upload messages in the format sent by the upload widget"""
+    rng = random.Random(42)
+    positions = ["Python Developer", "Java Developer", "AI/ML Engineer", "Frontend Developer",
+                 "DevOps Engineer", "Full Stack Developer", "Data Engineer", "QA Engineer"]
+    messages = []
+    for i in range(count):
+        payload = base64.b64encode(rng.randbytes(payload_bytes)).decode("ascii")
+        messages.append(f"Evaluate my CV for {positions[i % len(positions)]} | cv_{i}.pdf | {payload}")
+    return messages
+
+
+def time_per_message(route, messages: list, repeat: int) -> float:
+    """Average routing time in microseconds"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for message in messages:
+            route(message)
+    return (time.perf_counter() - started) / (repeat * len(messages)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the chat intent router")
+    parser.add_argument("--corpus", default=os.path.join(os.path.dirname(__file__), "data", "message_corpus.jsonl"))
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--upload-kb", type=int, default=200, help="Size of synthetic uploaded CVs")
+    args = parser.parse_args()
+
+    router = IntentRouter()
+
+    def route(message):
+        intent = router.route(message)
+        return intent.kind, intent.position_key
+
+    corpus = load_corpus(args.corpus)
+    uploads = make_upload_messages(8, args.upload_kb * 1024)
+
+    print("=" * 60)
+    print("Intent router benchmark")
+    print("=" * 60)
+
+    # The router deliberately sends HR tool questions (e.g. "check leave balance") to the
+    # tools instead of the CV position list, so those are reported separately.
+    mismatches, tool_queries = [], []
+    for message in corpus + uploads:
+        new, old = route(message), legacy_route(message)
+        if new[0] == INTENT_TOOL_QUERY:
+            tool_queries.append((message, old[0]))
+        elif new != old:
+            mismatches.append((message, old, new))
+
+    print(f"Corpus messages: {len(corpus)}, synthetic uploads: {len(uploads)} x {args.upload_kb} KB")
+    print(f"Tool queries (legacy intent shown): {len(tool_queries)}")
+    for message, old in tool_queries:
+        print(f"   - {message[:60]!r} (was {old})")
+    print(f"Mismatches vs legacy cascade: {len(mismatches)}")
+    for message, old, new in mismatches:
+        print(f"   - {message[:60]!r}: legacy={old} router={new}")
+
+    # Pasted CVs are usually a page or two of text, not a one-liner
+    pasted = [" ".join([message] * 10) for message in corpus if legacy_route(message)[0] == INTENT_CV_EVAL]
+
+    upload_repeat = max(1, args.repeat // 100)
+    results = [
+        ("chat messages", corpus, args.repeat),
+        ("pasted CVs", pasted, args.repeat),
+        ("CV uploads", uploads, upload_repeat),
+    ]
+    print()
+    print(f"{'workload':<16}{'legacy µs/msg':>16}{'router µs/msg':>16}{'speedup':>10}")
+    for name, messages, repeat in results:
+        legacy_us = time_per_message(legacy_route, messages, repeat)
+        router_us = time_per_message(route, messages, repeat)
+        print(f"{name:<16}{legacy_us:>16.1f}{router_us:>16.1f}{legacy_us / router_us:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark PDF text extraction.
+Writes a synthetic PDF handbook and extracts it the legacy way (serial page
+walk with += concatenation), with the page-range worker processes for
+several worker counts, and through the streaming iterator stopping after the
+first pages, as a CV summary does.
+
+Usage:
+    python bench_pdf_extraction.py [--pages 1000] [--workers 1 2 4] [--first 20]
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+from PyPDF2 import PdfReader
+
+from bench_handbooks import write_pdf
+from cv_extractor import extract_pdf_pages, iter_pdf_pages
+
+
+def legacy_extract(pdf_bytes: bytes) -> str:
+    text = ""
+    for page in PdfReader(io.BytesIO(pdf_bytes)).pages:
+        text += page.extract_text() + "\n"
+    return text.strip()
+
+
+def timed(run):
+    started = time.perf_counter()
+    result = run()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF text extraction")
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--first", type=int, default=20, help="Pages read by the early-stop run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "handbook.pdf")
+        write_pdf(path, args.pages)
+        with open(path, "rb") as f:
+            pdf_bytes = f.read()
+    print(f"{args.pages} pages ({len(pdf_bytes) / 1e6:.1f} MB, {os.cpu_count()} CPUs)\n")
+
+    expected, elapsed = timed(lambda: legacy_extract(pdf_bytes))
+    print(f"{'extractor':<28}{'time s':>9}{'pages/s':>10}")
+    print(f"{'legacy serial +=':<28}{elapsed:>9.2f}{args.pages / elapsed:>10.0f}")
+    for workers in args.workers:
+        pages, elapsed = timed(lambda: extract_pdf_pages(pdf_bytes, workers=workers))
+        assert "\n".join(pages).strip() == expected, "page-parallel text differs from the serial text"
+        print(f"{f'page ranges, {workers} workers':<28}{elapsed:>9.2f}{args.pages / elapsed:>10.0f}")
+
+    first, elapsed = timed(lambda: [text for _, text in zip(range(args.first), iter_pdf_pages(pdf_bytes))])
+    print(f"{f'iterator, first {len(first)} pages':<28}{elapsed:>9.2f}{len(first) / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark matrix scoring of CVs against the job positions.
+First checks on synthetic CV texts that the matrix scores and ratings equal
+score_cv() for every position, timing the per-CV Python loop on the way.
+Then scores a large pool of random skill bitsets (stored-candidate form) for
+every position and ranks the top candidates of each.
+
+Usage:
+    python bench_skill_matrix.py [--cvs 500] [--pool 100000] [--top 20]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+sys.path.insert(0, os.path.dirname(__file__))
+
+import numpy as np
+
+from company_data import JOB_POSITIONS
+from cv_features import extract_cv_features
+from cv_scoring import (
+    SKILL_VOCABULARY, RATING_NAMES, base_score, compile_positions, pack_skills, rating_matrix,
+    score_cv, score_matrix, skill_vector, top_k, unpack_skills
+)
+
+DEGREES = ["", "Bachelor of Science in Computer Science", "M.Sc. in Data Science", "PhD in Machine Learning"]
+TITLES = ["Junior Developer", "Software Engineer", "Senior Engineer", "Tech Lead"]
+
+
+def synthetic_cv(rng: random.Random) -> str:
+    skills = rng.sample(SKILL_VOCABULARY, rng.randint(2, 14))
+    start = rng.randint(2008, 2023)
+    lines = [
+        f"{rng.choice(TITLES)} with {rng.randint(0, 12)} years of experience",
+        f"Skills: {', '.join(skills)}",
+        f"Company A | {start} - present",
+        rng.choice(DEGREES),
+        " ".join(rng.sample(["communication", "leadership", "teamwork", "certified", "english"], rng.randint(0, 4))),
+    ]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark matrix CV scoring")
+    parser.add_argument("--cvs", type=int, default=500, help="Synthetic CVs checked against score_cv()")
+    parser.add_argument("--pool", type=int, default=100000, help="Stored candidates scored as a matrix")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    positions = compile_positions()
+    print(f"{len(SKILL_VOCABULARY)} skills ({pack_skills(np.zeros(len(SKILL_VOCABULARY), bool)).size} bytes per CV), "
+          f"{len(positions.keys)} positions\n")
+
+    # 1. Same results as the per-CV scorer
+    features = [extract_cv_features(synthetic_cv(rng)) for _ in range(args.cvs)]
+    started = time.perf_counter()
+    expected = [[score_cv(f, JOB_POSITIONS[key]) for key in positions.keys] for f in features]
+    loop_s = time.perf_counter() - started
+    skills = np.array([skill_vector(f) for f in features])
+    bases = np.array([base_score(f) for f in features])
+    totals, missing = score_matrix(unpack_skills(pack_skills(skills)), bases, positions)
+    ratings = rating_matrix(totals, missing, positions)
+    for i, row in enumerate(expected):
+        for j, score in enumerate(row):
+            assert totals[i, j] == score["total_score"], (i, j, totals[i, j], score)
+            assert RATING_NAMES[ratings[i, j]] == score["rating"], (i, j, RATING_NAMES[ratings[i, j]], score)
+    pairs = args.cvs * len(positions.keys)
+    print(f"{args.cvs} CVs: matrix scores and ratings equal score_cv() for all {pairs} CV/position pairs")
+    print(f"Python loop (score_cv): {loop_s * 1e6 / pairs:.1f} us per pair -> "
+          f"{loop_s / args.cvs * args.pool:.1f} s for {args.pool} CVs (extrapolated)\n")
+
+    # 2. A large pool of stored candidates
+    generator = np.random.default_rng(0)
+    density = skills.mean()
+    bitsets = pack_skills(generator.random((args.pool, len(SKILL_VOCABULARY))) < density)
+    pool_bases = generator.choice(bases, size=args.pool)
+    timings = {}
+    started = time.perf_counter()
+    pool_skills = unpack_skills(bitsets)
+    timings["unpack bitsets"] = time.perf_counter() - started
+    started = time.perf_counter()
+    pool_totals, pool_missing = score_matrix(pool_skills, pool_bases, positions)
+    timings["score N x M"] = time.perf_counter() - started
+    started = time.perf_counter()
+    rating_matrix(pool_totals, pool_missing, positions)
+    timings["ratings"] = time.perf_counter() - started
+    started = time.perf_counter()
+    best = [top_k(pool_totals, j, args.top) for j in range(len(positions.keys))]
+    timings[f"top {args.top} per position"] = time.perf_counter() - started
+
+    print(f"{args.pool} candidates x {len(positions.keys)} positions ({bitsets.nbytes / 1e6:.1f} MB of bitsets)")
+    for name, seconds in timings.items():
+        print(f"  {name:<22}{seconds * 1000:>9.1f} ms")
+    print(f"  {'total':<22}{sum(timings.values()) * 1000:>9.1f} ms")
+    key = positions.keys[0]
+    print(f"\nBest {key} scores: {pool_totals[best[0], 0].tolist()}")
+
+
+if __name__ == "__main__":
+    main()
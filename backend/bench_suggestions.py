@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark autocomplete lookups.
+Builds the suggestion index from the FAQ, the job positions and a synthetic
+employee directory, then times suggest() on prefixes of every length taken
+from the indexed texts.
+
+Usage:
+    python bench_suggestions.py [--employees 20000] [--lookups 20000]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+sys.path.insert(0, os.path.dirname(__file__))
+
+from company_data import JOB_POSITIONS
+from employee_directory import SQLiteEmployeeDirectory
+from suggestions import build_suggestion_index, load_faq_questions
+from bench_employee_directory import make_employees
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark autocomplete lookups")
+    parser.add_argument("--employees", type=int, default=20000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+
+    directory = SQLiteEmployeeDirectory(":memory:")
+    directory.add_employees(make_employees(args.employees))
+    faq_questions = load_faq_questions(os.path.join(os.path.dirname(__file__), "data", "hr_faq.csv"))
+    settings = {"top_k": 8, "max_employees": args.employees}
+    index = build_suggestion_index(faq_questions, {}, JOB_POSITIONS, directory, settings)
+
+    # What users type: the start of an indexed text, or the start of one of its words
+    rng = random.Random(5)
+    prefixes = []
+    for _ in range(args.lookups):
+        words = rng.choice(index.suggestions).text.split()
+        text = " ".join(words[rng.randrange(len(words)):])
+        prefixes.append(text[:rng.randint(1, len(text))])
+
+    hits = 0
+    worst = 0.0
+    started = time.perf_counter()
+    for prefix in prefixes:
+        call_started = time.perf_counter()
+        hits += bool(index.suggest(prefix, "en", 5))
+        worst = max(worst, time.perf_counter() - call_started)
+    average = (time.perf_counter() - started) / len(prefixes)
+
+    print(f"{len(prefixes)} lookups: avg {average * 1e6:.1f} us, max {worst * 1e6:.1f} us, "
+          f"{hits / len(prefixes):.0%} with suggestions")
+
+
+if __name__ == "__main__":
+    main()
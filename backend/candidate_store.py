@@ -0,0 +1,665 @@
+"""
+Persistent store of evaluated candidates.
+Each CV evaluated by the chat or the API is kept in a SQLite database: its
+typed features, its skill bitset over SKILL_VOCABULARY, its base score and
+its precomputed score for every job position. The candidate_skills table is
+the inverted index from skill to candidate IDs.
+
+On load the store keeps the numeric part in memory (skill postings as sorted
+row arrays, years of experience, N x M scores), so recruiter queries such as
+"top 20 Python developers with Docker and 3+ years" intersect the postings of
+the required skills, filter the years and select the best K scores without
+touching SQLite; only the K results are read back for their details.
+Candidates added by another process (the CLI import) show up after load().
+
+Position definitions are versioned: every stored score records the version
+(hash of the must-have and nice-to-have skills) it was computed for. When a
+position changes in company_data.py, load() finds its outdated scores and a
+re-scoring job recomputes them from the stored skill bitsets, without
+re-reading any CV. Only candidates with one of the changed skills get new
+scores; the others only have their missing must-have count shifted. The skill
+vocabulary only grows: skills new to it (a new SKILL_SCORES entry or position
+skill) read as absent for the candidates stored before them.
+
+Usage:
+    python candidate_store.py import cv1.pdf cv2.docx ...
+    python candidate_store.py search [--position python_developer] [--skill Python --skill Docker] [--min-years 3]
+    python candidate_store.py rescore [--full]
+    python candidate_store.py status
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from company_data import JOB_POSITIONS
+from cv_features import CVFeatures, extract_cv_features
+from cv_scoring import (
+    SKILL_VOCABULARY, base_score, build_skill_vocabulary, compile_positions, pack_skills, rating, score_matrix,
+    skill_vector, unpack_skills
+)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CANDIDATE_STORE_PATH = os.path.join(BACKEND_DIR, "embeddings", "candidates.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS candidates (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    source TEXT,
+    content_hash TEXT UNIQUE,
+    added_at REAL NOT NULL,
+    years_experience REAL NOT NULL,
+    seniority TEXT,
+    degree TEXT NOT NULL,
+    certified INTEGER NOT NULL,
+    certifications TEXT NOT NULL,
+    languages TEXT NOT NULL,
+    base_score INTEGER NOT NULL,
+    skills BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS candidate_skills (
+    skill TEXT NOT NULL,
+    candidate_id INTEGER NOT NULL,
+    PRIMARY KEY (skill, candidate_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS candidate_scores (
+    position TEXT NOT NULL,
+    candidate_id INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    missing INTEGER NOT NULL,
+    version TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (position, candidate_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS position_versions (
+    position TEXT NOT NULL,
+    version TEXT NOT NULL,
+    must_have TEXT NOT NULL,
+    nice_to_have TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (position, version)
+);
+"""
+
+_DETAIL_COLUMNS = "id, name, source, years_experience, seniority, degree, certifications, languages"
+
+
+def get_candidate_store_settings():
+    """Get candidate store settings from environment variables"""
+    return {
+        "enabled": os.getenv("CANDIDATE_STORE_ENABLED", "true").lower() in ("1", "true", "yes"),
+        "path": os.getenv("CANDIDATE_STORE_PATH") or DEFAULT_CANDIDATE_STORE_PATH,
+        "rescore_batch_size": int(os.getenv("CANDIDATE_RESCORE_BATCH_SIZE") or 5000),
+    }
+
+
+def cv_content_hash(cv_text: str) -> str:
+    """Hash identifying a CV, so the same CV evaluated twice is stored once"""
+    return hashlib.sha256(" ".join(cv_text.split()).encode("utf-8")).hexdigest()
+
+
+def position_version(position: dict) -> str:
+    """Version of a position definition: changes whenever its must-have or nice-to-have skills do"""
+    definition = {"must_have": sorted(position["must_have"]), "nice_to_have": sorted(position["nice_to_have"])}
+    return hashlib.sha256(json.dumps(definition).encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class PositionChange:
+    """Stored scores of a position computed for an older version of it"""
+    position: str
+    version: str                # Current version
+    previous_version: str       # Version the scores were computed for ("" if unknown)
+    rows: np.ndarray            # Rows of the candidates with these scores
+    changed_skills: list | None  # Skills added, removed or moved between must-have and nice-to-have (None: all)
+    must_have_delta: int        # Change in the number of must-haves
+
+    def affected_rows(self, store: "CandidateStore") -> np.ndarray:
+        """Rows whose score changes: the candidates with one of the changed skills"""
+        if self.changed_skills is None:
+            return self.rows
+        postings = [store._posting(store._columns[skill.lower()]) for skill in self.changed_skills]
+        if not postings:
+            return np.empty(0, dtype=np.int64)
+        return np.intersect1d(self.rows, np.unique(np.concatenate(postings)), assume_unique=True)
+
+
+class CandidateStore:
+    """SQLite-backed candidate repository with in-memory skill postings and scores"""
+
+    def __init__(self, path: str, positions: dict = JOB_POSITIONS, vocabulary: list[str] = SKILL_VOCABULARY):
+        self.path = path
+        self.definitions = positions
+        self.versions = {key: position_version(position) for key, position in positions.items()}
+        self._set_vocabulary(build_skill_vocabulary(positions, vocabulary))
+        self.unindexed_skills = []
+        self.pending = []       # PositionChange of the outdated scores
+        self.job = {"state": "idle"}
+        self._connection = None
+        self._lock = threading.Lock()           # In-memory arrays and job status; never held during SQLite writes
+        self._write_lock = threading.Lock()     # Writes on the shared connection
+        self._clear()
+
+    def _set_vocabulary(self, vocabulary: list[str]):
+        self.vocabulary = vocabulary
+        self.positions = compile_positions(self.definitions, vocabulary)
+        self._columns = {skill.lower(): i for i, skill in enumerate(vocabulary)}
+
+    def _clear(self):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.years = np.empty(0, dtype=np.float64)
+        self.bases = np.empty(0, dtype=np.int16)
+        self.skills = np.empty((0, len(self.vocabulary)), dtype=bool)
+        self.totals = np.empty((0, len(self.positions.keys)), dtype=np.int16)
+        self.missing = np.empty_like(self.totals)
+        self._by_hash = {}
+        self._postings = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            columns = [row[1] for row in connection.execute("PRAGMA table_info(candidate_scores)")]
+            if "version" not in columns:
+                # Stores created before versioned positions: their scores are re-scored once
+                connection.execute("ALTER TABLE candidate_scores ADD COLUMN version TEXT NOT NULL DEFAULT ''")
+            self._connection = connection
+        return self._connection
+
+    def load(self):
+        """Load the stored candidates into memory and find the scores computed for older position versions"""
+        started = time.perf_counter()
+        with self._write_lock, self._lock:
+            if self.job["state"] == "running":
+                raise RuntimeError("Cannot reload the candidate store while it is re-scoring")
+            connection = self._connect()
+            row = connection.execute("SELECT value FROM meta WHERE key = 'vocabulary'").fetchone()
+            stored_vocabulary = json.loads(row[0]) if row else []
+            new_skills = [skill for skill in self.vocabulary if skill not in set(stored_vocabulary)]
+            self._set_vocabulary(stored_vocabulary + new_skills)
+            connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('vocabulary', ?)", (json.dumps(self.vocabulary),)
+            )
+            connection.executemany(
+                "INSERT OR IGNORE INTO position_versions (position, version, must_have, nice_to_have, created_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [(key, self.versions[key], json.dumps(position["must_have"]), json.dumps(position["nice_to_have"]),
+                  time.time()) for key, position in self.definitions.items()]
+            )
+            rows = connection.execute(
+                "SELECT id, content_hash, years_experience, base_score, skills FROM candidates ORDER BY id"
+            ).fetchall()
+            self._clear()
+            self.pending = []
+            self.unindexed_skills = new_skills if rows and stored_vocabulary else []
+            if self.unindexed_skills:
+                print(f"[CANDIDATES] New skills read as absent for the stored candidates: {', '.join(new_skills)}")
+
+            if rows:
+                # Bitsets stored before the vocabulary grew are shorter
+                width = max(len(r[4]) for r in rows)
+                bitsets = np.frombuffer(b"".join(r[4].ljust(width, b"\0") for r in rows), dtype=np.uint8)
+                self.ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+                self.years = np.fromiter((r[2] for r in rows), dtype=np.float64, count=len(rows))
+                self.bases = np.fromiter((r[3] for r in rows), dtype=np.int16, count=len(rows))
+                self.skills = unpack_skills(bitsets.reshape(len(rows), width), len(self.vocabulary))
+                self._by_hash = {r[1]: r[0] for r in rows if r[1]}
+            self.totals = np.zeros((len(rows), len(self.positions.keys)), dtype=np.int16)
+            self.missing = np.zeros_like(self.totals)
+            for column, key in enumerate(self.positions.keys):
+                self._load_scores(connection, column, key)
+            connection.commit()
+        print(f"[CANDIDATES] Loaded {len(self.ids)} candidates in {(time.perf_counter() - started) * 1000:.0f} ms")
+        for change in self.pending:
+            print(f"[CANDIDATES] {change.position}: {len(change.rows)} scores computed for "
+                  f"{change.previous_version or 'an unknown version'}, to re-score for {change.version}")
+
+    def _load_scores(self, connection: sqlite3.Connection, column: int, key: str):
+        """Load the stored scores of a position and plan the re-scoring of the outdated ones"""
+        versions = np.full(len(self.ids), "", dtype=object)
+        stored = connection.execute(
+            "SELECT candidate_id, score, missing, version FROM candidate_scores WHERE position = ?", (key,)
+        ).fetchall()
+        if stored and len(self.ids):
+            candidate_ids = np.fromiter((r[0] for r in stored), dtype=np.int64, count=len(stored))
+            rows = np.minimum(np.searchsorted(self.ids, candidate_ids), len(self.ids) - 1)
+            known = self.ids[rows] == candidate_ids
+            rows = rows[known]
+            self.totals[rows, column] = np.fromiter((r[1] for r in stored), dtype=np.int16, count=len(stored))[known]
+            self.missing[rows, column] = np.fromiter((r[2] for r in stored), dtype=np.int16, count=len(stored))[known]
+            versions[rows] = np.array([r[3] for r in stored], dtype=object)[known]
+        outdated = np.flatnonzero(versions != self.versions[key])
+        for previous_version in sorted(set(versions[outdated])):
+            rows = outdated[versions[outdated] == previous_version]
+            self.pending.append(self._plan_change(connection, key, previous_version, rows))
+
+    def _plan_change(self, connection: sqlite3.Connection, key: str, previous_version: str,
+                     rows: np.ndarray) -> PositionChange:
+        position = self.definitions[key]
+        previous = connection.execute(
+            "SELECT must_have, nice_to_have FROM position_versions WHERE position = ? AND version = ?",
+            (key, previous_version)
+        ).fetchone()
+        if previous is None:
+            # Scores of an unknown definition (or no scores at all): every candidate is re-scored
+            return PositionChange(key, self.versions[key], previous_version, rows, None, 0)
+        must_have, nice_to_have = set(json.loads(previous[0])), set(json.loads(previous[1]))
+        changed = (must_have ^ set(position["must_have"])) | (nice_to_have ^ set(position["nice_to_have"]))
+        return PositionChange(key, self.versions[key], previous_version, rows, sorted(changed),
+                              len(position["must_have"]) - len(must_have))
+
+    def _position_index(self, position_key: str) -> int | None:
+        try:
+            return self.positions.index(position_key)
+        except ValueError:
+            return None
+
+    def _save_skills(self, connection: sqlite3.Connection, ids: np.ndarray, skills: np.ndarray):
+        rows, columns = np.nonzero(skills)
+        connection.executemany(
+            "INSERT INTO candidate_skills (skill, candidate_id) VALUES (?, ?)",
+            ((self.vocabulary[column], int(ids[row])) for row, column in zip(rows.tolist(), columns.tolist()))
+        )
+
+    def _save_scores(self, connection: sqlite3.Connection, ids: np.ndarray, totals: np.ndarray, missing: np.ndarray):
+        connection.executemany(
+            "INSERT OR REPLACE INTO candidate_scores (position, candidate_id, score, missing, version)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (
+                (key, int(candidate_id), int(totals[row, column]), int(missing[row, column]), self.versions[key])
+                for column, key in enumerate(self.positions.keys)
+                for row, candidate_id in enumerate(ids.tolist())
+            )
+        )
+
+    def add_many(self, candidates: list[tuple]) -> list[int]:
+        """
+        Store evaluated candidates.
+
+        Args:
+            candidates: (features, name, source, content_hash) tuples; a
+                candidate whose content_hash is already stored is not added again
+
+        Returns:
+            Candidate ID of each entry
+        """
+        with self._write_lock:
+            with self._lock:
+                entries = []    # (stored candidate ID, or index in new)
+                new = []
+                pending = {}
+                for features, name, source, content_hash in candidates:
+                    if content_hash in self._by_hash:
+                        entries.append((self._by_hash[content_hash], None))
+                    elif content_hash in pending:
+                        entries.append((None, pending[content_hash]))
+                    else:
+                        if content_hash:
+                            pending[content_hash] = len(new)
+                        entries.append((None, len(new)))
+                        new.append((features, name, source, content_hash))
+                vocabulary, positions = self.vocabulary, self.positions
+            if not new:
+                return [candidate_id for candidate_id, _ in entries]
+
+            vectors = np.array([skill_vector(features, vocabulary) for features, _, _, _ in new], dtype=bool)
+            bases = np.array([base_score(features) for features, _, _, _ in new], dtype=np.int16)
+            totals, missing = score_matrix(vectors, bases, positions)
+            # Stored without self._lock: a re-scoring job may hold the SQLite write lock for a batch meanwhile
+            connection = self._connect()
+            ids = np.empty(len(new), dtype=np.int64)
+            added_at = time.time()
+            try:
+                for i, (features, name, source, content_hash) in enumerate(new):
+                    ids[i] = connection.execute(
+                        "INSERT INTO candidates (name, source, content_hash, added_at, years_experience, seniority,"
+                        " degree, certified, certifications, languages, base_score, skills)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (name, source, content_hash, added_at, float(features.years_experience), features.seniority,
+                         features.degree, int(features.certified), json.dumps(list(features.certifications)),
+                         json.dumps(list(features.languages)), int(bases[i]), pack_skills(vectors[i]).tobytes())
+                    ).lastrowid
+                self._save_skills(connection, ids, vectors)
+                self._save_scores(connection, ids, totals, missing)
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+
+            years = np.array([features.years_experience for features, _, _, _ in new], dtype=np.float64)
+            with self._lock:
+                for candidate_id, (_, _, _, content_hash) in zip(ids.tolist(), new):
+                    if content_hash:
+                        self._by_hash[content_hash] = candidate_id
+                self.ids = np.concatenate([self.ids, ids])
+                self.years = np.concatenate([self.years, years])
+                self.bases = np.concatenate([self.bases, bases])
+                self.skills = np.concatenate([self.skills, vectors])
+                self.totals = np.concatenate([self.totals, totals])
+                self.missing = np.concatenate([self.missing, missing])
+                self._postings = None
+        return [candidate_id if index is None else int(ids[index]) for candidate_id, index in entries]
+
+    def add(self, features: CVFeatures, name: str | None = None, source: str | None = None,
+            content_hash: str | None = None) -> int:
+        """Store one evaluated candidate and return its ID"""
+        return self.add_many([(features, name, source, content_hash)])[0]
+
+    def add_cv(self, cv_text: str, name: str | None = None, source: str | None = None,
+               features: CVFeatures | None = None) -> int:
+        """Store the candidate of a CV text (features extracted unless given) and return its ID"""
+        return self.add(features or extract_cv_features(cv_text), name, source, cv_content_hash(cv_text))
+
+    @property
+    def stale_positions(self) -> list[str]:
+        """Positions with scores computed for an older version, until the re-scoring job has run"""
+        return sorted({change.position for change in self.pending})
+
+    def plan_full_rescore(self):
+        """Mark every stored score as outdated, so the next rescore() recomputes them all"""
+        with self._lock:
+            if self.job["state"] == "running":
+                raise RuntimeError("A re-scoring job is already running")
+            rows = np.arange(len(self.ids))
+            self.pending = [
+                PositionChange(key, self.versions[key], self.versions[key], rows, None, 0) for key in self.positions.keys
+            ]
+
+    def rescore(self, batch_size: int | None = None, progress=None) -> dict:
+        """
+        Re-score the outdated scores found by load() from the stored skill bitsets.
+
+        Scores are written on a connection of its own and committed batch by
+        batch, so chat evaluations stored meanwhile wait for one batch at most;
+        the in-memory scores of a position switch to the new ones once all of
+        its batches are committed. An interrupted job leaves the unwritten
+        scores on their previous version, for the next load() to plan again.
+
+        Args:
+            batch_size: Candidates scored and written per batch (CANDIDATE_RESCORE_BATCH_SIZE by default)
+            progress: Called with the job status after every batch
+
+        Returns:
+            Job status: state, positions, scores (candidate scores to re-score),
+            rescored, shifted (only the missing must-have count changed), elapsed_s
+
+        Raises:
+            RuntimeError: If a re-scoring job is already running
+        """
+        batch_size = batch_size or get_candidate_store_settings()["rescore_batch_size"]
+        with self._lock:
+            if self.job["state"] == "running":
+                raise RuntimeError("A re-scoring job is already running")
+            plan = [(change, change.affected_rows(self)) for change in self.pending]
+            self.job = {
+                "state": "running",
+                "positions": sorted({change.position for change in self.pending}),
+                "scores": int(sum(len(rows) for _, rows in plan)),
+                "rescored": 0,
+                "shifted": int(sum(len(change.rows) - len(rows) for change, rows in plan)),
+                "unindexed_skills": [skill for change, _ in plan for skill in change.changed_skills or ()
+                                     if skill in self.unindexed_skills],
+                "started_at": time.time(),
+            }
+        started = time.perf_counter()
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            for change, rows in plan:
+                self._rescore_position(connection, change, rows, batch_size, progress)
+            self._finish_job("done", started)
+            print(f"[CANDIDATES] Re-scored {self.job['rescored']} candidate scores for "
+                  f"{', '.join(self.job['positions']) or 'no positions'} in {self.job['elapsed_s']} s")
+        except Exception as e:
+            connection.rollback()
+            self._finish_job("failed", started, str(e))
+            raise
+        finally:
+            connection.close()
+        return dict(self.job)
+
+    def _rescore_position(self, connection: sqlite3.Connection, change: PositionChange, rows: np.ndarray,
+                          batch_size: int, progress):
+        column = self.positions.index(change.position)
+        position = compile_positions({change.position: self.definitions[change.position]}, self.vocabulary)
+        totals = np.empty(len(rows), dtype=np.int16)
+        missing = np.empty(len(rows), dtype=np.int16)
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            batch_totals, batch_missing = score_matrix(self.skills[batch], self.bases[batch], position)
+            totals[start:start + len(batch)] = batch_totals[:, 0]
+            missing[start:start + len(batch)] = batch_missing[:, 0]
+            connection.executemany(
+                "INSERT OR REPLACE INTO candidate_scores (position, candidate_id, score, missing, version)"
+                " VALUES (?, ?, ?, ?, ?)",
+                ((change.position, candidate_id, score, missing_count, change.version) for candidate_id, score, missing_count
+                 in zip(self.ids[batch].tolist(), batch_totals[:, 0].tolist(), batch_missing[:, 0].tolist()))
+            )
+            connection.commit()
+            with self._lock:
+                self.job["rescored"] += len(batch)
+                status = dict(self.job)
+            if progress:
+                progress(status)
+        if change.changed_skills is not None:
+            # Candidates without a changed skill keep their score; only their missing count moves
+            # (the re-scored candidates are on the new version by now)
+            connection.execute(
+                "UPDATE candidate_scores SET missing = missing + ?, version = ? WHERE position = ? AND version = ?",
+                (change.must_have_delta, change.version, change.position, change.previous_version)
+            )
+            connection.commit()
+        with self._lock:
+            if change.changed_skills is not None:
+                self.missing[change.rows, column] += change.must_have_delta
+            self.totals[rows, column] = totals
+            self.missing[rows, column] = missing
+            self.pending.remove(change)
+
+    def _finish_job(self, state: str, started: float, error: str | None = None):
+        with self._lock:
+            self.job.update(state=state, finished_at=time.time(), elapsed_s=round(time.perf_counter() - started, 2))
+            if error:
+                self.job["error"] = error
+
+    def _skill_column(self, skill: str) -> int:
+        column = self._columns.get(skill.strip().lower())
+        if column is None:
+            raise ValueError(f"Unknown skill: {skill}")
+        return column
+
+    def _posting(self, column: int) -> np.ndarray:
+        """Sorted rows of the candidates with a skill (postings are rebuilt after additions)"""
+        if self._postings is None:
+            self._postings = [np.flatnonzero(self.skills[:, i]) for i in range(len(self.vocabulary))]
+        return self._postings[column]
+
+    def _matching_rows(self, skills, any_skills, min_years: float) -> np.ndarray:
+        """Rows with all of skills, one of any_skills (if given) and min_years of experience"""
+        postings = sorted((self._posting(self._skill_column(skill)) for skill in skills), key=len)
+        if any_skills:
+            columns = [self._skill_column(skill) for skill in any_skills]
+            postings.append(np.flatnonzero(self.skills[:, columns].any(axis=1)))
+            postings.sort(key=len)
+        if postings:
+            # Intersect from the rarest skill up
+            rows = postings[0]
+            for posting in postings[1:]:
+                if not len(rows):
+                    break
+                rows = np.intersect1d(rows, posting, assume_unique=True)
+        else:
+            rows = np.arange(len(self.ids))
+        if min_years:
+            rows = rows[self.years[rows] >= min_years]
+        return rows
+
+    def search(self, position: str | None = None, skills=(), any_skills=(), min_years: float = 0,
+               limit: int = 20) -> dict:
+        """
+        Find the best stored candidates.
+
+        Args:
+            position: Position key to rank by (each candidate's best position if None)
+            skills: Skills a candidate must all have
+            any_skills: Skills a candidate must have at least one of
+            min_years: Minimum years of experience
+            limit: Number of candidates returned
+
+        Returns:
+            Dict with the number of matching candidates and the best ones, best first
+
+        Raises:
+            ValueError: If the position or a skill is unknown
+        """
+        started = time.perf_counter()
+        if position is not None and self._position_index(position) is None:
+            raise ValueError(f"Unknown position: {position}")
+        with self._lock:
+            rows = self._matching_rows(skills, any_skills, min_years)
+            if position is not None:
+                columns = np.full(len(rows), self.positions.index(position))
+            else:
+                columns = self.totals[rows].argmax(axis=1) if len(rows) else np.empty(0, dtype=np.int64)
+            scores = self.totals[rows, columns]
+            # Partial selection of the best scores; ties go to the earlier candidate
+            keys = scores.astype(np.int64) << 32 | (0xFFFFFFFF - rows)
+            k = min(limit, len(rows))
+            best = np.argpartition(-keys, k - 1)[:k] if 0 < k < len(rows) else np.arange(k)
+            best = best[np.argsort(-keys[best])]
+            results = [
+                {
+                    "id": int(self.ids[rows[i]]),
+                    "position": self.positions.keys[columns[i]],
+                    "score": int(scores[i]),
+                    "rating": rating(int(scores[i]), int(self.missing[rows[i], columns[i]]),
+                                     int(self.positions.must_have_counts[columns[i]])),
+                    "skills": [self.vocabulary[c] for c in np.flatnonzero(self.skills[rows[i]])],
+                }
+                for i in best
+            ]
+            details = self._details([result["id"] for result in results])
+        for result in results:
+            result.update(details[result["id"]])
+        return {
+            "matches": int(len(rows)),
+            "candidates": results,
+            "stale_positions": self.stale_positions,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def _details(self, candidate_ids: list[int]) -> dict:
+        if not candidate_ids:
+            return {}
+        placeholders = ", ".join("?" * len(candidate_ids))
+        rows = self._connect().execute(
+            f"SELECT {_DETAIL_COLUMNS} FROM candidates WHERE id IN ({placeholders})", candidate_ids
+        ).fetchall()
+        return {
+            row[0]: {
+                "name": row[1] or f"Candidate {row[0]}",
+                "source": row[2],
+                "years_experience": row[3],
+                "seniority": row[4],
+                "degree": row[5],
+                "certifications": json.loads(row[6]),
+                "languages": json.loads(row[7]),
+            }
+            for row in rows
+        }
+
+    def get(self, candidate_id: int) -> dict | None:
+        """Stored details of a candidate with the score and rating for every position"""
+        with self._lock:
+            row = np.searchsorted(self.ids, candidate_id)
+            if row >= len(self.ids) or self.ids[row] != candidate_id:
+                return None
+            details = self._details([candidate_id])[candidate_id]
+            scores = {
+                key: {
+                    "score": int(self.totals[row, column]),
+                    "rating": rating(int(self.totals[row, column]), int(self.missing[row, column]),
+                                     int(self.positions.must_have_counts[column])),
+                }
+                for column, key in enumerate(self.positions.keys)
+            }
+            skills = [self.vocabulary[c] for c in np.flatnonzero(self.skills[row])]
+        return {"id": candidate_id, **details, "skills": skills, "scores": scores}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "path": self.path,
+                "candidates": int(len(self.ids)),
+                "skills": len(self.vocabulary),
+                "positions": self.versions,
+                "stale_positions": self.stale_positions,
+                "unindexed_skills": self.unindexed_skills,
+                "rescore": dict(self.job),
+                "size_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+            }
+
+
+CANDIDATE_STORE = CandidateStore(get_candidate_store_settings()["path"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the evaluated candidate store")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser("import", help="Extract and store CV files")
+    import_parser.add_argument("paths", nargs="+", help="CV files (.pdf, .docx, .txt)")
+    search_parser = subparsers.add_parser("search", help="Show the best stored candidates")
+    search_parser.add_argument("--position", default=None, choices=list(JOB_POSITIONS))
+    search_parser.add_argument("--skill", action="append", default=[], help="Required skill (repeatable)")
+    search_parser.add_argument("--any-skill", action="append", default=[], help="One of these skills (repeatable)")
+    search_parser.add_argument("--min-years", type=float, default=0)
+    search_parser.add_argument("--limit", type=int, default=20)
+    rescore_parser = subparsers.add_parser("rescore", help="Re-score the candidates of changed positions")
+    rescore_parser.add_argument("--full", action="store_true", help="Re-score every candidate for every position")
+    subparsers.add_parser("status", help="Show how many candidates are stored")
+    args = parser.parse_args()
+
+    CANDIDATE_STORE.load()
+    if args.command == "status":
+        print(json.dumps(CANDIDATE_STORE.stats(), indent=2))
+    elif args.command == "search":
+        result = CANDIDATE_STORE.search(args.position, args.skill, args.any_skill, args.min_years, args.limit)
+        print(f"{result['matches']} matching candidates ({result['elapsed_ms']} ms)")
+        for candidate in result["candidates"]:
+            print(f"  #{candidate['id']} {candidate['name']}: {candidate['score']} for {candidate['position']} "
+                  f"({candidate['rating']}), {candidate['years_experience']:g} years, {', '.join(candidate['skills'])}")
+    elif args.command == "rescore":
+        if args.full:
+            CANDIDATE_STORE.plan_full_rescore()
+
+        def report(job):
+            print(f"  {job['rescored']}/{job['scores']} candidate scores re-scored")
+
+        print(json.dumps(CANDIDATE_STORE.rescore(progress=report), indent=2))
+    elif args.command == "import":
+        from cv_extractor import extract_cv_content
+        for path in args.paths:
+            with open(path, "rb") as f:
+                text = extract_cv_content(f, os.path.splitext(path)[1].lstrip(".") or "txt")
+            if not text.strip():
+                print(f"[WARNING] No text extracted from {path}")
+                continue
+            candidate_id = CANDIDATE_STORE.add_cv(text, name=os.path.basename(path), source="import")
+            print(f"[OK] {path} -> candidate #{candidate_id}")
+
+
+if __name__ == "__main__":
+    main()
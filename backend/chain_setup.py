@@ -6,13 +6,22 @@ Handles embedding generation, vector store creation, and RAG chain initializatio
 import os
 import csv
 import hashlib
+import time
 from pathlib import Path
+import numpy as np
 from langchain_openai import AzureOpenAIEmbeddings, AzureChatOpenAI
 from langchain_community.vectorstores import FAISS
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 from langchain_core.embeddings import Embeddings
 from function_tools import AVAILABLE_TOOLS
+from rate_limiter import get_scheduler, PRIORITY_INTERACTIVE, PRIORITY_BULK
+from token_utils import count_tokens
+from fallback_engine import (
+    FALLBACK_ENGINE, LLM_FALLBACK_RESPONSES, normalize_text, detect_language, extract_question
+)
+from faq_translations import translate_faq_question
+from ingestion import corpus_fingerprint, ingest_chunks, iter_chunks, read_manifest, save_index
 
 
 # Configuration
@@ -23,6 +32,14 @@ LLM_MODEL = "GPT-4o-mini"  # Will use env override in function
 BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
 FAISS_INDEX_PATH = os.path.join(BACKEND_DIR, "embeddings", "faiss_index")
 HR_FAQ_PATH = os.path.join(BACKEND_DIR, "data", "hr_faq.csv")
+HANDBOOK_INDEX_PATH = os.path.join(BACKEND_DIR, "embeddings", "handbook_index")
+
+# One FAQ index per language: Vietnamese questions are embedded against Vietnamese FAQ questions
+FAQ_INDEX_LANGUAGES = ("en", "vi")
+FAQ_LABELS = {
+    "en": ("Question", "Answer"),
+    "vi": ("Câu hỏi", "Trả lời"),
+}
 
 # Load credentials dynamically (not at import time)
 def get_credentials():
@@ -34,6 +51,8 @@ def get_credentials():
         "llm_api_key": os.getenv("AZURE_OPENAI_LLM_API_KEY", ""),
         "llm_endpoint": os.getenv("AZURE_OPENAI_LLM_ENDPOINT", ""),
         "llm_model": os.getenv("AZURE_OPENAI_LLM_DEPLOYMENT", "GPT-4o-mini"),
+        # Tool calling needs API version 2023-12-01-preview or later
+        "llm_api_version": os.getenv("AZURE_OPENAI_LLM_API_VERSION", "2024-02-01"),
     }
 
 # Keep old variables for backward compatibility (used before function calls)
@@ -69,99 +88,147 @@ class SimpleHashEmbeddings(Embeddings):
         return self.embed_documents([text])[0]
 
 
+class ScheduledEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that paces calls through the outbound quota scheduler.
+    Query embeddings (chat) are sent at interactive priority, document
+    embeddings (index builds) at bulk priority and in sub-batches.
+    """
+    def __init__(self, embeddings: Embeddings, batch_size: int = 64):
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.scheduler = get_scheduler("embedding")
+    
+    def embed_documents(self, texts):
+        """Embed search docs."""
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            self.scheduler.acquire(sum(count_tokens(text) for text in batch), PRIORITY_BULK)
+            vectors.extend(self.embeddings.embed_documents(batch))
+        return vectors
+    
+    def embed_query(self, text):
+        """Embed query text."""
+        self.scheduler.acquire(count_tokens(text), PRIORITY_INTERACTIVE)
+        return self.embeddings.embed_query(text)
+    
+    def embed_queries(self, texts, timeout: float | None = None):
+        """Embed several chat queries in one request at interactive priority (dropped after `timeout` seconds)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        tokens = sum(count_tokens(text) for text in texts)
+        # A caller that gave up leaves this thread behind: it must not keep its place in the quota queue
+        self.scheduler.acquire(tokens, PRIORITY_INTERACTIVE, timeout=timeout)
+        if deadline is not None and time.monotonic() >= deadline:
+            self.scheduler.settle(tokens, 0)
+            raise TimeoutError("Query embeddings deadline passed while waiting for the quota")
+        embeddings = self.embeddings
+        if deadline is not None and hasattr(embeddings, "model_kwargs"):
+            # model_kwargs go to every embeddings request, where the OpenAI client reads timeout as its own
+            timeout = max(0.0, deadline - time.monotonic())
+            embeddings = embeddings.copy(update={"model_kwargs": {**embeddings.model_kwargs, "timeout": timeout}})
+        return embeddings.embed_documents(texts)
+
+
 class SimpleFallbackLLM:
     """Simple fallback LLM when Azure OpenAI is not available"""
-    def __init__(self):
-        self.responses_en = {
-            "leave": "We offer 20 days of paid leave annually for full-time employees. Employees can carry over up to 5 days to the next year. Sick leave is provided separately at 10 days per year.",
-            "benefits": "Our benefits package includes health insurance, dental coverage, vision insurance, and a 401(k) plan with a 4% company match.",
-            "salary": "Salary reviews are conducted annually in January. Performance bonuses are distributed based on company performance and individual contributions.",
-            "remote": "We support flexible work arrangements. Employees can work remotely up to 2 days per week with manager approval.",
-            "policy": "Our company policies cover workplace conduct, confidentiality, anti-harassment, and ethics guidelines. Please refer to the employee handbook for details.",
-        }
-        self.responses_vi = {
-            "leave": "Chúng tôi cung cấp 20 ngày nghỉ có lương hàng năm cho nhân viên toàn thời gian. Nhân viên có thể mang 5 ngày còn lại sang năm tiếp theo. Nghỉ ốm được cung cấp riêng biệt với 10 ngày mỗi năm.",
-            "benefits": "Gói phúc lợi của chúng tôi bao gồm bảo hiểm y tế, bảo hiểm nha khoa, bảo hiểm thị lực và kế hoạch 401(k) với khoản đóng góp 4% của công ty.",
-            "salary": "Xét tăng lương được tiến hành hàng năm vào tháng Giêng. Tiền thưởng hiệu suất được phân phối dựa trên hiệu suất công ty và đóng góp cá nhân.",
-            "remote": "Chúng tôi hỗ trợ các sắp xếp công việc linh hoạt. Nhân viên có thể làm việc từ xa tối đa 2 ngày mỗi tuần với sự phê duyệt của quản lý.",
-            "policy": "Các chính sách công ty của chúng tôi bao gồm quy tắc ứng xử tại nơi làm việc, bảo mật, chống qu騷rối và các hướng dẫn đạo đức. Vui lòng tham khảo sổ tay nhân viên để biết chi tiết.",
-        }
+    # Runs in-process, so it is not subject to Azure quotas
+    is_local = True
     
     def invoke(self, messages):
         """Generate a simple response based on keywords in the message"""
         from langchain_core.messages import AIMessage
         
-        # Combine all message content into one string
-        combined_text = ""
-        language = "en"
-        for msg in messages:
-            combined_text += msg.content.lower() + " "
-        
-        # Detect language from message content
-        vi_keywords = ["tiếng việt", "việt", "vi", "vietnam", "hỏi", "về", "là gì", "làm sao", "như thế nào"]
-        if any(keyword in combined_text for keyword in vi_keywords):
-            language = "vi"
+        # The system prompt tells us the language; the question decides the topic
+        # (matching the whole prompt would match the retrieved context instead)
+        language = detect_language(normalize_text(" ".join(msg.content for msg in messages)))
+        question = extract_question(normalize_text(messages[-1].content)) if messages else ""
         
-        # Select appropriate response dictionary
-        responses = self.responses_vi if language == "vi" else self.responses_en
-        
-        # Find a matching response based on keywords
-        best_response = None
-        for keyword, response in responses.items():
-            if keyword in combined_text:
-                best_response = response
-                break
-        
-        # If no keyword match, return a default response
-        if not best_response:
-            if language == "vi":
-                best_response = "Cảm ơn bạn vì câu hỏi. Tôi là một Trợ lý HR dự phòng. Để biết thông tin cụ thể, vui lòng kiểm tra sổ tay nhân viên hoặc liên hệ với phòng HR trực tiếp."
-            else:
-                best_response = "Thank you for your question. I'm a fallback HR Assistant. For specific information, please check the employee handbook or contact HR directly."
-        
-        return AIMessage(content=best_response)
+        responses = LLM_FALLBACK_RESPONSES[language]
+        category = FALLBACK_ENGINE.classify(question, responses)
+        return AIMessage(content=responses[category] if category else responses["default"])
 
 
-def load_hr_faq_documents() -> list[Document]:
+def iter_faq_documents(language: str = "en"):
     """
-    Load HR FAQ data from CSV and convert to LangChain Documents.
+    Stream HR FAQ rows from the CSV as LangChain Documents.
     
-    Returns:
-        List of Document objects with HR Q&A pairs
-    """
-    documents = []
+    Args:
+        language: "en" or "vi" (Vietnamese questions from FAQ_TRANSLATIONS, answers stay in English)
     
+    Yields:
+        Document objects with HR Q&A pairs
+    """
     if not os.path.exists(HR_FAQ_PATH):
         raise FileNotFoundError(f"HR FAQ file not found: {HR_FAQ_PATH}")
     
+    question_label, answer_label = FAQ_LABELS.get(language, FAQ_LABELS["en"])
     with open(HR_FAQ_PATH, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
-        for row in reader:
+        for faq_id, row in enumerate(reader):
+            question = translate_faq_question(row['Question'], language)
             # Combine question and answer for better context
-            content = f"Question: {row['Question']}\n\nAnswer: {row['Answer']}"
-            doc = Document(
+            content = f"{question_label}: {question}\n\n{answer_label}: {row['Answer']}"
+            yield Document(
                 page_content=content,
                 metadata={
                     "source": "HR FAQ",
-                    "question": row['Question'],
+                    "question": question,
+                    "faq_id": faq_id,
+                    "faq_question": row['Question'],  # English question, the key of FAQ_TRANSLATIONS
+                    "language": language,
                     "type": "faq"
                 }
             )
-            documents.append(doc)
-    
-    return documents
 
 
-def create_or_load_faiss_index(force_recreate: bool = False) -> FAISS:
+def load_hr_faq_documents(language: str = "en") -> list[Document]:
     """
-    Create a FAISS vector store from HR FAQ documents or load existing index.
+    Load HR FAQ data from CSV and convert to LangChain Documents.
     
     Args:
-        force_recreate: If True, recreate the index even if it exists
+        language: "en" or "vi"
     
     Returns:
-        FAISS vector store instance
+        List of Document objects with HR Q&A pairs
     """
+    return list(iter_faq_documents(language))
+
+
+def faq_text_splitter() -> RecursiveCharacterTextSplitter:
+    """Splitter for FAQ and handbook documents"""
+    return RecursiveCharacterTextSplitter(
+        chunk_size=500,
+        chunk_overlap=100,
+        separators=["\n\n", "\n", " ", ""],
+        add_start_index=True  # Lets the context packer merge overlapping chunks
+    )
+
+
+def iter_faq_chunks(language: str = "en"):
+    """
+    Stream the chunks of the FAQ documents of a language.
+    Each chunk gets a stable doc_id ("<language>:<faq_id>:<start_index>").
+    """
+    for chunk in iter_chunks(iter_faq_documents(language), faq_text_splitter()):
+        metadata = chunk.metadata
+        metadata["doc_id"] = f"{language}:{metadata['faq_id']}:{metadata['start_index']}"
+        yield chunk
+
+
+def embeddings_identity(embeddings: Embeddings) -> str:
+    """Name of the embedding model, so an index is never extended with vectors of another model"""
+    inner = getattr(embeddings, "embeddings", embeddings)
+    return f"{type(inner).__name__}:{getattr(inner, 'model', '')}"
+
+
+def faiss_index_path(language: str = "en") -> str:
+    """Directory of the saved FAISS index of a language (English keeps the original path)"""
+    return FAISS_INDEX_PATH if language == "en" else f"{FAISS_INDEX_PATH}_{language}"
+
+
+def create_embeddings() -> Embeddings:
+    """Azure OpenAI embeddings if configured, otherwise simple hash embeddings"""
     # Get credentials dynamically
     creds = get_credentials()
     embedding_api_key = creds["embedding_api_key"]
@@ -174,12 +241,12 @@ def create_or_load_faiss_index(force_recreate: bool = False) -> FAISS:
     if embedding_api_key and embedding_endpoint:
         try:
             print("[INFO] Attempting to use Azure OpenAI embeddings...")
-            embeddings = AzureOpenAIEmbeddings(
+            embeddings = ScheduledEmbeddings(AzureOpenAIEmbeddings(
                 model=embedding_model,
                 api_version="2023-05-15",
                 azure_endpoint=embedding_endpoint,
                 api_key=embedding_api_key,
-            )
+            ))
             print("[OK] Azure OpenAI embeddings initialized")
         except Exception as e:
             print(f"[WARNING] Azure embeddings failed ({str(e)[:80]}...), falling back to hash-based embeddings")
@@ -187,58 +254,183 @@ def create_or_load_faiss_index(force_recreate: bool = False) -> FAISS:
     else:
         print("[WARNING] No Azure embedding credentials found, using hash-based embeddings")
         embeddings = SimpleHashEmbeddings()
+    return embeddings
+
+
+def create_or_load_faiss_index(force_recreate: bool = False, language: str = "en",
+                               embeddings: Embeddings | None = None) -> FAISS:
+    """
+    Create a FAISS vector store from HR FAQ documents or load existing index.
+    
+    Args:
+        force_recreate: If True, recreate the index even if it exists
+        language: Language of the FAQ questions to index ("en" or "vi")
+        embeddings: Embeddings to use (created from the credentials if None)
+    
+    Returns:
+        FAISS vector store instance
+    """
+    if embeddings is None:
+        embeddings = create_embeddings()
+    
+    # Fingerprint of the chunks to index (streamed, nothing is embedded yet)
+    corpus_hash, chunk_count = corpus_fingerprint(iter_faq_chunks(language))
+    fingerprint = hashlib.sha256(f"{embeddings_identity(embeddings)}\0{corpus_hash}".encode()).hexdigest()
     
     # Check if FAISS index already exists
-    index_path = Path(FAISS_INDEX_PATH)
+    index_dir = faiss_index_path(language)
+    index_path = Path(index_dir)
     if index_path.exists() and not force_recreate:
-        print(f"Loading existing FAISS index from {FAISS_INDEX_PATH}")
-        try:
-            faiss_store = FAISS.load_local(
-                FAISS_INDEX_PATH,
-                embeddings,
-                allow_dangerous_deserialization=True
-            )
-            return faiss_store
-        except Exception as e:
-            print(f"Error loading existing index: {e}. Creating new index...")
+        # Reuse the index only if it was built from the current FAQ chunks (an edited CSV is re-indexed)
+        if read_manifest(index_dir).get("fingerprint") == fingerprint:
+            print(f"Loading existing FAISS index from {index_dir}")
+            try:
+                faiss_store = FAISS.load_local(
+                    index_dir,
+                    embeddings,
+                    allow_dangerous_deserialization=True
+                )
+                return faiss_store
+            except Exception as e:
+                print(f"Error loading existing index: {e}. Creating new index...")
+        else:
+            print(f"Existing index in {index_dir} is out of date or incomplete. Creating new index...")
     
     # Create new FAISS index
-    print("Creating new FAISS index from HR FAQ documents...")
-    
-    # Load HR FAQ documents
-    documents = load_hr_faq_documents()
-    print(f"Loaded {len(documents)} HR FAQ documents")
-    
-    # Split documents into chunks for better retrieval
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=500,
-        chunk_overlap=100,
-        separators=["\n\n", "\n", " ", ""]
-    )
-    chunks = text_splitter.split_documents(documents)
-    print(f"Split into {len(chunks)} chunks")
+    print(f"Creating new FAISS index from HR FAQ documents ({language}, {chunk_count} chunks)...")
     
-    # Try to create FAISS vector store with current embeddings
+    # Stream the chunks through the embeddings in batches, checkpointing into the index directory
     # If Azure embeddings fail, fall back to simple hash embeddings
     try:
         print("[INFO] Creating FAISS index with current embeddings...")
-        faiss_store = FAISS.from_documents(chunks, embeddings)
+        faiss_store = ingest_chunks(iter_faq_chunks(language), embeddings, index_dir, fingerprint)
     except Exception as e:
         print(f"[WARNING] Failed to create embeddings ({str(e)[:80]}...), falling back to hash-based embeddings")
         embeddings = SimpleHashEmbeddings()
-        faiss_store = FAISS.from_documents(chunks, embeddings)
+        fingerprint = hashlib.sha256(f"{embeddings_identity(embeddings)}\0{corpus_hash}".encode()).hexdigest()
+        faiss_store = ingest_chunks(iter_faq_chunks(language), embeddings)
     
     # Try to save the index (but don't fail if it doesn't work)
     try:
-        os.makedirs(FAISS_INDEX_PATH, exist_ok=True)
-        faiss_store.save_local(FAISS_INDEX_PATH)
-        print(f"FAISS index saved to {FAISS_INDEX_PATH}")
+        save_index(faiss_store, index_dir, fingerprint)
+        print(f"FAISS index saved to {index_dir}")
     except Exception as save_error:
         print(f"[WARNING] Could not save FAISS index to disk ({str(save_error)[:60]}...), using in-memory index only")
     
     return faiss_store
 
 
+def create_or_load_faq_indexes(force_recreate: bool = False) -> dict[str, FAISS]:
+    """
+    Create or load the FAQ index of every language in FAQ_INDEX_LANGUAGES.
+    All indexes share the embeddings of the English one.
+    
+    Returns:
+        Language -> FAISS vector store
+    """
+    vector_stores = {"en": create_or_load_faiss_index(force_recreate, "en")}
+    embeddings = vector_stores["en"].embedding_function
+    for language in FAQ_INDEX_LANGUAGES:
+        if language not in vector_stores:
+            vector_stores[language] = create_or_load_faiss_index(force_recreate, language, embeddings)
+    
+    # Policy handbooks are searched from every language
+    # (merging moves the vectors out of the merged index, so it is loaded for each language)
+    handbook_chunks = 0
+    for vector_store in vector_stores.values():
+        handbook_store = load_handbook_index(embeddings)
+        if handbook_store is None:
+            break
+        handbook_chunks = handbook_store.index.ntotal
+        vector_store.merge_from(handbook_store)
+    if handbook_chunks:
+        print(f"[OK] Added {handbook_chunks} handbook chunks to the FAQ indexes")
+    return vector_stores
+
+
+def load_handbook_index(embeddings: Embeddings) -> FAISS | None:
+    """
+    Load the policy handbook index built by handbook_ingestion.py.
+    
+    Returns:
+        FAISS vector store, or None if there is none for these embeddings
+    """
+    manifest = read_manifest(HANDBOOK_INDEX_PATH)
+    if not manifest.get("documents") or manifest.get("embeddings") != embeddings_identity(embeddings):
+        return None
+    try:
+        return FAISS.load_local(HANDBOOK_INDEX_PATH, embeddings, allow_dangerous_deserialization=True)
+    except Exception as e:
+        print(f"[WARNING] Could not load the handbook index: {e}")
+        return None
+
+
+def get_retrieval_settings():
+    """Get retrieval relevance settings from environment variables"""
+    return {
+        # Minimum relevance (cosine similarity) for a document to be used as context; 0 disables
+        "score_threshold": float(os.getenv("RETRIEVAL_SCORE_THRESHOLD", "0.3")),
+        # What to do when no document is relevant: "lean" (LLM without context) or "fallback"
+        "low_relevance_mode": os.getenv("RETRIEVAL_LOW_RELEVANCE_MODE", "lean").lower(),
+    }
+
+
+def has_meaningful_scores(vector_store: FAISS) -> bool:
+    """Whether relevance scores of the store mean anything (not for hash-based embeddings)"""
+    return not isinstance(vector_store.embedding_function, SimpleHashEmbeddings)
+
+
+def batch_similarity_search(vector_store: FAISS, queries: list[str], k: int = 3,
+                            timeout: float | None = None) -> list[list[tuple]]:
+    """
+    Search the index for several queries at once.
+    Embeds all queries in a single embeddings request and runs one vectorized
+    FAISS search over the resulting matrix.
+    
+    Args:
+        vector_store: FAISS vector store instance
+        queries: Query strings
+        k: Number of documents to return per query
+        timeout: Seconds after which the embeddings request is dropped (None: the client's default)
+    
+    Returns:
+        For each query, a list of (Document, relevance) tuples, most relevant first.
+        Relevance is the cosine similarity clipped to [0, 1].
+    """
+    if not queries:
+        return []
+    
+    embeddings = vector_store.embedding_function
+    if hasattr(embeddings, "embed_queries"):
+        vectors = embeddings.embed_queries(queries, timeout=timeout)
+    elif hasattr(embeddings, "embed_documents"):
+        vectors = embeddings.embed_documents(queries)
+    else:
+        vectors = [embeddings(query) for query in queries]
+    
+    matrix = np.array(vectors, dtype=np.float32)
+    if getattr(vector_store, "_normalize_L2", False):
+        import faiss
+        faiss.normalize_L2(matrix)
+    distances, indices = vector_store.index.search(matrix, k)
+    # The flat L2 index returns squared distances. Our embeddings have a constant norm
+    # (unit-length Azure vectors, +/-1 hash vectors), so for a document vector with the
+    # query's norm, cosine similarity = 1 - distance / (2 * |query|^2)
+    squared_norms = np.maximum(np.einsum("ij,ij->i", matrix, matrix), 1e-12)
+    relevances = np.clip(1.0 - distances / (2.0 * squared_norms[:, None]), 0.0, 1.0)
+    
+    results = []
+    for row_relevances, row_indices in zip(relevances, indices):
+        docs = []
+        for relevance, index in zip(row_relevances, row_indices):
+            if index == -1:
+                continue
+            doc = vector_store.docstore.search(vector_store.index_to_docstore_id[index])
+            docs.append((doc, float(relevance)))
+        results.append(docs)
+    return results
+
+
 def setup_rag_chain(vector_store: FAISS):
     """
     Set up the LLM with function calling support for RAG.
@@ -263,7 +455,7 @@ def setup_rag_chain(vector_store: FAISS):
             llm = AzureChatOpenAI(
                 model=llm_model,
                 temperature=0.7,
-                api_version="2023-05-15",
+                api_version=creds["llm_api_version"],
                 azure_endpoint=llm_endpoint,
                 api_key=llm_api_key,
             )
@@ -282,24 +474,24 @@ def setup_rag_chain(vector_store: FAISS):
     return llm, retriever
 
 
-def initialize_rag_system() -> tuple[FAISS, tuple]:
+def initialize_rag_system() -> tuple[dict, tuple]:
     """
     Complete initialization of the RAG system.
     
     Returns:
-        Tuple of (FAISS vector store, (llm, retriever))
+        Tuple of (language -> FAISS vector store, (llm, retriever))
     """
     print("Initializing RAG system...")
     
     try:
-        # Create or load FAISS index (don't force recreate, use existing if available)
-        vector_store = create_or_load_faiss_index(force_recreate=False)
+        # Create or load the FAQ indexes (don't force recreate, use existing if available)
+        vector_stores = create_or_load_faq_indexes(force_recreate=False)
         
         # Set up RAG components
-        llm, retriever = setup_rag_chain(vector_store)
+        llm, retriever = setup_rag_chain(vector_stores["en"])
         
         print("RAG system initialized successfully!")
-        return vector_store, (llm, retriever)
+        return vector_stores, (llm, retriever)
     except Exception as e:
         print(f"[ERROR] Failed to initialize RAG system: {str(e)}")
         print("[INFO] Creating fallback FAISS index with hash embeddings...")
@@ -307,21 +499,15 @@ def initialize_rag_system() -> tuple[FAISS, tuple]:
         try:
             # Force use of hash embeddings
             embeddings = SimpleHashEmbeddings()
-            documents = load_hr_faq_documents()
-            
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=500,
-                chunk_overlap=100,
-                separators=["\n\n", "\n", " ", ""]
-            )
-            chunks = text_splitter.split_documents(documents)
-            
-            vector_store = FAISS.from_documents(chunks, embeddings)
+            vector_stores = {
+                language: ingest_chunks(iter_faq_chunks(language), embeddings)
+                for language in FAQ_INDEX_LANGUAGES
+            }
             llm = SimpleFallbackLLM()
-            retriever = vector_store.as_retriever(search_kwargs={"k": 3})
+            retriever = vector_stores["en"].as_retriever(search_kwargs={"k": 3})
             
             print("[OK] Fallback RAG system initialized!")
-            return vector_store, (llm, retriever)
+            return vector_stores, (llm, retriever)
         except Exception as fallback_e:
             print(f"[CRITICAL] Fallback RAG initialization failed: {str(fallback_e)}")
             raise
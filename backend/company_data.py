@@ -168,6 +168,36 @@ SKILL_SCORES = {
     "JIRA": 5,
 }
 
+# Other names of skills in CVs (matched on word boundaries)
+SKILL_SYNONYMS = {
+    "python": ["python", "py", "pyton"],
+    "machine learning": ["machine learning", "ml", "artificial intelligence", "ai", "ai engineer", "machine", "learning", "predictive"],
+    "ai": ["ai", "artificial intelligence", "machine learning", "ml", "ai engineer", "agi"],
+    "data analysis": ["data analysis", "data analytics", "analytics", "data science", "analysis"],
+    "tensorflow": ["tensorflow", "tf"],
+    "pytorch": ["pytorch", "torch"],
+    "nlp": ["nlp", "natural language processing", "language model", "text processing", "language models", "genai", "generative ai"],
+    "computer vision": ["computer vision", "cv", "image processing", "vision"],
+    "deep learning": ["deep learning", "neural network", "nn", "deep", "cnn", "rnn"],
+    "langchain": ["langchain", "lang chain"],
+    "llm": ["llm", "large language model", "language model", "gpt", "chatbot", "llms", "generative", "rag"],
+    "faiss": ["faiss", "vector search", "similarity search", "vector database", "vector"],
+    "hugging face": ["hugging face", "transformers", "hf"],
+    "openai": ["openai", "gpt", "chatgpt"],
+    "aws": ["aws", "amazon web services", "cloud", "sagemaker"],
+    "azure": ["azure", "microsoft cloud"],
+    "gcp": ["gcp", "google cloud", "google cloud platform"],
+    "docker": ["docker", "containerization"],
+    "kubernetes": ["kubernetes", "k8s"],
+    "fastapi": ["fastapi", "api development"],
+    "sql": ["sql", "database", "postgresql", "mysql"],
+    "git": ["git", "version control", "github"],
+    "deployment": ["deployment", "production", "devops", "ci/cd"],
+    "leadership": ["leadership", "lead", "mentor", "team lead"],
+    "communication": ["communication", "presentation", "collaboration"],
+    "testing": ["testing", "qa", "unit test", "automation"]
+}
+
 # Experience multiplier
 EXPERIENCE_MULTIPLIER = {
     "0-1": 0.5,
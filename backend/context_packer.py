@@ -0,0 +1,158 @@
+"""
+Token-budgeted context packing for the LLM prompt.
+Retrieved chunks are grouped by the FAQ entry (or document) they come from,
+overlapping and adjacent chunks of one source are merged back into a single
+passage, and passages are added in retrieval order until the token budget is
+used up. A passage that does not fit is cut at a sentence boundary rather than
+mid-sentence.
+"""
+
+import os
+import re
+from dataclasses import dataclass, field
+
+from token_utils import count_tokens, truncate_to_tokens
+
+SECTION_SEPARATOR = "\n\n"
+# Longest overlap between consecutive chunks looked for when chunks have no start_index
+# (the splitter's chunk_overlap is 100 characters)
+MAX_CHUNK_OVERLAP_CHARS = 200
+# Do not add a truncated passage shorter than this
+MIN_PASSAGE_TOKENS = 30
+# Labels of the question line in FAQ chunks (English and Vietnamese index variants)
+QUESTION_LABELS = ("Question", "Câu hỏi")
+
+_SENTENCE_END_RE = re.compile(r"[.!?。](?=\s|$)|\n")
+
+
+def get_context_settings():
+    """Get context packing settings from environment variables"""
+    return {
+        "max_tokens": int(os.getenv("CONTEXT_MAX_TOKENS", "600")),
+        "max_sources": int(os.getenv("CONTEXT_MAX_SOURCES", "3")),
+    }
+
+
+@dataclass
+class PackedContext:
+    """Context text for the prompt and what went into it"""
+    text: str = ""
+    tokens: int = 0
+    sources: list[str] = field(default_factory=list)  # Source questions/titles, in order
+    chunks_used: int = 0
+    truncated: bool = False
+
+
+def source_key(doc) -> str:
+    """Identify the FAQ entry or document a chunk belongs to"""
+    metadata = doc.metadata or {}
+    return metadata.get("question") or metadata.get("title") or metadata.get("source") or doc.page_content[:80]
+
+
+def merge_chunks(chunks: list) -> str:
+    """
+    Merge the chunks of one source into a passage.
+
+    Chunks with a start_index (added by the text splitter) are placed by position,
+    so overlapping text appears once; other chunks are joined after removing the
+    longest suffix/prefix overlap.
+    """
+    if all("start_index" in (chunk.metadata or {}) for chunk in chunks):
+        ordered = sorted(chunks, key=lambda chunk: chunk.metadata["start_index"])
+        text = ordered[0].page_content
+        end = ordered[0].metadata["start_index"] + len(text)
+        for chunk in ordered[1:]:
+            start = chunk.metadata["start_index"]
+            content = chunk.page_content
+            if start + len(content) <= end:
+                continue  # Entirely inside what we already have
+            if start <= end:
+                text += content[end - start:]
+            else:
+                text += " … " + content
+            end = start + len(content)
+        return text
+
+    text = chunks[0].page_content
+    for chunk in chunks[1:]:
+        content = chunk.page_content
+        if content in text:
+            continue
+        overlap = 0
+        for size in range(min(len(text), len(content), MAX_CHUNK_OVERLAP_CHARS), 0, -1):
+            if text.endswith(content[:size]):
+                overlap = size
+                break
+        text += content[overlap:] if overlap else " … " + content
+    return text
+
+
+def format_passage(question: str, passage: str, label: str = "FAQ") -> str:
+    """Passage section for the prompt, without repeating the question inside the FAQ text"""
+    for question_label in QUESTION_LABELS:
+        prefix = f"{question_label}: {question}"
+        if question and passage.startswith(prefix):
+            passage = passage[len(prefix):].lstrip()
+            break
+    return f"From {label}: {question}\n{passage}" if question else passage
+
+
+def truncate_at_sentence(text: str, max_tokens: int) -> str:
+    """Cut text to the token limit, ending at the last complete sentence if there is one"""
+    cut = truncate_to_tokens(text, max_tokens)
+    if len(cut) == len(text):
+        return text
+    sentence_ends = [match.end() for match in _SENTENCE_END_RE.finditer(cut)]
+    if sentence_ends and sentence_ends[-1] > len(cut) // 2:
+        return cut[:sentence_ends[-1]].rstrip()
+    return cut.rstrip() + "…"
+
+
+def pack_context(docs: list, max_tokens: int | None = None, max_sources: int | None = None) -> PackedContext:
+    """
+    Build the prompt context from retrieved chunks within a token budget.
+
+    Args:
+        docs: Retrieved chunks, most relevant first
+        max_tokens: Token budget for the context (CONTEXT_MAX_TOKENS by default)
+        max_sources: Maximum number of sources (CONTEXT_MAX_SOURCES by default)
+
+    Returns:
+        PackedContext with the text and its token count
+    """
+    settings = get_context_settings()
+    max_tokens = settings["max_tokens"] if max_tokens is None else max_tokens
+    max_sources = settings["max_sources"] if max_sources is None else max_sources
+
+    # Group chunks by source, keeping the order in which sources were first retrieved
+    groups = {}
+    for doc in docs:
+        groups.setdefault(source_key(doc), []).append(doc)
+
+    packed = PackedContext()
+    sections = []
+    separator_tokens = count_tokens(SECTION_SEPARATOR)
+    for key, chunks in list(groups.items())[:max_sources]:
+        metadata = chunks[0].metadata or {}
+        label = "FAQ" if metadata.get("type", "faq") == "faq" else metadata.get("source", "Document")
+        section = format_passage(metadata.get("question", ""), merge_chunks(chunks), label)
+        cost = count_tokens(section) + (separator_tokens if sections else 0)
+        remaining = max_tokens - packed.tokens
+        if cost > remaining:
+            # Use what is left of the budget for part of this passage, then stop
+            available = remaining - (separator_tokens if sections else 0)
+            if available >= MIN_PASSAGE_TOKENS:
+                section = truncate_at_sentence(section, available)
+                sections.append(section)
+                packed.sources.append(key)
+                packed.chunks_used += len(chunks)
+            packed.truncated = True
+            break
+        sections.append(section)
+        packed.tokens += cost
+        packed.sources.append(key)
+        packed.chunks_used += len(chunks)
+
+    packed.text = SECTION_SEPARATOR.join(sections)
+    packed.tokens = count_tokens(packed.text)
+    return packed
@@ -3,28 +3,210 @@ CV Text Extractor Module
 Extracts text from various file formats (PDF, DOCX, TXT)
 """
 
-import base64
+import binascii
+import contextlib
 import io
+import multiprocessing
+import os
 import re
+import tempfile
+import zipfile
+import xml.etree.ElementTree as ElementTree
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Tuple
 
+from cv_features import extract_cv_features
+
 try:
     from PyPDF2 import PdfReader
 except ImportError:
     PdfReader = None
 
-try:
-    from docx import Document
-except ImportError:
-    Document = None
+WORD_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+W = f"{{{WORD_NAMESPACE}}}"
+# Run content rendered as text, as python-docx renders it
+WORD_RUN_TEXT = {f"{W}tab": "\t", f"{W}ptab": "\t", f"{W}cr": "\n", f"{W}noBreakHyphen": "-"}
+
+# Worker processes start fresh: forking the multi-threaded API process could copy locks
+# held by other threads (and its loaded indexes) into the workers
+PROCESS_POOL_CONTEXT = multiprocessing.get_context("spawn")
+
+# Base64 characters decoded per block (a multiple of 4)
+BASE64_BLOCK_CHARS = 1 << 16
+_BASE64_IGNORED_RE = re.compile(rb"[^A-Za-z0-9+/=]")
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when a decoded upload exceeds UPLOAD_MAX_BYTES"""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds the maximum size of {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+def get_cv_extraction_settings():
+    """Get document extraction settings from environment variables"""
+    return {
+        "pdf_workers": int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1)))),
+        "pdf_parallel_min_pages": int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64")),
+        "cv_max_pages": int(os.getenv("CV_MAX_PAGES", "20")),
+        "upload_max_bytes": int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024))),
+        "upload_spool_bytes": int(os.getenv("UPLOAD_SPOOL_BYTES", str(1024 * 1024))),
+    }
+
+
+def decode_base64_upload(text: str, start: int = 0, end: int | None = None, max_bytes: int | None = None):
+    """
+    Decode a base64 upload block by block into a spooled temporary file
+    
+    Only one block of the payload is copied at a time (no slice of the whole
+    payload, no full decoded bytes object), the file stays in memory up to
+    UPLOAD_SPOOL_BYTES and moves to disk beyond, and decoding stops as soon as
+    the decoded size exceeds the maximum. Characters outside the base64
+    alphabet (line breaks, spaces) are ignored, as base64.b64decode does.
+    
+    Args:
+        text: String holding the base64 payload (e.g. the whole chat message)
+        start: Index of the payload in text
+        end: Index after the payload (end of text if None)
+        max_bytes: Maximum decoded size (UPLOAD_MAX_BYTES by default, 0 for no limit)
+        
+    Returns:
+        Spooled temporary file positioned at the start of the decoded content
+        
+    Raises:
+        UploadTooLargeError: If the decoded content exceeds max_bytes
+        ValueError: If the payload is not valid base64
+    """
+    settings = get_cv_extraction_settings()
+    max_bytes = settings["upload_max_bytes"] if max_bytes is None else max_bytes
+    end = len(text) if end is None else min(end, len(text))
+    output = tempfile.SpooledTemporaryFile(max_size=settings["upload_spool_bytes"])
+    try:
+        pending = b""
+        size = 0
+        for position in range(start, end, BASE64_BLOCK_CHARS):
+            block = text[position:min(position + BASE64_BLOCK_CHARS, end)].encode("ascii")
+            pending += _BASE64_IGNORED_RE.sub(b"", block)
+            # Whole 4-character groups are decoded, the rest waits for the next block
+            usable = len(pending) - len(pending) % 4
+            decoded = binascii.a2b_base64(pending[:usable])
+            pending = pending[usable:]
+            size += len(decoded)
+            if max_bytes and size > max_bytes:
+                raise UploadTooLargeError(max_bytes)
+            output.write(decoded)
+        if pending:
+            # A truncated payload fails like base64.b64decode (incorrect padding)
+            output.write(binascii.a2b_base64(pending))
+        output.seek(0)
+        return output
+    except Exception:
+        output.close()
+        raise
+
+
+def open_upload(content):
+    """
+    Decoded file of an upload
+    
+    Args:
+        content: Base64 encoded string, or the decoded content as bytes or a binary file object
+        
+    Returns:
+        Context manager giving a binary file object (closing only the files it decoded)
+    """
+    if isinstance(content, str):
+        return decode_base64_upload(content)
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        return io.BytesIO(content)
+    return contextlib.nullcontext(content)
+
+
+def _binary_stream(data):
+    """File object for bytes or a binary file object (rewound)"""
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return io.BytesIO(data)
+    data.seek(0)
+    return data
+
+
+def iter_pdf_pages(pdf_file, start: int = 0, stop: int | None = None):
+    """
+    Yield the text of the pages of a PDF one at a time
+    
+    Pages are only extracted as the iterator is consumed, so a caller that
+    stops early does not pay for the rest of the document.
+    
+    Args:
+        pdf_file: PDF file content, as bytes or a binary file object
+        start: Index of the first page
+        stop: Index after the last page (end of the document if None)
+        
+    Yields:
+        Text of each page, in page order (nothing if PyPDF2 is not installed)
+    """
+    if not PdfReader:
+        return
+    pages = PdfReader(_binary_stream(pdf_file)).pages
+    stop = len(pages) if stop is None else min(stop, len(pages))
+    for index in range(start, stop):
+        yield pages[index].extract_text() or ""
+
+
+def _extract_pdf_range(pdf_bytes: bytes, start: int, stop: int) -> list[str]:
+    """Text of a range of pages (runs in a worker process)"""
+    return list(iter_pdf_pages(pdf_bytes, start, stop))
 
 
-def extract_pdf_text(pdf_base64: str) -> str:
+def extract_pdf_pages(pdf_file, max_pages: int | None = None, workers: int | None = None) -> list[str]:
+    """
+    Extract the text of each page of a PDF
+    
+    Documents of at least PDF_PARALLEL_MIN_PAGES pages are split into one
+    contiguous page range per worker process; smaller ones are read in-process.
+    
+    Args:
+        pdf_file: PDF file content, as bytes or a binary file object
+        max_pages: Only extract the first pages (all pages if None or 0)
+        workers: Worker processes (PDF_EXTRACT_WORKERS by default, 1 reads serially)
+        
+    Returns:
+        Text of each page, in page order (empty if PyPDF2 is not installed)
+    """
+    if not PdfReader:
+        return []
+    settings = get_cv_extraction_settings()
+    workers = max(1, workers or settings["pdf_workers"])
+    page_count = len(PdfReader(_binary_stream(pdf_file)).pages)
+    if max_pages:
+        page_count = min(page_count, max_pages)
+    
+    if workers == 1 or page_count < max(2, settings["pdf_parallel_min_pages"]):
+        return list(iter_pdf_pages(pdf_file, 0, page_count))
+    
+    # The workers each get a copy of the content
+    pdf_bytes = pdf_file if isinstance(pdf_file, bytes) else _binary_stream(pdf_file).read()
+    # Contiguous ranges keep each worker's reads local; results are concatenated in order
+    step = -(-page_count // workers)
+    ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+    try:
+        with ProcessPoolExecutor(max_workers=len(ranges), mp_context=PROCESS_POOL_CONTEXT) as pool:
+            futures = [pool.submit(_extract_pdf_range, pdf_bytes, start, stop) for start, stop in ranges]
+            return [text for future in futures for text in future.result()]
+    except (BrokenProcessPool, OSError) as e:
+        print(f"[WARNING] Parallel PDF extraction unavailable ({str(e)}), reading pages serially")
+        return list(iter_pdf_pages(pdf_bytes, 0, page_count))
+
+
+def extract_pdf_text(pdf_base64, max_pages: int | None = None) -> str:
     """
     Extract text from PDF (base64 encoded)
     
     Args:
-        pdf_base64: Base64 encoded PDF string
+        pdf_base64: Base64 encoded PDF string (or the decoded file, see open_upload)
+        max_pages: Only extract the first pages (all pages if None or 0)
         
     Returns:
         Extracted text from PDF
@@ -33,93 +215,187 @@ def extract_pdf_text(pdf_base64: str) -> str:
         return ""
     
     try:
-        # Decode base64 to bytes
-        pdf_bytes = base64.b64decode(pdf_base64)
-        
-        # Create PDF reader from bytes
-        pdf_file = io.BytesIO(pdf_bytes)
-        pdf_reader = PdfReader(pdf_file)
-        
-        # Extract text from all pages
-        extracted_text = ""
-        for page in pdf_reader.pages:
-            extracted_text += page.extract_text() + "\n"
-        
-        return extracted_text.strip()
+        # Decode base64 into a file
+        with open_upload(pdf_base64) as pdf_file:
+            # Extract text from the pages
+            return "\n".join(extract_pdf_pages(pdf_file, max_pages=max_pages)).strip()
+    except UploadTooLargeError:
+        raise
     except Exception as e:
         print(f"[WARNING] Failed to extract PDF: {str(e)}")
         return ""
 
 
-def extract_docx_text(docx_base64: str) -> str:
+def _docx_uses_rendered_breaks(archive: zipfile.ZipFile) -> bool:
+    """Whether Word recorded the page breaks it rendered (scans the raw XML without parsing it)"""
+    marker = b"lastRenderedPageBreak"
+    tail = b""
+    with archive.open("word/document.xml") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            if marker in tail + block:
+                return True
+            tail = block[-len(marker):]
+    return False
+
+
+def iter_docx_paragraphs(docx_file):
+    """
+    Stream the paragraphs and table cells of a DOCX with the page they start on
+    
+    word/document.xml is parsed incrementally straight from the zip and each
+    paragraph is discarded once its text is read, so memory stays flat however
+    long the document is. A table cell is yielded as one item (its paragraphs
+    joined by newlines) when the cell ends. Page numbers follow the page breaks
+    Word recorded when the file was last saved (or the explicit page breaks if
+    there are none), so they are approximate for files not saved by Word.
+    
+    Args:
+        docx_file: DOCX file content, as bytes or a binary file object
+        
+    Yields:
+        (page number, text) tuples in document order
+    """
+    with zipfile.ZipFile(_binary_stream(docx_file)) as archive:
+        rendered_breaks = _docx_uses_rendered_breaks(archive)
+        page = 1
+        cells = []  # (start page, paragraph texts) of the open table cells, innermost last
+        depth = 0
+        body = None
+        with archive.open("word/document.xml") as f:
+            for event, element in ElementTree.iterparse(f, events=("start", "end")):
+                if event == "start":
+                    depth += 1
+                    if element.tag == f"{W}body":
+                        body = element
+                    elif element.tag == f"{W}tc":
+                        cells.append((page, []))
+                    continue
+                depth -= 1
+                
+                if element.tag == f"{W}p":
+                    start_page = page
+                    has_text = False
+                    parts = []
+                    for child in element.iter():
+                        tag = child.tag
+                        if tag == f"{W}t":
+                            parts.append(child.text or "")
+                            has_text = has_text or bool(child.text)
+                        elif tag in WORD_RUN_TEXT:
+                            parts.append(WORD_RUN_TEXT[tag])
+                        elif tag == f"{W}br":
+                            break_type = child.get(f"{W}type")
+                            if break_type is None or break_type == "textWrapping":
+                                parts.append("\n")
+                            elif break_type == "page" and not rendered_breaks:
+                                page += 1
+                                # A break before any text moves the whole paragraph to the next page
+                                if not has_text:
+                                    start_page = page
+                        elif tag == f"{W}lastRenderedPageBreak" and rendered_breaks:
+                            page += 1
+                            if not has_text:
+                                start_page = page
+                    # Cleared so that an enclosing paragraph (text box) does not read it again
+                    element.clear()
+                    text = "".join(parts)
+                    if cells:
+                        cell_page, texts = cells[-1]
+                        if not texts:
+                            cells[-1] = (start_page, texts)
+                        texts.append(text)
+                    else:
+                        yield start_page, text
+                elif element.tag == f"{W}tc":
+                    cell_page, texts = cells.pop()
+                    text = "\n".join(t for t in texts if t)
+                    if text:
+                        yield cell_page, text
+                
+                # Top-level body elements are done with once they end
+                if depth == 2 and body is not None:
+                    body.clear()
+
+
+def extract_docx_paragraphs(docx_bytes: bytes) -> list[tuple[int, str]]:
+    """
+    Extract the paragraphs and table cells of a DOCX with the page they start on
+    
+    Args:
+        docx_bytes: DOCX file content
+        
+    Returns:
+        (page number, text) tuples in document order (see iter_docx_paragraphs)
+    """
+    return list(iter_docx_paragraphs(docx_bytes))
+
+
+def extract_docx_text(docx_base64) -> str:
     """
     Extract text from DOCX (base64 encoded)
     
     Args:
-        docx_base64: Base64 encoded DOCX string
+        docx_base64: Base64 encoded DOCX string (or the decoded file, see open_upload)
         
     Returns:
         Extracted text from DOCX
     """
-    if not Document:
-        return ""
-    
     try:
-        # Decode base64 to bytes
-        docx_bytes = base64.b64decode(docx_base64)
-        
-        # Create Document from bytes
-        docx_file = io.BytesIO(docx_bytes)
-        doc = Document(docx_file)
-        
-        # Extract text from all paragraphs
-        extracted_text = ""
-        for paragraph in doc.paragraphs:
-            extracted_text += paragraph.text + "\n"
-        
-        return extracted_text.strip()
+        # Decode base64 into a file
+        with open_upload(docx_base64) as docx_file:
+            # Extract text from all paragraphs and table cells
+            return "\n".join(text for _, text in iter_docx_paragraphs(docx_file)).strip()
+    except UploadTooLargeError:
+        raise
     except Exception as e:
         print(f"[WARNING] Failed to extract DOCX: {str(e)}")
         return ""
 
 
-def extract_text_file(txt_base64: str) -> str:
+def extract_text_file(txt_base64) -> str:
     """
     Extract text from plain text file (base64 encoded)
     
     Args:
-        txt_base64: Base64 encoded text string
+        txt_base64: Base64 encoded text string (or the decoded file, see open_upload)
         
     Returns:
         Extracted text
     """
     try:
         # Decode base64 to string
-        text_bytes = base64.b64decode(txt_base64)
-        text = text_bytes.decode('utf-8', errors='ignore')
+        with open_upload(txt_base64) as text_file:
+            text = _binary_stream(text_file).read().decode('utf-8', errors='ignore')
         return text.strip()
+    except UploadTooLargeError:
+        raise
     except Exception as e:
         print(f"[WARNING] Failed to extract text file: {str(e)}")
         return ""
 
 
-def extract_cv_content(file_content: str, file_type: str) -> str:
+def extract_cv_content(file_content, file_type: str, max_pages: int | None = None) -> str:
     """
     Extract CV content based on file type
     
     Args:
-        file_content: Base64 encoded file content
+        file_content: Base64 encoded file content, or the decoded file (see decode_base64_upload)
         file_type: File type (pdf, docx, doc, txt)
+        max_pages: Pages of a PDF to read (CV_MAX_PAGES by default; a CV's
+            skills and experience are on its first pages)
         
     Returns:
         Extracted text content from CV
+        
+    Raises:
+        UploadTooLargeError: If the base64 content decodes to more than UPLOAD_MAX_BYTES
     """
     file_type = file_type.lower()
     
     print(f"[CV_EXTRACTOR] Extracting from {file_type} file...")
     
     if file_type in ['pdf']:
-        extracted = extract_pdf_text(file_content)
+        extracted = extract_pdf_text(file_content, max_pages or get_cv_extraction_settings()["cv_max_pages"])
     elif file_type in ['docx']:
         extracted = extract_docx_text(file_content)
     elif file_type in ['doc']:
@@ -149,31 +425,13 @@ def parse_cv_for_skills(cv_text: str) -> dict:
     Returns:
         Dictionary with parsed CV information
     """
-    cv_lower = cv_text.lower()
-    
-    # Extract years of experience
-    years_match = re.search(r'(\d+)\+?\s*(?:years?|yrs?)\s+(?:of\s+)?(?:experience|exp)', cv_lower)
-    years_experience = int(years_match.group(1)) if years_match else 0
-    
-    # Detect level (Junior, Mid, Senior)
-    level = "Junior"
-    if "senior" in cv_lower or "lead" in cv_lower or "principal" in cv_lower:
-        level = "Senior"
-    elif "mid" in cv_lower or "mid-level" in cv_lower:
-        level = "Mid"
-    
-    # Extract education level
-    education_level = "None"
-    if "phd" in cv_lower or "doctorate" in cv_lower:
-        education_level = "PhD"
-    elif "master" in cv_lower or "m.s." in cv_lower or "msc" in cv_lower:
-        education_level = "Master's"
-    elif "bachelor" in cv_lower or "b.s." in cv_lower or "bsc" in cv_lower:
-        education_level = "Bachelor's"
+    features = extract_cv_features(cv_text)
     
     return {
-        "years_experience": years_experience,
-        "level": level,
-        "education_level": education_level,
+        "years_experience": int(features.years_experience),
+        "level": features.level,
+        "education_level": features.degree,
+        "certifications": list(features.certifications),
+        "languages": list(features.languages),
         "raw_text": cv_text
     }
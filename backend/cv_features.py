@@ -0,0 +1,275 @@
+"""
+Structured CV features shared by the CV scorers.
+One compiled regex scans the lowercased CV once and yields employment date
+ranges ("2018 - 2022", "Mar 2019 – present"), stated experience ("5+ years of
+experience") and word tokens. From that pass come the years of experience
+(the stated figure or the merged date ranges, whichever is larger),
+seniority, highest degree, certifications, spoken languages and a set of the
+CV's word n-grams, so that keywords and skills are matched on word
+boundaries ("ms" no longer matches "teams").
+"""
+
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from functools import lru_cache
+
+from company_data import SKILL_SYNONYMS
+
+# Longest keyword phrase matched, in words
+MAX_PHRASE_WORDS = 4
+
+# Words joined by ".", "/", "+" or "#" stay one token (node.js, ci/cd, c++, b.sc)
+TOKEN_PATTERN = r"\w+(?:[./+#]\w+)*[+#]*"
+
+_MONTHS = ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec")
+_MONTH_PATTERN = r"jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?"
+
+
+# Whitespace within a line (line breaks are matched on their own)
+_SPACE = r"[^\S\n]"
+
+
+def _date_pattern(prefix: str) -> str:
+    return (rf"(?:(?P<{prefix}_month>{_MONTH_PATTERN})\.?{_SPACE}+|(?P<{prefix}_month_number>0?[1-9]|1[0-2]){_SPACE}*[/.]{_SPACE}*)?"
+            rf"(?P<{prefix}_year>(?:19|20)\d{{2}})")
+
+
+CV_FEATURE_RE = re.compile(
+    rf"(?P<range>{_date_pattern('start')}{_SPACE}*(?:-|–|—|~|to|until|till|đến){_SPACE}*"
+    rf"(?:{_date_pattern('end')}|(?P<present>present|current|now|today|nay|hiện{_SPACE}+tại)))"
+    rf"|(?P<years>\d{{1,2}}(?:[.,]\d)?){_SPACE}*\+?{_SPACE}*(?:years?|yrs?|năm)"
+    rf"(?P<experience>{_SPACE}+(?:of{_SPACE}+)?(?:\w+{_SPACE}+)?(?:experience|exp|kinh{_SPACE}+nghiệm))?"
+    rf"|(?P<token>{TOKEN_PATTERN})"
+    r"|(?P<newline>\n)"
+)
+_TOKEN_RE = re.compile(TOKEN_PATTERN)
+
+# Keyword phrases, most senior / highest first
+SENIORITY_KEYWORDS = {
+    "Senior": ["senior", "sr", "lead", "team lead", "tech lead", "principal", "staff engineer", "head of", "architect"],
+    "Mid": ["mid", "mid level", "intermediate"],
+    "Junior": ["junior", "jr", "intern", "internship", "trainee", "fresher", "entry level"],
+}
+DEGREE_KEYWORDS = {
+    "PhD": ["phd", "ph.d", "doctorate", "doctor of philosophy", "tiến sĩ"],
+    "Master's": ["master", "masters", "msc", "m.sc", "m.s", "mba", "meng", "m.eng", "thạc sĩ"],
+    "Bachelor's": ["bachelor", "bachelors", "bsc", "b.sc", "b.s", "beng", "b.eng", "b.a", "cử nhân"],
+}
+# Phrases whose words are not degrees ("Certified Scrum Master" is no Master's); the
+# certification phrases are masked too
+NON_DEGREE_PHRASES = ["scrum master"]
+DEGREE_RANKS = {"None": 0, "Bachelor's": 1, "Master's": 2, "PhD": 3}
+CERTIFICATION_KEYWORDS = {
+    "AWS Certified": ["aws certified"],
+    "Microsoft Certified": ["microsoft certified", "azure certified"],
+    "Google Cloud Certified": ["google cloud certified", "gcp certified"],
+    "Kubernetes (CKA/CKAD)": ["cka", "ckad"],
+    "PMP": ["pmp"],
+    "Scrum Master": ["certified scrum master", "csm", "psm"],
+    "ISTQB": ["istqb"],
+    "CCNA": ["ccna"],
+    "CISSP": ["cissp"],
+    "Oracle Certified": ["oracle certified", "ocp", "ocjp"],
+    "CompTIA": ["comptia"],
+}
+# Generic mentions of a certification, without a known name
+CERTIFICATION_WORDS = ["certification", "certifications", "certified", "certificate", "certificates", "chứng chỉ"]
+LANGUAGE_KEYWORDS = {
+    "English": ["english", "toefl", "ielts", "toeic", "esl", "tiếng anh"],
+    "Chinese": ["chinese", "mandarin", "hsk", "tiếng trung"],
+    "Japanese": ["japanese", "jlpt", "tiếng nhật"],
+    "Korean": ["korean", "topik", "tiếng hàn"],
+    "German": ["german", "goethe", "tiếng đức"],
+    "French": ["french", "delf", "tiếng pháp"],
+    "Spanish": ["spanish"],
+    "Vietnamese": ["vietnamese", "tiếng việt"],
+}
+# Date ranges on a line with one of these or a degree (or alone below such a line) are studies, not employment
+EDUCATION_WORDS = {"university", "college", "school", "academy", "institute", "education", "degree", "gpa",
+                   "đại", "học", "trường"}
+
+
+@lru_cache(maxsize=4096)
+def phrase_key(phrase: str) -> str:
+    """Phrase in the CV n-gram form (lowercased tokens joined by single spaces)"""
+    return " ".join(_TOKEN_RE.findall(phrase.lower()))
+
+
+_NON_DEGREE_KEYS = {phrase_key(phrase) for phrase in NON_DEGREE_PHRASES} | {
+    phrase_key(keyword) for keywords in CERTIFICATION_KEYWORDS.values() for keyword in keywords
+}
+
+_EDUCATION_TOKENS = EDUCATION_WORDS | {
+    phrase_key(keyword) for keywords in DEGREE_KEYWORDS.values() for keyword in keywords if " " not in keyword
+}
+
+
+def _masked_phrases(tokens: list[str], phrases: set, masks) -> set:
+    """
+    N-grams of the tokens that overlap no occurrence of the mask phrases.
+
+    Returns:
+        `phrases` itself when no mask phrase occurs in the CV
+    """
+    masks = [key.split() for key in masks if key in phrases]
+    if not masks:
+        return phrases
+    masked = [False] * len(tokens)
+    for words in masks:
+        for i in range(len(tokens) - len(words) + 1):
+            if tokens[i:i + len(words)] == words:
+                masked[i:i + len(words)] = [True] * len(words)
+    kept = set()
+    for size in range(1, MAX_PHRASE_WORDS + 1):
+        for i in range(len(tokens) - size + 1):
+            if not any(masked[i:i + size]):
+                kept.add(" ".join(tokens[i:i + size]))
+    return kept
+
+
+def _month(name: str | None, number: str | None, default: int) -> int:
+    if name:
+        return _MONTHS.index(name[:3]) + 1
+    return int(number) if number else default
+
+
+def _merged_months(intervals: list[tuple[int, int]]) -> int:
+    """Months covered by intervals of month indexes, overlaps counted once"""
+    total = 0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+@dataclass(frozen=True)
+class CVFeatures:
+    """Typed features of a CV"""
+    years_experience: float         # Larger of stated_years and range_years
+    stated_years: float             # Largest "N years (of experience)" figure
+    range_years: float              # Employment date ranges, merged
+    seniority: str | None           # Senior, Mid or Junior as stated in the CV
+    degree: str                     # PhD, Master's, Bachelor's or None
+    certifications: tuple           # Known certifications
+    certified: bool                 # Any certification mentioned, named or not
+    languages: tuple                # Spoken languages
+    phrases: frozenset = field(repr=False, default=frozenset())
+
+    @property
+    def level(self) -> str:
+        """Stated seniority, or the one the years of experience suggest"""
+        if self.seniority:
+            return self.seniority
+        if self.years_experience >= 5:
+            return "Senior"
+        return "Mid" if self.years_experience >= 2 else "Junior"
+
+    @property
+    def degree_rank(self) -> int:
+        return DEGREE_RANKS[self.degree]
+
+    def has(self, phrase: str) -> bool:
+        """Whether the CV contains the phrase as whole words"""
+        return phrase_key(phrase) in self.phrases
+
+    def has_any(self, phrases) -> bool:
+        return any(phrase_key(phrase) in self.phrases for phrase in phrases)
+
+    def count(self, phrases) -> int:
+        """Number of the phrases the CV contains"""
+        return sum(1 for phrase in phrases if phrase_key(phrase) in self.phrases)
+
+    def has_skill(self, skill: str) -> bool:
+        """
+        Whether the CV names a skill: directly, by all the words of a multi-word
+        skill, or by one of its SKILL_SYNONYMS
+        """
+        key = phrase_key(skill)
+        if key in self.phrases:
+            return True
+        words = key.split()
+        if len(words) > 1 and all(word in self.phrases for word in words):
+            return True
+        return self.has_any(SKILL_SYNONYMS.get(skill.lower(), ()))
+
+
+def extract_cv_features(cv_text: str, today: date | None = None) -> CVFeatures:
+    """
+    Extract the features of a CV in one pass of CV_FEATURE_RE.
+
+    Args:
+        cv_text: CV text
+        today: Date that "present" stands for (today if None)
+
+    Returns:
+        CVFeatures of the CV
+    """
+    today = today or date.today()
+    now_month = today.year * 12 + today.month
+    tokens = []
+    ranges = []         # (line, start month, end month)
+    stated = []         # (years, followed by "experience")
+    line_words = [0]    # Tokens of each line
+    education_lines = set()
+    for match in CV_FEATURE_RE.finditer(cv_text.lower()):
+        groups = match.groupdict()
+        if groups["token"] is not None:
+            token = groups["token"]
+            tokens.append(token)
+            line_words[-1] += 1
+            if token in _EDUCATION_TOKENS and not any(
+                " ".join(tokens[-size:]) in _NON_DEGREE_KEYS for size in range(2, MAX_PHRASE_WORDS + 1)
+            ):
+                # A Scrum Master job line is not a study line
+                education_lines.add(len(line_words) - 1)
+        elif groups["newline"] is not None:
+            line_words.append(0)
+        elif groups["range"] is not None:
+            start = int(groups["start_year"]) * 12 + _month(groups["start_month"], groups["start_month_number"], 1)
+            if groups["present"]:
+                end = now_month
+            else:
+                end = int(groups["end_year"]) * 12 + _month(groups["end_month"], groups["end_month_number"], 1)
+            if start < end <= now_month:
+                ranges.append((len(line_words) - 1, start, end))
+        else:
+            stated.append((float(groups["years"].replace(",", ".")), groups["experience"] is not None))
+
+    phrases = set()
+    for size in range(1, MAX_PHRASE_WORDS + 1):
+        for i in range(len(tokens) - size + 1):
+            phrases.add(" ".join(tokens[i:i + size]))
+
+    employment = [
+        (start, end) for line, start, end in ranges
+        if line not in education_lines and not (line_words[line] == 0 and line - 1 in education_lines)
+    ]
+    range_years = round(_merged_months(employment) / 12, 1)
+    # Mentions followed by "experience" are the candidate's; other "N years" figures only count without them
+    experience_years = [years for years, is_experience in stated if is_experience]
+    stated_years = min(max(experience_years or [years for years, _ in stated] or [0]), 50)
+
+    def first_match(keywords: dict, phrases: set = phrases):
+        return next((name for name, names in keywords.items() if any(phrase_key(k) in phrases for k in names)), None)
+
+    certifications = tuple(name for name, names in CERTIFICATION_KEYWORDS.items()
+                           if any(phrase_key(k) in phrases for k in names))
+    return CVFeatures(
+        years_experience=max(stated_years, range_years),
+        stated_years=stated_years,
+        range_years=range_years,
+        seniority=first_match(SENIORITY_KEYWORDS),
+        degree=first_match(DEGREE_KEYWORDS, _masked_phrases(tokens, phrases, _NON_DEGREE_KEYS)) or "None",
+        certifications=certifications,
+        certified=bool(certifications) or any(phrase_key(k) in phrases for k in CERTIFICATION_WORDS),
+        languages=tuple(name for name, names in LANGUAGE_KEYWORDS.items() if any(phrase_key(k) in phrases for k in names)),
+        phrases=frozenset(phrases),
+    )
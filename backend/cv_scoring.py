@@ -0,0 +1,195 @@
+"""
+CV scoring against the job positions.
+score_cv() scores one CV for one position as the chat CV evaluation does.
+For large candidate pools the same formula runs as matrix operations: each
+CV is reduced to a bit per skill of SKILL_VOCABULARY (SKILL_SCORES plus the
+position skills) and a position-independent base score, each position is
+compiled into must-have and nice-to-have indicator rows, and the scores of N
+CVs for M positions come from two (N x V) @ (V x M) products.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from company_data import JOB_POSITIONS, SKILL_SCORES
+from cv_features import CVFeatures
+
+MUST_HAVE_POINTS = 15
+NICE_TO_HAVE_POINTS = 5
+MAX_SCORE = 100
+SOFT_SKILLS = ["communication", "leadership", "teamwork"]
+
+# Ratings, best first, with the minimum score of each (NOT_SUITABLE is decided by missing must-haves)
+RATINGS = [
+    ("Excellent - Highly Recommended", 85),
+    ("Very Good - Recommended", 75),
+    ("Good - Consider for Interview", 60),
+    ("Below Threshold", 0),
+]
+NOT_SUITABLE = "Not Suitable"
+RATING_NAMES = [NOT_SUITABLE] + [name for name, _ in RATINGS]
+
+
+def build_skill_vocabulary(positions: dict = JOB_POSITIONS, skill_scores: dict = SKILL_SCORES) -> list[str]:
+    """Skills with a bit in the CV skill vectors: SKILL_SCORES, then position skills it lacks"""
+    vocabulary = list(skill_scores)
+    known = set(vocabulary)
+    for position in positions.values():
+        for skill in position["must_have"] + position["nice_to_have"]:
+            if skill not in known:
+                vocabulary.append(skill)
+                known.add(skill)
+    return vocabulary
+
+
+SKILL_VOCABULARY = build_skill_vocabulary()
+
+
+def experience_score(features: CVFeatures) -> int:
+    if features.seniority == "Senior":
+        return 20
+    return 15 if features.years_experience >= 3 else 5
+
+
+def education_score(features: CVFeatures) -> int:
+    score = 15 if features.degree_rank else 0
+    if features.certified:
+        score += 5
+    return min(score, 25)
+
+
+def soft_skills_score(features: CVFeatures) -> int:
+    return min(3 * features.count(SOFT_SKILLS), 20)
+
+
+def base_score(features: CVFeatures) -> int:
+    """Position-independent part of the score (experience, education, soft skills)"""
+    return experience_score(features) + education_score(features) + soft_skills_score(features)
+
+
+def rating(total_score: int, missing_count: int, must_have_count: int) -> str:
+    # Missing more than 50% of must-haves
+    if missing_count > must_have_count * 0.5:
+        return NOT_SUITABLE
+    return next(name for name, minimum in RATINGS if total_score >= minimum)
+
+
+def score_cv(features: CVFeatures, position: dict) -> dict:
+    """
+    Score a CV for a position.
+
+    Args:
+        features: Features of the CV
+        position: JOB_POSITIONS entry
+
+    Returns:
+        Dict with the score of each criterion, total_score, rating, found_skills
+        (must-haves first) and missing_must_haves
+    """
+    found_skills = []
+    missing_must_haves = []
+    for skill in position["must_have"]:
+        if features.has_skill(skill):
+            found_skills.append(skill)
+        else:
+            missing_must_haves.append(skill)
+    must_found = len(found_skills)
+    found_skills += [skill for skill in position["nice_to_have"] if features.has_skill(skill)]
+
+    scores = {
+        "must_have_score": MUST_HAVE_POINTS * must_found,
+        "nice_to_have_score": NICE_TO_HAVE_POINTS * (len(found_skills) - must_found),
+        "experience_score": experience_score(features),
+        "education_score": education_score(features),
+        "soft_skills_score": soft_skills_score(features),
+    }
+    total_score = min(sum(scores.values()), MAX_SCORE)
+    return {
+        **scores,
+        "total_score": total_score,
+        "rating": rating(total_score, len(missing_must_haves), len(position["must_have"])),
+        "found_skills": found_skills,
+        "missing_must_haves": missing_must_haves,
+    }
+
+
+def skill_vector(features: CVFeatures, vocabulary: list[str] = SKILL_VOCABULARY) -> np.ndarray:
+    """Boolean vector of the vocabulary skills the CV names (synonyms included)"""
+    return np.fromiter((features.has_skill(skill) for skill in vocabulary), dtype=bool, count=len(vocabulary))
+
+
+def pack_skills(vectors: np.ndarray) -> np.ndarray:
+    """Pack boolean skill vectors (N x V) into bitsets (N x ceil(V / 8) bytes)"""
+    return np.packbits(vectors, axis=-1)
+
+
+def unpack_skills(bitsets: np.ndarray, vocabulary_size: int = len(SKILL_VOCABULARY)) -> np.ndarray:
+    """Boolean skill vectors (N x V) of packed bitsets"""
+    return np.unpackbits(bitsets, axis=-1, count=vocabulary_size).astype(bool)
+
+
+@dataclass(frozen=True)
+class PositionMatrix:
+    """Job positions compiled over a skill vocabulary"""
+    keys: list              # Position keys, in row order
+    must_have: np.ndarray   # (M x V) 1.0 where the skill is a must-have
+    nice_to_have: np.ndarray  # (M x V) 1.0 where the skill is nice to have
+    must_have_counts: np.ndarray  # (M,) must-haves per position
+
+    def index(self, position_key: str) -> int:
+        return self.keys.index(position_key)
+
+
+def compile_positions(positions: dict = JOB_POSITIONS, vocabulary: list[str] = SKILL_VOCABULARY) -> PositionMatrix:
+    """Compile job positions into must-have and nice-to-have indicator matrices"""
+    column = {skill: i for i, skill in enumerate(vocabulary)}
+    keys = list(positions)
+    must_have = np.zeros((len(keys), len(vocabulary)), dtype=np.float32)
+    nice_to_have = np.zeros_like(must_have)
+    for row, key in enumerate(keys):
+        must_have[row, [column[skill] for skill in positions[key]["must_have"]]] = 1
+        nice_to_have[row, [column[skill] for skill in positions[key]["nice_to_have"]]] = 1
+    return PositionMatrix(keys, must_have, nice_to_have, must_have.sum(axis=1).astype(np.int32))
+
+
+def score_matrix(skills: np.ndarray, base_scores: np.ndarray, positions: PositionMatrix) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Score N CVs for M positions at once (same totals as score_cv).
+
+    Args:
+        skills: (N x V) boolean skill vectors (unpack_skills() of stored bitsets)
+        base_scores: (N,) base_score() of each CV
+        positions: Compiled positions over the same vocabulary
+
+    Returns:
+        Tuple of (N x M) total scores and (N x M) missing must-have counts, as int16
+    """
+    skills = skills.astype(np.float32, copy=False)
+    must_found = skills @ positions.must_have.T
+    nice_found = skills @ positions.nice_to_have.T
+    totals = MUST_HAVE_POINTS * must_found + NICE_TO_HAVE_POINTS * nice_found
+    totals += np.asarray(base_scores, dtype=np.float32)[:, None]
+    np.minimum(totals, MAX_SCORE, out=totals)
+    missing = positions.must_have_counts[None, :] - must_found
+    return totals.astype(np.int16), missing.astype(np.int16)
+
+
+def rating_matrix(totals: np.ndarray, missing: np.ndarray, positions: PositionMatrix) -> np.ndarray:
+    """Index in RATING_NAMES of the rating of each score (same ratings as rating())"""
+    codes = np.full(totals.shape, len(RATING_NAMES) - 1, dtype=np.int8)
+    # From the lowest threshold up, so the best rating reached wins
+    for code in range(len(RATINGS) - 1, 0, -1):
+        codes[totals >= RATINGS[code - 1][1]] = code
+    codes[missing > positions.must_have_counts[None, :] * 0.5] = 0
+    return codes
+
+
+def top_k(totals: np.ndarray, position: int, k: int) -> np.ndarray:
+    """Row indexes of the k best scores for a position, best first"""
+    column = totals[:, position]
+    k = min(k, len(column))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    best = np.argpartition(-column, k - 1)[:k]
+    return best[np.argsort(-column[best], kind="stable")]
@@ -0,0 +1,558 @@
+"""
+Employee directory used by the HR function tools.
+The default backend is SQLite with indexes on normalized name, name words,
+employee ID and department, plus a precomputed trigram index over the name
+vocabulary for fuzzy name resolution. Per-department leave totals are kept in
+a rollup table that triggers update whenever an employee is added, removed or
+has their balance changed. Other backends can be plugged in with set_directory().
+
+Usage:
+    python employee_directory.py import employees.csv [--db employees.db]
+"""
+
+import os
+import re
+import csv
+import sqlite3
+import argparse
+import threading
+import unicodedata
+
+# Mock employees used when no directory database or CSV is configured
+MOCK_EMPLOYEES = [
+    {"employee_id": "E001", "name": "Alice Johnson", "leave_balance": 5, "department": "Engineering"},
+    {"employee_id": "E002", "name": "Bob Smith", "leave_balance": 10, "department": "Sales"},
+    {"employee_id": "E003", "name": "Charlie Brown", "leave_balance": 3, "department": "HR"},
+    {"employee_id": "E004", "name": "Diana Prince", "leave_balance": 8, "department": "Marketing"},
+]
+
+EMPLOYEE_ID_RE = re.compile(r"^[A-Za-z]{0,4}\d+$")
+_NON_WORD_RE = re.compile(r"[^\w\s]")
+
+# Fuzzy matching: minimum trigram similarity for a name word to count as a match
+# and for a name to match overall, how many vocabulary words are scored per query
+# word, and how many employees are scored per query
+FUZZY_MIN_WORD_SIMILARITY = 0.3
+FUZZY_MIN_SIMILARITY = 0.5
+FUZZY_CANDIDATE_WORDS = 20
+FUZZY_MAX_CANDIDATES = 200
+
+
+def get_directory_settings():
+    """Get employee directory settings from environment variables"""
+    return {
+        "db_path": os.getenv("EMPLOYEE_DIRECTORY_DB", ""),
+        "csv_path": os.getenv("EMPLOYEE_DIRECTORY_CSV", ""),
+    }
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalize a name for matching: strip diacritics, casefold, drop punctuation.
+
+    "Nguyễn Văn Đức" and "nguyen van duc" both become "nguyen van duc".
+    """
+    decomposed = unicodedata.normalize("NFKD", name.replace("đ", "d").replace("Đ", "D"))
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(_NON_WORD_RE.sub(" ", stripped).casefold().split())
+
+
+def word_trigrams(word: str) -> set[str]:
+    """Character trigrams of a normalized word (padded so the word start counts)"""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def trigram_similarity(a: set[str], b: set[str]) -> float:
+    """Dice coefficient of two trigram sets"""
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def whole_days(days: float) -> int | float:
+    """Leave days as an int when whole, so they print as 5 rather than 5.0"""
+    return int(days) if float(days).is_integer() else days
+
+
+class EmployeeDirectory:
+    """
+    Interface of an employee directory backend.
+
+    Employees are dicts with employee_id, name, department and leave_balance.
+    """
+
+    def get(self, employee_id: str) -> dict | None:
+        """Get an employee by ID"""
+        raise NotImplementedError
+
+    def find_exact(self, name: str) -> list[dict]:
+        """Employees whose full name, or every word of whose name, matches exactly"""
+        raise NotImplementedError
+
+    def find_prefix(self, prefix: str, limit: int = 10) -> list[dict]:
+        """Employees with a name word starting with the prefix"""
+        raise NotImplementedError
+
+    def find_fuzzy(self, name: str, limit: int = 5) -> list[dict]:
+        """Employees whose name is similar to the given (possibly misspelled) name"""
+        raise NotImplementedError
+
+    def in_department(self, department: str) -> list[dict]:
+        """Employees of a department"""
+        raise NotImplementedError
+
+    def add_employees(self, employees) -> int:
+        """Insert or update employees; returns the number written"""
+        raise NotImplementedError
+
+    def count(self) -> int:
+        """Number of employees"""
+        raise NotImplementedError
+
+    def list_employees(self, limit: int | None = None) -> list[dict]:
+        """All employees (or the first `limit`) in name order"""
+        raise NotImplementedError
+
+    def department_leave_summary(self, department: str | None = None) -> list[dict]:
+        """
+        Leave totals per department, from the precomputed rollup.
+
+        Args:
+            department: Department name (all departments if None)
+
+        Returns:
+            Dicts with department, employees, total_leave and average_leave
+        """
+        raise NotImplementedError
+
+    def employees_below(self, threshold: float, department: str | None = None, limit: int = 50) -> list[dict]:
+        """Employees with a leave balance below the threshold, lowest first"""
+        raise NotImplementedError
+
+    def top_leave_balances(self, limit: int = 5, department: str | None = None, lowest: bool = False) -> list[dict]:
+        """Employees with the highest (or lowest) leave balances"""
+        raise NotImplementedError
+
+    def set_leave_balance(self, employee_id: str, leave_balance: float) -> dict | None:
+        """Set an employee's leave balance; returns the updated employee or None if unknown"""
+        raise NotImplementedError
+
+    def adjust_leave_balance(self, employee_id: str, delta: float) -> dict | None:
+        """Add to (or, with a negative delta, deduct from) an employee's leave balance"""
+        employee = self.get(employee_id)
+        if employee is None:
+            return None
+        return self.set_leave_balance(employee["employee_id"], employee["leave_balance"] + delta)
+
+    def resolve(self, name_or_id: str, fuzzy: bool = True) -> list[dict]:
+        """
+        Resolve a user-supplied name or employee ID to matching employees.
+
+        Tries, in order: employee ID, exact name, name-word prefix, fuzzy match.
+
+        Args:
+            name_or_id: Name, first name, last name or employee ID
+            fuzzy: Whether to fall back to prefix and fuzzy matching
+
+        Returns:
+            Matching employees (several if the name is ambiguous, empty if none)
+        """
+        query = name_or_id.strip()
+        if not query:
+            return []
+        if EMPLOYEE_ID_RE.match(query):
+            employee = self.get(query.upper())
+            if employee:
+                return [employee]
+        matches = self.find_exact(query)
+        if matches or not fuzzy:
+            return matches
+        matches = self.find_prefix(query)
+        if matches:
+            return matches
+        return self.find_fuzzy(query)
+
+    def import_csv(self, path: str) -> int:
+        """
+        Bulk-import employees from a CSV file.
+
+        The CSV needs employee_id, name and department columns; leave_balance is optional.
+
+        Returns:
+            Number of employees imported
+        """
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return self.add_employees(csv.DictReader(f))
+
+
+class SQLiteEmployeeDirectory(EmployeeDirectory):
+    """SQLite-backed employee directory"""
+
+    def __init__(self, db_path: str = ":memory:"):
+        self.db_path = db_path
+        # Tool calls run in a thread pool, so the connection is shared behind a lock
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS employees (
+                    employee_id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    name_norm TEXT NOT NULL,
+                    department TEXT NOT NULL,
+                    department_norm TEXT NOT NULL,
+                    leave_balance REAL NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS idx_employees_name_norm ON employees(name_norm);
+                CREATE INDEX IF NOT EXISTS idx_employees_department_norm ON employees(department_norm);
+
+                -- One row per word of each name, for first/last name and prefix lookups
+                CREATE TABLE IF NOT EXISTS name_words (
+                    word TEXT NOT NULL,
+                    employee_id TEXT NOT NULL,
+                    PRIMARY KEY (word, employee_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_name_words_employee ON name_words(employee_id);
+
+                -- Distinct name words with their frequencies, and the trigrams of each word,
+                -- for fuzzy matching of misspelled names
+                CREATE TABLE IF NOT EXISTS word_stats (
+                    word TEXT PRIMARY KEY,
+                    df INTEGER NOT NULL
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS word_trigrams (
+                    trigram TEXT NOT NULL,
+                    word TEXT NOT NULL,
+                    PRIMARY KEY (trigram, word)
+                ) WITHOUT ROWID;
+
+                -- Leave rollup per department, kept up to date by the triggers below
+                -- employee_id is the tie-breaker of balance orderings, so it is part of the indexes
+                CREATE INDEX IF NOT EXISTS idx_employees_department_leave
+                    ON employees(department_norm, leave_balance, employee_id);
+                CREATE INDEX IF NOT EXISTS idx_employees_leave ON employees(leave_balance, employee_id);
+                CREATE TABLE IF NOT EXISTS department_leave (
+                    department_norm TEXT PRIMARY KEY,
+                    department TEXT NOT NULL,
+                    employees INTEGER NOT NULL,
+                    total_leave REAL NOT NULL
+                ) WITHOUT ROWID;
+                CREATE TRIGGER IF NOT EXISTS trg_employees_insert_rollup AFTER INSERT ON employees
+                BEGIN
+                    INSERT INTO department_leave VALUES (NEW.department_norm, NEW.department, 1, NEW.leave_balance)
+                    ON CONFLICT(department_norm) DO UPDATE SET
+                        employees = employees + 1, total_leave = total_leave + excluded.total_leave;
+                END;
+                CREATE TRIGGER IF NOT EXISTS trg_employees_delete_rollup AFTER DELETE ON employees
+                BEGIN
+                    UPDATE department_leave
+                    SET employees = employees - 1, total_leave = total_leave - OLD.leave_balance
+                    WHERE department_norm = OLD.department_norm;
+                    DELETE FROM department_leave WHERE department_norm = OLD.department_norm AND employees <= 0;
+                END;
+                CREATE TRIGGER IF NOT EXISTS trg_employees_update_rollup
+                AFTER UPDATE OF department_norm, leave_balance ON employees
+                BEGIN
+                    UPDATE department_leave
+                    SET employees = employees - 1, total_leave = total_leave - OLD.leave_balance
+                    WHERE department_norm = OLD.department_norm;
+                    DELETE FROM department_leave WHERE department_norm = OLD.department_norm AND employees <= 0;
+                    INSERT INTO department_leave VALUES (NEW.department_norm, NEW.department, 1, NEW.leave_balance)
+                    ON CONFLICT(department_norm) DO UPDATE SET
+                        employees = employees + 1, total_leave = total_leave + excluded.total_leave;
+                END;
+            """)
+            # Databases created before the rollup existed: build it once from the employees
+            if not self._conn.execute("SELECT 1 FROM department_leave LIMIT 1").fetchone():
+                self._conn.execute(
+                    """INSERT INTO department_leave
+                       SELECT department_norm, MIN(department), COUNT(*), SUM(leave_balance)
+                       FROM employees GROUP BY department_norm"""
+                )
+
+    @staticmethod
+    def _to_employee(row) -> dict:
+        return {
+            "employee_id": row["employee_id"],
+            "name": row["name"],
+            "department": row["department"],
+            "leave_balance": whole_days(row["leave_balance"]),
+        }
+
+    def _rows(self, sql: str, params=()) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._to_employee(row) for row in rows]
+
+    def get(self, employee_id: str) -> dict | None:
+        rows = self._rows("SELECT * FROM employees WHERE employee_id = ?", (employee_id,))
+        return rows[0] if rows else None
+
+    def find_exact(self, name: str) -> list[dict]:
+        normalized = normalize_name(name)
+        if not normalized:
+            return []
+        rows = self._rows("SELECT * FROM employees WHERE name_norm = ? ORDER BY employee_id", (normalized,))
+        if rows:
+            return rows
+        # "alice", "johnson" or "van an": every word must be a word of the name
+        words = sorted(set(normalized.split()))
+        placeholders = ",".join("?" * len(words))
+        return self._rows(
+            f"""SELECT e.* FROM employees e JOIN (
+                    SELECT employee_id FROM name_words WHERE word IN ({placeholders})
+                    GROUP BY employee_id HAVING COUNT(*) = ?
+                ) w ON w.employee_id = e.employee_id
+                ORDER BY e.employee_id LIMIT 50""",
+            (*words, len(words)),
+        )
+
+    def find_prefix(self, prefix: str, limit: int = 10) -> list[dict]:
+        normalized = normalize_name(prefix)
+        if not normalized:
+            return []
+        if " " in normalized:
+            # Multi-word prefix of the full name ("alice jo")
+            return self._rows(
+                "SELECT * FROM employees WHERE name_norm >= ? AND name_norm < ? ORDER BY name_norm LIMIT ?",
+                (normalized, normalized + "\uffff", limit),
+            )
+        return self._rows(
+            """SELECT e.* FROM employees e JOIN (
+                   SELECT DISTINCT employee_id FROM name_words WHERE word >= ? AND word < ? LIMIT ?
+               ) w ON w.employee_id = e.employee_id
+               ORDER BY e.name_norm""",
+            (normalized, normalized + "\uffff", limit),
+        )
+
+    def _similar_words(self, word: str) -> dict[str, float]:
+        """Vocabulary words similar to a (normalized) query word, with their similarity"""
+        if self._conn.execute("SELECT 1 FROM word_stats WHERE word = ?", (word,)).fetchone():
+            return {word: 1.0}
+        query_trigrams = word_trigrams(word)
+        # The first-letter trigram ("  a") is shared by a large part of the vocabulary,
+        # so it is used for scoring but not for finding candidates
+        probes = [trigram for trigram in query_trigrams if not trigram.startswith("  ")] or list(query_trigrams)
+        placeholders = ",".join("?" * len(probes))
+        candidates = self._conn.execute(
+            f"""SELECT word FROM word_trigrams WHERE trigram IN ({placeholders})
+                GROUP BY word ORDER BY COUNT(*) DESC LIMIT ?""",
+            (*probes, FUZZY_CANDIDATE_WORDS),
+        ).fetchall()
+        similar = {}
+        for (candidate,) in candidates:
+            similarity = trigram_similarity(query_trigrams, word_trigrams(candidate))
+            if similarity >= FUZZY_MIN_WORD_SIMILARITY:
+                similar[candidate] = similarity
+        return similar
+
+    def find_fuzzy(self, name: str, limit: int = 5) -> list[dict]:
+        query_words = list(dict.fromkeys(normalize_name(name).split()))
+        if not query_words:
+            return []
+
+        with self._lock:
+            # Name words similar to each query word (empty for a word nothing resembles)
+            similar = [self._similar_words(word) for word in query_words]
+            if not any(similar):
+                return []
+            # Fetch candidates through the rarest query word only
+            frequencies = []
+            for words in similar:
+                if not words:
+                    frequencies.append(float("inf"))
+                    continue
+                placeholders = ",".join("?" * len(words))
+                df = self._conn.execute(
+                    f"SELECT COALESCE(SUM(df), 0) FROM word_stats WHERE word IN ({placeholders})", tuple(words)
+                ).fetchone()[0]
+                frequencies.append(df)
+            anchor = list(similar[frequencies.index(min(frequencies))])
+            placeholders = ",".join("?" * len(anchor))
+            rows = self._conn.execute(
+                f"""SELECT e.* FROM name_words w JOIN employees e ON e.employee_id = w.employee_id
+                    WHERE w.word IN ({placeholders}) LIMIT ?""",
+                (*anchor, FUZZY_MAX_CANDIDATES),
+            ).fetchall()
+
+        scored = []
+        for row in rows:
+            name_words = row["name_norm"].split()
+            scores = [max((words.get(name_word, 0.0) for name_word in name_words), default=0.0) for words in similar]
+            similarity = sum(scores) / len(scores)
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                scored.append((similarity, row))
+        scored.sort(key=lambda item: (-item[0], item[1]["employee_id"]))
+        return [self._to_employee(row) for _, row in scored[:limit]]
+
+    def in_department(self, department: str) -> list[dict]:
+        return self._rows(
+            "SELECT * FROM employees WHERE department_norm = ? ORDER BY name_norm",
+            (normalize_name(department),),
+        )
+
+    def add_employees(self, employees) -> int:
+        employee_rows, word_rows, ids = [], [], []
+        for employee in employees:
+            employee_id = str(employee["employee_id"]).strip().upper()
+            name = employee["name"].strip()
+            name_norm = normalize_name(name)
+            department = (employee.get("department") or "").strip()
+            leave_balance = float(employee.get("leave_balance") or 0)
+            ids.append((employee_id,))
+            employee_rows.append(
+                (employee_id, name, name_norm, department, normalize_name(department), leave_balance)
+            )
+            word_rows.extend((word, employee_id) for word in set(name_norm.split()))
+
+        with self._lock, self._conn:
+            # Replace the name words of updated employees
+            self._conn.executemany("DELETE FROM name_words WHERE employee_id = ?", ids)
+            self._conn.executemany(
+                """INSERT INTO employees (employee_id, name, name_norm, department, department_norm, leave_balance)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(employee_id) DO UPDATE SET
+                       name = excluded.name, name_norm = excluded.name_norm,
+                       department = excluded.department, department_norm = excluded.department_norm,
+                       leave_balance = excluded.leave_balance""",
+                employee_rows,
+            )
+            self._conn.executemany("INSERT OR IGNORE INTO name_words VALUES (?, ?)", word_rows)
+            # Rebuild the word vocabulary once per import rather than per row
+            self._conn.execute("DELETE FROM word_stats")
+            self._conn.execute("INSERT INTO word_stats SELECT word, COUNT(*) FROM name_words GROUP BY word")
+            self._conn.execute("DELETE FROM word_trigrams WHERE word NOT IN (SELECT word FROM word_stats)")
+            new_words = self._conn.execute(
+                "SELECT word FROM word_stats WHERE word NOT IN (SELECT word FROM word_trigrams)"
+            ).fetchall()
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO word_trigrams VALUES (?, ?)",
+                [(trigram, word) for (word,) in new_words for trigram in word_trigrams(word)],
+            )
+        return len(employee_rows)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM employees").fetchone()[0]
+
+    def list_employees(self, limit: int | None = None) -> list[dict]:
+        return self._rows("SELECT * FROM employees ORDER BY name_norm LIMIT ?", (-1 if limit is None else limit,))
+
+    def department_leave_summary(self, department: str | None = None) -> list[dict]:
+        sql = "SELECT department, employees, total_leave FROM department_leave"
+        params = ()
+        if department is not None:
+            sql += " WHERE department_norm = ?"
+            params = (normalize_name(department),)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY department_norm", params).fetchall()
+        return [
+            {
+                "department": row["department"],
+                "employees": row["employees"],
+                "total_leave": whole_days(round(row["total_leave"], 2)),
+                "average_leave": whole_days(round(row["total_leave"] / row["employees"], 2)),
+            }
+            for row in rows
+        ]
+
+    def employees_below(self, threshold: float, department: str | None = None, limit: int = 50) -> list[dict]:
+        if department is None:
+            return self._rows(
+                "SELECT * FROM employees WHERE leave_balance < ? ORDER BY leave_balance, employee_id LIMIT ?",
+                (threshold, limit),
+            )
+        return self._rows(
+            """SELECT * FROM employees WHERE department_norm = ? AND leave_balance < ?
+               ORDER BY leave_balance, employee_id LIMIT ?""",
+            (normalize_name(department), threshold, limit),
+        )
+
+    def top_leave_balances(self, limit: int = 5, department: str | None = None, lowest: bool = False) -> list[dict]:
+        # Both keys in the same direction, so SQLite can walk the index instead of sorting
+        order = "ASC" if lowest else "DESC"
+        if department is None:
+            return self._rows(
+                f"SELECT * FROM employees ORDER BY leave_balance {order}, employee_id {order} LIMIT ?", (limit,)
+            )
+        return self._rows(
+            f"""SELECT * FROM employees WHERE department_norm = ?
+                ORDER BY leave_balance {order}, employee_id {order} LIMIT ?""",
+            (normalize_name(department), limit),
+        )
+
+    def set_leave_balance(self, employee_id: str, leave_balance: float) -> dict | None:
+        employee_id = employee_id.strip().upper()
+        with self._lock, self._conn:
+            updated = self._conn.execute(
+                "UPDATE employees SET leave_balance = ? WHERE employee_id = ?", (float(leave_balance), employee_id)
+            ).rowcount
+        return self.get(employee_id) if updated else None
+
+    def adjust_leave_balance(self, employee_id: str, delta: float) -> dict | None:
+        employee_id = employee_id.strip().upper()
+        # A single UPDATE, so concurrent adjustments cannot overwrite each other
+        with self._lock, self._conn:
+            updated = self._conn.execute(
+                "UPDATE employees SET leave_balance = leave_balance + ? WHERE employee_id = ?",
+                (float(delta), employee_id),
+            ).rowcount
+        return self.get(employee_id) if updated else None
+
+
+_directory = None
+_directory_lock = threading.Lock()
+
+
+def create_default_directory() -> EmployeeDirectory:
+    """
+    Create the directory configured by EMPLOYEE_DIRECTORY_DB / EMPLOYEE_DIRECTORY_CSV.
+
+    Without configuration an in-memory directory with the mock employees is used.
+    """
+    settings = get_directory_settings()
+    directory = SQLiteEmployeeDirectory(settings["db_path"] or ":memory:")
+    if settings["csv_path"]:
+        imported = directory.import_csv(settings["csv_path"])
+        print(f"[DIRECTORY] Imported {imported} employees from {settings['csv_path']}")
+    if directory.count() == 0:
+        directory.add_employees(MOCK_EMPLOYEES)
+        print("[DIRECTORY] Using mock employee data")
+    return directory
+
+
+def get_directory() -> EmployeeDirectory:
+    """Get the shared employee directory (created on first use)"""
+    global _directory
+    with _directory_lock:
+        if _directory is None:
+            _directory = create_default_directory()
+        return _directory
+
+
+def set_directory(directory: EmployeeDirectory):
+    """Replace the shared employee directory (e.g. with another backend)"""
+    global _directory
+    with _directory_lock:
+        _directory = directory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the employee directory database")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser("import", help="Import employees from a CSV file")
+    import_parser.add_argument("csv_path")
+    import_parser.add_argument("--db", default=os.getenv("EMPLOYEE_DIRECTORY_DB", "employees.db"))
+    args = parser.parse_args()
+
+    if args.command == "import":
+        directory = SQLiteEmployeeDirectory(args.db)
+        imported = directory.import_csv(args.csv_path)
+        print(f"[OK] Imported {imported} employees into {args.db} ({directory.count()} total)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Keyword fallback engine used when the LLM is unavailable or out of time budget.
+Response tables (English and Vietnamese) and the keyword automaton are built
+once at import; answering a message is a single pass over its word tokens with
+weighted category scoring.
+"""
+
+import re
+import unicodedata
+
+# Answers for get_fallback_response()
+FALLBACK_RESPONSES = {
+    "en": {
+        "leave": "You can apply for annual leave via the company HR portal. Submit your request at least 2 weeks in advance. Your manager must approve before submission to payroll. For sick leave, report to your manager as soon as possible.",
+        "benefits": "All employees are covered under the company health insurance plan. Coverage includes medical, dental, and vision. Dependents can be added during open enrollment. Remote employees receive the same benefits as office employees.",
+        "salary": "Pay stubs are available in the HRIS portal under Payroll > Pay Stubs. You can download PDF copies for your records. To update your payroll bank account, submit your request via HRIS > Payroll section.",
+        "remote": "Employees may work remotely up to 2 days per week. Remote days must be approved by your manager and cannot be consecutive without special approval. Remote employees receive the same benefits as office employees.",
+        "retirement": "Retirement plan enrollment happens during onboarding. The company matches 50% of employee contributions up to 6% of salary. Contact HR for more details.",
+        "maternity": "Eligible employees receive 12 weeks of paid maternity leave and 4 weeks of paid paternity leave. Contact HR for specific eligibility requirements.",
+        "holiday": "Company holidays include New Year, Independence Day, Thanksgiving, and Christmas. See the HR portal for the complete holiday calendar.",
+        "training": "Each employee receives $2,000 annually for training and professional development. Submit requests via the Learning Portal for approval.",
+        "transfer": "Contact HR to discuss transfer opportunities. You must complete at least 1 year in your current role before requesting a transfer.",
+        "overtime": "Overtime is compensated at 1.5x your regular rate. All overtime must be pre-approved by your manager and documented in the HR system.",
+        "complaint": "Use the anonymous HR Hotline or submit a formal complaint via the HR portal. All complaints are handled confidentially and investigated promptly.",
+        "hours": "Standard working hours are 9 AM to 5 PM, Monday to Friday. Flexible arrangements are available upon manager approval.",
+        "default": "Hello! I'm the HR Assistant here to help answer your questions about company policies, benefits, leave, payroll, and more. I have access to our HR FAQ database with information about annual leave, remote work policy, health insurance, retirement plans, professional development, and many other HR topics. What would you like to know?"
+    },
+    "vi": {
+        "leave": "Bạn có thể nộp đơn xin nghỉ phép thường niên thông qua cổng HR của công ty. Gửi yêu cầu của bạn ít nhất 2 tuần trước. Quản lý của bạn phải phê duyệt trước khi gửi đến bộ phận lương. Đối với nghỉ ốm, hãy báo cáo với quản lý càng sớm càng tốt.",
+        "benefits": "Tất cả nhân viên đều được bảo hiểm y tế của công ty. Bảo hiểm bao gồm y tế, nha khoa và mắt. Người phụ thuộc có thể được thêm vào trong thời gian đăng ký mở. Nhân viên làm việc từ xa nhận cùng phúc lợi như nhân viên tại văn phòng.",
+        "salary": "Bảng lương có sẵn trong cổng HRIS tại Payroll > Pay Stubs. Bạn có thể tải xuống bản PDF để lưu trữ. Để cập nhật tài khoản ngân hàng lương, gửi yêu cầu qua phần HRIS > Payroll.",
+        "remote": "Nhân viên có thể làm việc từ xa tối đa 2 ngày mỗi tuần. Các ngày làm việc từ xa phải được quản lý phê duyệt và không được liên tiếp trừ khi có phê duyệt đặc biệt. Nhân viên làm việc từ xa nhận cùng phúc lợi như nhân viên tại văn phòng.",
+        "retirement": "Đăng ký kế hoạch hưu trí diễn ra trong quá trình nhập môn. Công ty đóng góp 50% số tiền nhân viên đóng góp lên đến 6% lương. Liên hệ HR để biết thêm chi tiết.",
+        "maternity": "Nhân viên đủ điều kiện nhận 12 tuần nghỉ thai sản có lương và 4 tuần nghỉ sinh con có lương. Liên hệ HR để biết yêu cầu điều kiện cụ thể.",
+        "holiday": "Các ngày lễ của công ty bao gồm Tết Dương lịch, Ngày Độc lập, Lễ Tạ ơn và Giáng sinh. Xem cổng HR để biết lịch nghỉ lễ đầy đủ.",
+        "training": "Mỗi nhân viên nhận $2,000 hàng năm cho đào tạo và phát triển chuyên môn. Gửi yêu cầu qua Cổng Học tập để được phê duyệt.",
+        "transfer": "Liên hệ HR để thảo luận về cơ hội chuyển bộ phận. Bạn phải hoàn thành ít nhất 1 năm ở vị trí hiện tại trước khi yêu cầu chuyển.",
+        "overtime": "Làm thêm giờ được trả 1.5 lần mức lương thường. Tất cả làm thêm giờ phải được quản lý phê duyệt trước và ghi lại trong hệ thống HR.",
+        "complaint": "Sử dụng đường dây HR ẩn danh hoặc gửi khiếu nại chính thức qua cổng HR. Tất cả khiếu nại được xử lý bảo mật và điều tra kịp thời.",
+        "hours": "Giờ làm việc tiêu chuẩn là 9 AM đến 5 PM, Thứ Hai đến Thứ Sáu. Có thể sắp xếp linh hoạt với sự phê duyệt của quản lý.",
+        "default": "Xin chào! Tôi là Trợ lý HR ở đây để giúp trả lời các câu hỏi của bạn về chính sách công ty, phúc lợi, nghỉ phép, lương bổng và nhiều hơn nữa. Tôi có quyền truy cập vào cơ sở dữ liệu FAQ HR với thông tin về nghỉ phép thường niên, chính sách làm việc từ xa, bảo hiểm y tế, kế hoạch hưu trí, phát triển chuyên môn và nhiều chủ đề HR khác. Bạn muốn biết điều gì?"
+    },
+}
+
+# Answers for the SimpleFallbackLLM used when Azure OpenAI is not configured
+LLM_FALLBACK_RESPONSES = {
+    "en": {
+        "leave": "We offer 20 days of paid leave annually for full-time employees. Employees can carry over up to 5 days to the next year. Sick leave is provided separately at 10 days per year.",
+        "benefits": "Our benefits package includes health insurance, dental coverage, vision insurance, and a 401(k) plan with a 4% company match.",
+        "salary": "Salary reviews are conducted annually in January. Performance bonuses are distributed based on company performance and individual contributions.",
+        "remote": "We support flexible work arrangements. Employees can work remotely up to 2 days per week with manager approval.",
+        "policy": "Our company policies cover workplace conduct, confidentiality, anti-harassment, and ethics guidelines. Please refer to the employee handbook for details.",
+        "default": "Thank you for your question. I'm a fallback HR Assistant. For specific information, please check the employee handbook or contact HR directly."
+    },
+    "vi": {
+        "leave": "Chúng tôi cung cấp 20 ngày nghỉ có lương hàng năm cho nhân viên toàn thời gian. Nhân viên có thể mang 5 ngày còn lại sang năm tiếp theo. Nghỉ ốm được cung cấp riêng biệt với 10 ngày mỗi năm.",
+        "benefits": "Gói phúc lợi của chúng tôi bao gồm bảo hiểm y tế, bảo hiểm nha khoa, bảo hiểm thị lực và kế hoạch 401(k) với khoản đóng góp 4% của công ty.",
+        "salary": "Xét tăng lương được tiến hành hàng năm vào tháng Giêng. Tiền thưởng hiệu suất được phân phối dựa trên hiệu suất công ty và đóng góp cá nhân.",
+        "remote": "Chúng tôi hỗ trợ các sắp xếp công việc linh hoạt. Nhân viên có thể làm việc từ xa tối đa 2 ngày mỗi tuần với sự phê duyệt của quản lý.",
+        "policy": "Các chính sách công ty của chúng tôi bao gồm quy tắc ứng xử tại nơi làm việc, bảo mật, chống quấy rối và các hướng dẫn đạo đức. Vui lòng tham khảo sổ tay nhân viên để biết chi tiết.",
+        "default": "Cảm ơn bạn vì câu hỏi. Tôi là một Trợ lý HR dự phòng. Để biết thông tin cụ thể, vui lòng kiểm tra sổ tay nhân viên hoặc liên hệ với phòng HR trực tiếp."
+    },
+}
+
+# Keywords per category, English and Vietnamese. Keywords match whole words;
+# multi-word keywords match consecutive words. Earlier categories win ties.
+CATEGORY_KEYWORDS = {
+    "leave": ["leave", "leaves", "vacation", "time off", "day off", "days off", "absent", "absence", "sick",
+              "nghỉ", "phép", "nghỉ phép", "nghỉ ốm", "ngày phép"],
+    "benefits": ["benefit", "benefits", "insurance", "health", "dental", "medical",
+                 "phúc lợi", "bảo hiểm", "y tế"],
+    "salary": ["salary", "pay", "payroll", "paycheck", "payslip", "pay stub", "pay stubs", "wage", "wages",
+               "lương", "tiền", "tiền lương", "bảng lương"],
+    "remote": ["remote", "remotely", "work from home", "wfh", "home", "từ xa"],
+    "retirement": ["retirement", "401k", "pension", "hưu trí"],
+    "maternity": ["maternity", "paternity", "baby", "thai sản", "sinh con", "con"],
+    "holiday": ["holiday", "holidays", "lễ", "nghỉ lễ", "ngày lễ", "tết"],
+    "training": ["training", "development", "course", "courses", "learning", "đào tạo", "học", "khóa học"],
+    "transfer": ["transfer", "department", "chuyển", "bộ phận", "phòng ban"],
+    "overtime": ["overtime", "tăng ca", "làm thêm giờ"],
+    "complaint": ["complaint", "complaints", "concern", "concerns", "issue", "issues", "problem", "problems",
+                  "harassment", "khiếu nại", "vấn đề"],
+    "hours": ["hour", "hours", "working hours", "schedule", "time", "giờ", "giờ làm việc"],
+    "policy": ["policy", "policies", "conduct", "handbook", "chính sách", "quy định"],
+}
+
+# Keyword weights; anything not listed weighs its number of words, so phrases beat single words
+KEYWORD_WEIGHTS = {
+    # Ambiguous words that should only decide when nothing more specific matches
+    "nghỉ": 0.5, "tiền": 0.5, "home": 0.5, "con": 0.5, "học": 0.5, "time": 0.5,
+    "issue": 0.5, "issues": 0.5, "problem": 0.5, "problems": 0.5, "vấn đề": 1,
+    "policy": 0.5, "policies": 0.5, "chính sách": 1,
+    # Specific topics that outrank the generic "leave"
+    "maternity": 2, "paternity": 2, "overtime": 2, "retirement": 2, "pension": 2, "401k": 2, "holiday": 2,
+    "holidays": 2,
+}
+
+# Letters that only occur in Vietnamese text
+VIETNAMESE_CHARS = frozenset(
+    "ăđơư"
+    "ạảấầẩẫậắằẳẵặẹẻẽếềểễệỉịĩọỏốồổỗộớờởỡợụủũứừửữựỳỵỷỹ"
+)
+VIETNAMESE_MARKERS = frozenset(["vietnamese", "vietnam", "viet"])
+
+# Labels the chat prompts put in front of the user's question
+QUESTION_LABELS = ("user question:", "câu hỏi:")
+ANSWER_LABELS = ("\nanswer:", "\ntrả lời:")
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize_text(text: str) -> str:
+    """NFC-normalize and casefold text so composed and decomposed diacritics match"""
+    return unicodedata.normalize("NFC", text).casefold()
+
+
+def detect_language(text: str) -> str:
+    """
+    Detect whether normalized text is Vietnamese or English.
+
+    Args:
+        text: Text already passed through normalize_text()
+
+    Returns:
+        "vi" or "en"
+    """
+    if not VIETNAMESE_CHARS.isdisjoint(text):
+        return "vi"
+    if not VIETNAMESE_MARKERS.isdisjoint(_WORD_RE.findall(text)):
+        return "vi"
+    return "en"
+
+
+class FallbackEngine:
+    """Scores message words against the category keyword automaton"""
+
+    def __init__(self, category_keywords: dict = None, keyword_weights: dict = None):
+        category_keywords = category_keywords or CATEGORY_KEYWORDS
+        keyword_weights = KEYWORD_WEIGHTS if keyword_weights is None else keyword_weights
+        self.categories = list(category_keywords)
+        self._order = {category: rank for rank, category in enumerate(self.categories)}
+        # Word-level trie: each node maps a word to its child; None holds (category, weight)
+        self._trie = {}
+        for category, keywords in category_keywords.items():
+            for keyword in keywords:
+                words = tuple(_WORD_RE.findall(normalize_text(keyword)))
+                node = self._trie
+                for word in words:
+                    node = node.setdefault(word, {})
+                if None in node:
+                    raise ValueError(f"Fallback keyword '{keyword}' is listed in more than one category")
+                node[None] = (category, keyword_weights.get(keyword, len(words)))
+
+    def score(self, text: str) -> dict:
+        """
+        Score every category for a normalized text.
+
+        Returns:
+            Dict of category -> summed keyword weight (only categories that matched)
+        """
+        words = _WORD_RE.findall(text)
+        scores = {}
+        trie = self._trie
+        for start in range(len(words)):
+            node = trie.get(words[start])
+            position = start + 1
+            while node is not None:
+                hit = node.get(None)
+                if hit is not None:
+                    scores[hit[0]] = scores.get(hit[0], 0) + hit[1]
+                if position == len(words):
+                    break
+                node = node.get(words[position])
+                position += 1
+        return scores
+
+    def classify(self, text: str, categories=None) -> str | None:
+        """
+        Get the best-scoring category for a normalized text.
+
+        Args:
+            text: Text already passed through normalize_text()
+            categories: Only consider these categories (e.g. the keys of a response table)
+
+        Returns:
+            Category name, or None if no keyword matched
+        """
+        scores = self.score(text)
+        if categories is not None:
+            scores = {category: value for category, value in scores.items() if category in categories}
+        if not scores:
+            return None
+        return max(scores, key=lambda category: (scores[category], -self._order[category]))
+
+    def respond(self, message: str, language: str = "en", responses: dict = None) -> str:
+        """
+        Answer a message from a response table.
+
+        Args:
+            message: User message
+            language: "en" or "vi"
+            responses: Response table keyed by language then category (default FALLBACK_RESPONSES)
+
+        Returns:
+            The answer for the best-matching category, or the table's default answer
+        """
+        table = (responses or FALLBACK_RESPONSES)
+        table = table.get(language, table["en"])
+        category = self.classify(normalize_text(message), table)
+        return table[category] if category else table["default"]
+
+
+def extract_question(prompt: str) -> str:
+    """
+    Get the user's question out of a normalized chat prompt.
+
+    Args:
+        prompt: Prompt text already passed through normalize_text()
+
+    Returns:
+        The text after the question label, or the whole prompt if it has none
+    """
+    for label in QUESTION_LABELS:
+        start = prompt.rfind(label)
+        if start != -1:
+            question = prompt[start + len(label):]
+            for answer_label in ANSWER_LABELS:
+                end = question.find(answer_label)
+                if end != -1:
+                    question = question[:end]
+            return question.strip()
+    return prompt
+
+
+# Shared engine, built once at import
+FALLBACK_ENGINE = FallbackEngine()
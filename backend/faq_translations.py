@@ -0,0 +1,30 @@
+"""
+Vietnamese translations of the HR FAQ questions.
+Shared by the FAQ indexes (Vietnamese index variant), the chat source
+documents and the autocomplete index. Answers are only available in English.
+"""
+
+FAQ_TRANSLATIONS = {
+    "How do I apply for annual leave?": "Làm cách nào để tôi xin nghỉ phép hằng năm?",
+    "What is the company's remote work policy?": "Chính sách làm việc từ xa của công ty là gì?",
+    "How can I update my payroll bank account?": "Làm cách nào để cập nhật tài khoản ngân hàng lương?",
+    "What are the working hours?": "Giờ làm việc là gì?",
+    "How do I request a sick leave?": "Làm cách nào để xin nghỉ ốm?",
+    "What is the company's health insurance coverage?": "Phạm vi bảo hiểm y tế của công ty là gì?",
+    "When is the next company holiday?": "Kỳ nghỉ công ty tiếp theo là khi nào?",
+    "How do I access my pay stubs?": "Làm cách nào để truy cập bảng lương của tôi?",
+    "What is the professional development budget?": "Ngân sách phát triển chuyên nghiệp là gì?",
+    "How do I request a transfer to another department?": "Làm cách nào để yêu cầu chuyển đến một phòng ban khác?",
+    "What is the overtime policy?": "Chính sách tăng ca là gì?",
+    "How do I enroll in the company retirement plan?": "Làm cách nào để tôi đăng ký kế hoạch hưu trí của công ty?",
+    "What is the maternity and paternity leave policy?": "Chính sách nghỉ thai sản và nghỉ sinh con là gì?",
+    "How do I report a workplace concern or complaint?": "Làm cách nào để báo cáo mối lo ngại hoặc khiếu nại tại nơi làm việc?",
+    "What benefits are available to remote employees?": "Các lợi ích nào có sẵn cho nhân viên làm việc từ xa?",
+}
+
+
+def translate_faq_question(question: str, language: str = "en") -> str:
+    """Translate FAQ question to target language"""
+    if language == "vi":
+        return FAQ_TRANSLATIONS.get(question, question)
+    return question
@@ -8,47 +8,54 @@ from langchain_core.tools import tool
 from datetime import datetime, timedelta
 import json
 from company_data import JOB_POSITIONS, SKILL_SCORES, EXPERIENCE_MULTIPLIER, get_position_names
+from cv_features import extract_cv_features
+from employee_directory import get_directory, whole_days
 
-# Mock employee database
-EMPLOYEE_DATABASE = {
-    "alice": {"name": "Alice Johnson", "leave_balance": 5, "department": "Engineering"},
-    "bob": {"name": "Bob Smith", "leave_balance": 10, "department": "Sales"},
-    "charlie": {"name": "Charlie Brown", "leave_balance": 3, "department": "HR"},
-    "diana": {"name": "Diana Prince", "leave_balance": 8, "department": "Marketing"},
-}
 
+# Salaries are paid on this day of every month
+PAY_DAY_OF_MONTH = 25
 
-@tool("check_leave_balance")
-def check_leave_balance(employee_name: str) -> str:
+
+def find_employee(employee_name: str) -> dict | None:
     """
-    Check the annual leave balance for an employee.
+    Look up a single employee by name or employee ID.
     
     Args:
-        employee_name: The name of the employee (first name only, case-insensitive)
+        employee_name: Full name, first or last name, or employee ID
     
     Returns:
-        A message with the employee's remaining leave balance
+        Employee record, or None if not found or ambiguous
     """
-    emp_key = employee_name.lower().strip()
-    
-    if emp_key in EMPLOYEE_DATABASE:
-        employee = EMPLOYEE_DATABASE[emp_key]
-        balance = employee["leave_balance"]
-        return f"{employee['name']} has {balance} days of annual leave remaining."
-    else:
+    matches = get_directory().resolve(employee_name)
+    return matches[0] if len(matches) == 1 else None
+
+
+def _employee_lookup_error(employee_name: str, matches: list[dict]) -> str:
+    """Message for a name that matched no employee or several employees"""
+    if not matches:
         return f"Employee '{employee_name}' not found in the system. Please check the name and try again."
+    candidates = ", ".join(f"{m['name']} ({m['employee_id']}, {m['department']})" for m in matches[:5])
+    return f"Several employees match '{employee_name}': {candidates}. Please specify the full name or employee ID."
 
 
-@tool("check_pay_date")
-def check_pay_date() -> str:
+def ordinal(day: int) -> str:
+    """English ordinal of a day of the month (1st, 2nd, 3rd, 11th, 25th...)"""
+    suffix = "th" if 11 <= day % 100 <= 13 else {1: "st", 2: "nd", 3: "rd"}.get(day % 10, "th")
+    return f"{day}{suffix}"
+
+
+def get_next_pay_date(today: datetime | None = None) -> tuple[datetime, int]:
     """
-    Check the company's payroll schedule.
+    Get the next salary payment date.
+    
+    Args:
+        today: Reference date (defaults to now)
     
     Returns:
-        Information about when salaries are paid
+        Tuple of (next pay date, days until then)
     """
-    today = datetime.now()
-    day_of_month = 25
+    today = today or datetime.now()
+    day_of_month = PAY_DAY_OF_MONTH
     
     if today.day <= day_of_month:
         # Next pay date is this month
@@ -60,8 +67,40 @@ def check_pay_date() -> str:
         else:
             next_pay = today.replace(month=today.month + 1, day=day_of_month)
     
-    days_until = (next_pay - today).days
-    return f"Salaries are paid on the 25th of every month. Your next salary will be deposited in {days_until} days ({next_pay.strftime('%B %d, %Y')})."
+    return next_pay, (next_pay - today).days
+
+
+@tool("check_leave_balance")
+def check_leave_balance(employee_name: str) -> str:
+    """
+    Check the annual leave balance for an employee.
+    
+    Args:
+        employee_name: The employee's full name, first or last name, or employee ID (case-insensitive)
+    
+    Returns:
+        A message with the employee's remaining leave balance
+    """
+    matches = get_directory().resolve(employee_name)
+    
+    if len(matches) == 1:
+        employee = matches[0]
+        balance = employee["leave_balance"]
+        return f"{employee['name']} has {balance} days of annual leave remaining."
+    else:
+        return _employee_lookup_error(employee_name, matches)
+
+
+@tool("check_pay_date")
+def check_pay_date() -> str:
+    """
+    Check the company's payroll schedule.
+    
+    Returns:
+        Information about when salaries are paid
+    """
+    next_pay, days_until = get_next_pay_date()
+    return f"Salaries are paid on the {ordinal(PAY_DAY_OF_MONTH)} of every month. Your next salary will be deposited in {days_until} days ({next_pay.strftime('%B %d, %Y')})."
 
 
 @tool("check_company_info")
@@ -81,18 +120,104 @@ def get_employee_department(employee_name: str) -> str:
     Get the department of an employee.
     
     Args:
-        employee_name: The name of the employee (first name only, case-insensitive)
+        employee_name: The employee's full name, first or last name, or employee ID (case-insensitive)
     
     Returns:
         The employee's department
     """
-    emp_key = employee_name.lower().strip()
+    matches = get_directory().resolve(employee_name)
     
-    if emp_key in EMPLOYEE_DATABASE:
-        employee = EMPLOYEE_DATABASE[emp_key]
+    if len(matches) == 1:
+        employee = matches[0]
         return f"{employee['name']} works in the {employee['department']} department."
     else:
-        return f"Employee '{employee_name}' not found in the system."
+        return _employee_lookup_error(employee_name, matches)
+
+
+def _department_error(department: str) -> str:
+    """Message for a department name that matched no department"""
+    known = ", ".join(row["department"] for row in get_directory().department_leave_summary())
+    return f"Department '{department}' not found. Known departments: {known}."
+
+
+def _department_name(department: str) -> str | None:
+    """Canonical name of a department, or None if there is no such department"""
+    summary = get_directory().department_leave_summary(department)
+    return summary[0]["department"] if summary else None
+
+
+def _format_employee_balances(employees: list[dict]) -> str:
+    return "; ".join(f"{e['name']} ({e['department']}): {e['leave_balance']} days" for e in employees)
+
+
+@tool("get_department_leave_summary")
+def get_department_leave_summary(department: str = "") -> str:
+    """
+    Get annual leave totals per department (headcount, total and average remaining days).
+    
+    Args:
+        department: Department name, or empty for all departments
+    
+    Returns:
+        Leave totals for the department(s)
+    """
+    summary = get_directory().department_leave_summary(department.strip() or None)
+    if not summary:
+        return _department_error(department)
+    return "\n".join(
+        f"{row['department']}: {row['employees']} employees, {row['total_leave']} days of leave remaining "
+        f"in total ({row['average_leave']} days on average)"
+        for row in summary
+    )
+
+
+@tool("find_employees_low_on_leave")
+def find_employees_low_on_leave(threshold: float = 3, department: str = "") -> str:
+    """
+    Find employees whose remaining annual leave is below a threshold.
+    
+    Args:
+        threshold: Number of days; employees with fewer days remaining are listed
+        department: Department name, or empty for the whole company
+    
+    Returns:
+        The matching employees with their balances, lowest first
+    """
+    department_name = None
+    if department.strip():
+        department_name = _department_name(department.strip())
+        if department_name is None:
+            return _department_error(department)
+    employees = get_directory().employees_below(threshold, department_name)
+    scope = f"in {department_name}" if department_name else "in the company"
+    days = whole_days(threshold)
+    if not employees:
+        return f"No employees {scope} have fewer than {days} days of leave remaining."
+    return f"Employees {scope} with fewer than {days} days of leave: {_format_employee_balances(employees)}."
+
+
+@tool("get_top_leave_balances")
+def get_top_leave_balances(count: int = 5, department: str = "", lowest: bool = False) -> str:
+    """
+    Get the employees with the most (or least) annual leave remaining.
+    
+    Args:
+        count: Number of employees to list
+        department: Department name, or empty for the whole company
+        lowest: List the lowest balances instead of the highest
+    
+    Returns:
+        The employees with their balances
+    """
+    department_name = None
+    if department.strip():
+        department_name = _department_name(department.strip())
+        if department_name is None:
+            return _department_error(department)
+    employees = get_directory().top_leave_balances(max(1, min(count, 50)), department_name, lowest)
+    scope = f"in {department_name}" if department_name else "in the company"
+    order = "least" if lowest else "most"
+    return f"Employees {scope} with the {order} leave remaining: {_format_employee_balances(employees)}."
 
 
 def _evaluate_cv_logic(cv_text: str) -> str:
@@ -106,10 +231,9 @@ def _evaluate_cv_logic(cv_text: str) -> str:
         A JSON-formatted evaluation with scores and summary
     """
     import json
-    import re
     
-    # Convert CV text to lowercase for analysis
-    cv_lower = cv_text.lower()
+    # Features of the CV (keywords are matched on word boundaries)
+    cv_features = extract_cv_features(cv_text)
     
     # Company core skills for matching
     core_skills = {
@@ -129,7 +253,7 @@ def _evaluate_cv_logic(cv_text: str) -> str:
     
     for category, keywords in core_skills.items():
         for keyword in keywords:
-            if keyword in cv_lower:
+            if cv_features.has(keyword):
                 if category == 'python':
                     technical_score += 8
                 elif category in ['machine_learning', 'deep_learning']:
@@ -149,40 +273,34 @@ def _evaluate_cv_logic(cv_text: str) -> str:
     experience_keywords = ['years', 'experience', 'project', 'developed', 'built', 'implemented', 'deployed']
     ai_project_keywords = ['ai', 'machine learning', 'deep learning', 'nlp', 'chatbot', 'model', 'algorithm']
     
-    # Check for years of experience
-    years_match = re.search(r'(\d+)\s*(?:\+)?\s*years?', cv_lower)
-    if years_match:
-        years = int(years_match.group(1))
-        if years >= 5:
-            experience_score += 15
-        elif years >= 3:
-            experience_score += 12
-        elif years >= 1:
-            experience_score += 8
-        else:
-            experience_score += 5
+    # Check for years of experience (stated or from employment dates)
+    years = cv_features.years_experience
+    if years >= 5:
+        experience_score += 15
+    elif years >= 3:
+        experience_score += 12
+    elif years >= 1:
+        experience_score += 8
+    elif years > 0:
+        experience_score += 5
     
     # Check for AI/ML projects
-    ai_project_count = sum(1 for keyword in ai_project_keywords if keyword in cv_lower)
+    ai_project_count = cv_features.count(ai_project_keywords)
     experience_score += min(ai_project_count * 3, 15)
     
     # Cap experience score at 30
     experience_score = min(experience_score, 30)
     
     # 3. Education & Certifications Scoring (0-15 points)
-    education_score = 0
-    education_keywords = {
-        'phd': 15, 'ph.d': 15, 'doctorate': 15,
-        'master': 12, 'msc': 12, 'm.sc': 12, 'ms': 12,
-        'bachelor': 8, 'bsc': 8, 'b.sc': 8, 'bs': 8,
-        'computer science': 5, 'artificial intelligence': 8, 'data science': 6,
-        'certification': 3, 'certified': 3, 'aws certified': 5, 'gcp certified': 5
-    }
+    degree_scores = {"PhD": 15, "Master's": 12, "Bachelor's": 8}
+    field_keywords = {'computer science': 5, 'artificial intelligence': 8, 'data science': 6}
     
-    for keyword, score in education_keywords.items():
-        if keyword in cv_lower:
-            education_score += score
-            break  # Take highest scoring education
+    # Take the highest degree, else the field of study, else certifications
+    education_score = degree_scores.get(cv_features.degree, 0)
+    if not education_score:
+        education_score = next((score for keyword, score in field_keywords.items() if cv_features.has(keyword)), 0)
+    if not education_score and cv_features.certified:
+        education_score = 5 if cv_features.certifications else 3
     
     # Cap education score at 15
     education_score = min(education_score, 15)
@@ -196,7 +314,7 @@ def _evaluate_cv_logic(cv_text: str) -> str:
     }
     
     for keyword, score in soft_skills_keywords.items():
-        if keyword in cv_lower:
+        if cv_features.has(keyword):
             soft_skills_score += score
     
     # Cap soft skills score at 15
@@ -323,7 +441,7 @@ def evaluate_cv_for_position(cv_text: str, position_key: str) -> str:
         })
     
     position = JOB_POSITIONS[position_key]
-    cv_lower = cv_text.lower()
+    cv_features = extract_cv_features(cv_text)
     
     # Score calculation
     must_have_score = 0
@@ -334,7 +452,7 @@ def evaluate_cv_for_position(cv_text: str, position_key: str) -> str:
     
     # Check must-have skills
     for skill in position["must_have"]:
-        if skill.lower() in cv_lower:
+        if cv_features.has(skill):
             must_have_score += 15
             found_skills.append(skill)
             total_relevant_skills += 1
@@ -343,35 +461,29 @@ def evaluate_cv_for_position(cv_text: str, position_key: str) -> str:
     
     # Check nice-to-have skills
     for skill in position["nice_to_have"]:
-        if skill.lower() in cv_lower:
+        if cv_features.has(skill):
             nice_to_have_score += 5
             found_skills.append(skill)
             total_relevant_skills += 1
     
     # Check for experience level keywords
     experience_score = 0
-    if "senior" in cv_lower or "lead" in cv_lower or "principal" in cv_lower:
+    if cv_features.seniority == "Senior":
         experience_score = 20
-    elif "mid-level" in cv_lower or "mid level" in cv_lower:
+    elif cv_features.seniority == "Mid":
         experience_score = 15
-    elif "junior" in cv_lower or "trainee" in cv_lower:
+    elif cv_features.seniority == "Junior":
         experience_score = 8
-    elif any(f"{i}+ years" in cv_lower or f"{i} years" in cv_lower for i in range(3, 10)):
+    elif cv_features.years_experience >= 3:
         experience_score = 15
-    elif any(f"{i} year" in cv_lower for i in range(1, 3)):
+    elif cv_features.years_experience >= 1:
         experience_score = 10
     else:
         experience_score = 5
     
-    # Education score
-    education_score = 0
-    if "bachelor" in cv_lower or "b.s." in cv_lower or "b.sc" in cv_lower:
-        education_score = 15
-    if "master" in cv_lower or "m.s." in cv_lower or "m.sc" in cv_lower:
-        education_score += 10
-    if "phd" in cv_lower or "doctorate" in cv_lower:
-        education_score += 10
-    if any(cert in cv_lower for cert in ["certification", "certified", "certificate", "aws", "azure", "gcp"]):
+    # Education score (a higher degree includes the lower ones)
+    education_score = {"None": 0, "Bachelor's": 15, "Master's": 25, "PhD": 35}[cv_features.degree]
+    if cv_features.certified:
         education_score += 5
     education_score = min(education_score, 25)
     
@@ -380,7 +492,7 @@ def evaluate_cv_for_position(cv_text: str, position_key: str) -> str:
     soft_skills = ["communication", "leadership", "teamwork", "problem solving", "critical thinking", 
                    "project management", "agile", "collaborative"]
     for skill in soft_skills:
-        if skill in cv_lower:
+        if cv_features.has(skill):
             soft_skills_score += 3
     soft_skills_score = min(soft_skills_score, 20)
     
@@ -444,6 +556,9 @@ AVAILABLE_TOOLS = [
     check_pay_date,
     check_company_info,
     get_employee_department,
+    get_department_leave_summary,
+    find_employees_low_on_leave,
+    get_top_leave_balances,
     evaluate_candidate_cv,
     get_job_positions,
     evaluate_cv_for_position,
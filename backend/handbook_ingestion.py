@@ -0,0 +1,255 @@
+"""
+Policy handbook ingestion into the RAG index.
+PDF and DOCX handbooks are read with the cv_extractor readers in parallel
+worker processes (one per handbook, or one per page range when a single PDF
+is ingested), one page (PDF) or page of paragraphs (DOCX) per document,
+chunked with the page number in the metadata and streamed into the handbook
+index through the batched indexer. The index is merged into the FAQ indexes
+when the RAG system starts. Unchanged files are skipped on later runs.
+
+Usage:
+    python handbook_ingestion.py ingest [handbook.pdf ...] [--force] [--workers 4]
+"""
+
+import os
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from langchain_core.documents import Document
+
+from chain_setup import (
+    BACKEND_DIR, HANDBOOK_INDEX_PATH, create_embeddings, embeddings_identity, faq_text_splitter, load_handbook_index
+)
+from cv_extractor import PROCESS_POOL_CONTEXT, extract_docx_paragraphs, extract_pdf_pages
+from ingestion import ingest_chunks, iter_chunks, read_manifest, write_manifest
+
+HANDBOOK_EXTENSIONS = (".pdf", ".docx", ".txt", ".md")
+
+
+def get_handbook_settings():
+    """Get handbook ingestion settings from environment variables"""
+    return {
+        "directory": os.getenv("HANDBOOK_DIR") or os.path.join(BACKEND_DIR, "data", "handbooks"),
+        "workers": int(os.getenv("HANDBOOK_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    }
+
+
+def list_handbooks(directory: str) -> list[str]:
+    """Handbook files of a directory"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(HANDBOOK_EXTENSIONS)
+    )
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def extract_handbook(path: str, pdf_workers: int = 1) -> dict:
+    """
+    Extract the text of a handbook, page by page (runs in a worker process).
+
+    Args:
+        path: Handbook file
+        pdf_workers: Processes reading the page ranges of a PDF
+
+    Returns:
+        Dict with name, title, type, sha256, bytes, pages ((page number, text) tuples)
+        and extract_s, or with an error message if the file could not be read
+    """
+    started = time.perf_counter()
+    name = os.path.basename(path)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        extension = os.path.splitext(name)[1].lower()
+        if extension == ".pdf":
+            pages = list(enumerate(extract_pdf_pages(data, workers=pdf_workers), start=1))
+        elif extension == ".docx":
+            texts = {}
+            for page, text in extract_docx_paragraphs(data):
+                texts.setdefault(page, []).append(text)
+            pages = [(page, "\n".join(paragraphs)) for page, paragraphs in texts.items()]
+        else:
+            pages = [(1, data.decode("utf-8", errors="ignore"))]
+    except Exception as e:
+        return {"name": name, "error": str(e)}
+    return {
+        "name": name,
+        "title": os.path.splitext(name)[0].replace("_", " ").replace("-", " "),
+        "type": extension.lstrip("."),
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "bytes": len(data),
+        "pages": [(page, text) for page, text in pages if text.strip()],
+        "extract_s": time.perf_counter() - started,
+    }
+
+
+def delete_chunks(store, doc_ids: list):
+    """Remove the chunks of a handbook from the index"""
+    if store is not None and doc_ids:
+        store.delete(doc_ids)
+
+
+def iter_handbook_chunks(extracted: dict, doc_ids: list):
+    """Chunk the pages of an extracted handbook, recording the chunk IDs in doc_ids"""
+    documents = (
+        Document(
+            page_content=text,
+            metadata={
+                "source": "Policy Handbook",
+                "title": extracted["title"],
+                # Shown as the source title, like FAQ questions
+                "question": f"{extracted['title']} (page {page})",
+                "handbook": extracted["name"],
+                "page": page,
+                "type": "handbook",
+            },
+        )
+        for page, text in extracted["pages"]
+    )
+    for chunk in iter_chunks(documents, faq_text_splitter()):
+        metadata = chunk.metadata
+        metadata["doc_id"] = f"handbook:{metadata['handbook']}:{metadata['page']}:{metadata['start_index']}"
+        doc_ids.append(metadata["doc_id"])
+        yield chunk
+
+
+def ingest_handbooks(paths: list[str] | None = None, force: bool = False, workers: int | None = None,
+                     embeddings=None) -> dict:
+    """
+    Extract handbooks in parallel and add them to the handbook index.
+
+    Args:
+        paths: Handbook files (all files of HANDBOOK_DIR if None; handbooks no longer there are removed)
+        force: Re-ingest files that did not change
+        workers: Extraction processes (HANDBOOK_WORKERS by default)
+        embeddings: Embeddings to use (created from the credentials if None)
+
+    Returns:
+        Summary with per-document stats (pages, characters, chunks, extraction and indexing time)
+    """
+    settings = get_handbook_settings()
+    prune = paths is None
+    paths = list_handbooks(settings["directory"]) if paths is None else paths
+    workers = max(1, workers or settings["workers"])
+    embeddings = embeddings or create_embeddings()
+    started = time.perf_counter()
+
+    manifest = read_manifest(HANDBOOK_INDEX_PATH)
+    store = load_handbook_index(embeddings)
+    # An index built with other embeddings cannot be extended
+    documents = manifest.get("documents", {}) if store is not None else {}
+
+    todo, skipped = [], 0
+    for path in paths:
+        previous = documents.get(os.path.basename(path))
+        if not force and previous and previous["sha256"] == file_sha256(path):
+            skipped += 1
+        else:
+            todo.append(path)
+
+    removed = [name for name in documents if prune and name not in {os.path.basename(p) for p in paths}]
+    for name in removed:
+        delete_chunks(store, documents.pop(name)["doc_ids"])
+
+    def save():
+        os.makedirs(HANDBOOK_INDEX_PATH, exist_ok=True)
+        store.save_local(HANDBOOK_INDEX_PATH)
+        write_manifest(HANDBOOK_INDEX_PATH, {"embeddings": embeddings_identity(embeddings), "documents": documents})
+
+    stats, failed = [], 0
+    print(f"[HANDBOOK] Ingesting {len(todo)} handbooks ({skipped} unchanged) with {workers} workers...")
+    if len(todo) > 1 and workers > 1:
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(todo)), mp_context=PROCESS_POOL_CONTEXT)
+        extractions = (future.result() for future in as_completed([pool.submit(extract_handbook, p) for p in todo]))
+    else:
+        # A single handbook is split by page range across the workers instead
+        pool = None
+        extractions = (extract_handbook(path, pdf_workers=workers) for path in todo)
+    try:
+        # Handbooks are indexed as their extraction finishes, while the workers read the next ones
+        for extracted in extractions:
+            name = extracted["name"]
+            if "error" in extracted:
+                print(f"[WARNING] Could not read handbook {name}: {extracted['error']}")
+                failed += 1
+                continue
+            if name in documents:
+                delete_chunks(store, documents.pop(name)["doc_ids"])
+
+            index_started = time.perf_counter()
+            doc_ids = []
+            store = ingest_chunks(iter_handbook_chunks(extracted, doc_ids), embeddings, store=store)
+            index_s = time.perf_counter() - index_started
+            documents[name] = {
+                "sha256": extracted["sha256"],
+                "title": extracted["title"],
+                "type": extracted["type"],
+                "pages": len(extracted["pages"]),
+                "doc_ids": doc_ids,
+            }
+            if store is not None:
+                save()
+
+            characters = sum(len(text) for _, text in extracted["pages"])
+            total_s = extracted["extract_s"] + index_s
+            stats.append({
+                "name": name,
+                "pages": len(extracted["pages"]),
+                "characters": characters,
+                "chunks": len(doc_ids),
+                "extract_s": round(extracted["extract_s"], 3),
+                "index_s": round(index_s, 3),
+                "pages_per_s": round(len(extracted["pages"]) / total_s, 1) if total_s else None,
+            })
+            print(f"[HANDBOOK] {name}: {len(extracted['pages'])} pages, {len(doc_ids)} chunks "
+                  f"(extract {extracted['extract_s']:.2f} s, index {index_s:.2f} s)")
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    if removed and store is not None:
+        save()
+    elapsed = time.perf_counter() - started
+    summary = {
+        "ingested": len(stats),
+        "skipped": skipped,
+        "failed": failed,
+        "removed": len(removed),
+        "chunks": store.index.ntotal if store is not None else 0,
+        "elapsed_s": round(elapsed, 2),
+        "documents": stats,
+    }
+    print(f"[HANDBOOK] Done in {elapsed:.1f} s: {len(stats)} ingested, {skipped} unchanged, "
+          f"{failed} failed, {len(removed)} removed")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest policy handbooks into the RAG index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    ingest_parser = subparsers.add_parser("ingest", help="Extract and index handbooks")
+    ingest_parser.add_argument("paths", nargs="*", help="Handbook files (default: every file of HANDBOOK_DIR)")
+    ingest_parser.add_argument("--force", action="store_true", help="Re-ingest unchanged files")
+    ingest_parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        summary = ingest_handbooks(args.paths or None, force=args.force, workers=args.workers)
+        for document in summary["documents"]:
+            print(f"  {document['name']}: {document['pages']} pages, {document['characters']} chars, "
+                  f"{document['chunks']} chunks, {document['pages_per_s']} pages/s")
+
+
+if __name__ == "__main__":
+    main()
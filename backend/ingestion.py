@@ -0,0 +1,182 @@
+"""
+Streaming ingestion of documents into a FAISS index.
+Documents are read lazily, split one at a time, embedded in fixed-size
+batches (a bounded number of batches in flight) and added to the index batch
+by batch, so memory outside the index stays flat however large the corpus is.
+When an index directory is given, progress is checkpointed there and an
+interrupted ingestion resumes after the last checkpoint.
+"""
+
+import os
+import json
+import time
+import hashlib
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_community.vectorstores import FAISS
+
+CHECKPOINT_FILE = "ingest_checkpoint.json"
+MANIFEST_FILE = "manifest.json"
+
+
+def get_ingestion_settings():
+    """Get ingestion settings from environment variables"""
+    return {
+        "batch_size": int(os.getenv("INGEST_BATCH_SIZE", "64")),
+        "concurrency": int(os.getenv("INGEST_CONCURRENCY", "2")),
+        "checkpoint_every": int(os.getenv("INGEST_CHECKPOINT_EVERY", "20")),
+    }
+
+
+def iter_chunks(documents, splitter):
+    """Split documents one at a time, yielding their chunks"""
+    for document in documents:
+        yield from splitter.split_documents([document])
+
+
+def batched(iterable, size: int):
+    """Yield lists of up to `size` items"""
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def corpus_fingerprint(chunks) -> tuple[str, int]:
+    """
+    Fingerprint of a chunk stream (doc_id and content of every chunk, in order).
+
+    Returns:
+        Tuple of (hex digest, number of chunks)
+    """
+    digest = hashlib.sha256()
+    count = 0
+    for chunk in chunks:
+        digest.update(f"{chunk.metadata.get('doc_id', count)}\0{chunk.page_content}\0".encode("utf-8"))
+        count += 1
+    return digest.hexdigest(), count
+
+
+def read_manifest(index_dir: str) -> dict:
+    """Manifest of a completed index (empty if there is none)"""
+    try:
+        with open(os.path.join(index_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_manifest(index_dir: str, manifest: dict):
+    """Write the manifest of a completed index"""
+    _write_json(os.path.join(index_dir, MANIFEST_FILE), manifest)
+
+
+def _write_json(path: str, data: dict):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+
+def _embed_batch(embeddings, batch: list) -> tuple[list, list]:
+    texts = [chunk.page_content for chunk in batch]
+    return batch, embeddings.embed_documents(texts)
+
+
+def _resume(index_dir: str, embeddings, fingerprint: str):
+    """Partially built index and the number of chunks it holds, if a checkpoint matches the corpus"""
+    try:
+        with open(os.path.join(index_dir, CHECKPOINT_FILE), "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("fingerprint") != fingerprint:
+            return None, 0
+        store = FAISS.load_local(index_dir, embeddings, allow_dangerous_deserialization=True)
+        if store.index.ntotal != checkpoint["chunks_done"]:
+            return None, 0
+        return store, checkpoint["chunks_done"]
+    except (OSError, ValueError, KeyError, RuntimeError):
+        return None, 0
+
+
+def ingest_chunks(chunks, embeddings, index_dir: str | None = None, fingerprint: str | None = None,
+                  settings: dict | None = None, store: FAISS | None = None) -> FAISS | None:
+    """
+    Embed a chunk stream in batches and build a FAISS index from it (or add it to an existing one).
+
+    Args:
+        chunks: Iterable of chunks (re-creatable and in the same order when resuming)
+        embeddings: Embeddings used for the chunks and stored with the index
+        index_dir: Directory for checkpoints (None disables them; save the result with save_index())
+        fingerprint: corpus_fingerprint() of the chunks, required to checkpoint and resume
+        settings: Ingestion settings (defaults to get_ingestion_settings())
+        store: Index to add the chunks to (a new one is created if None)
+
+    Returns:
+        FAISS vector store, or None if there were no chunks and no store was given
+    """
+    settings = settings or get_ingestion_settings()
+    batch_size = max(1, settings["batch_size"])
+    concurrency = max(1, settings["concurrency"])
+    checkpoint_every = settings["checkpoint_every"]
+    checkpointing = store is None and index_dir is not None and fingerprint is not None and checkpoint_every > 0
+
+    chunks_done = 0
+    if checkpointing:
+        # The index files are overwritten from here on: the directory no longer holds a completed index
+        manifest_path = os.path.join(index_dir, MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+        store, chunks_done = _resume(index_dir, embeddings, fingerprint)
+        if chunks_done:
+            print(f"[INGEST] Resuming after {chunks_done} chunks from the checkpoint in {index_dir}")
+        chunks = itertools.islice(chunks, chunks_done, None)
+
+    started = time.perf_counter()
+    batches_done = 0
+    batches = batched(chunks, batch_size)
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="ingest") as pool:
+        # At most `concurrency` batches are being embedded at once; results are added in order
+        in_flight = deque(pool.submit(_embed_batch, embeddings, batch)
+                          for batch in itertools.islice(batches, concurrency))
+        while in_flight:
+            batch, vectors = in_flight.popleft().result()
+            next_batch = next(batches, None)
+            if next_batch is not None:
+                in_flight.append(pool.submit(_embed_batch, embeddings, next_batch))
+
+            text_embeddings = [(chunk.page_content, vector) for chunk, vector in zip(batch, vectors)]
+            metadatas = [chunk.metadata for chunk in batch]
+            ids = [chunk.metadata.get("doc_id") or f"chunk-{chunks_done + i}" for i, chunk in enumerate(batch)]
+            if store is None:
+                store = FAISS.from_embeddings(text_embeddings, embeddings, metadatas=metadatas, ids=ids)
+            else:
+                store.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+            chunks_done += len(batch)
+            batches_done += 1
+
+            if checkpointing and batches_done % checkpoint_every == 0:
+                try:
+                    os.makedirs(index_dir, exist_ok=True)
+                    store.save_local(index_dir)
+                    _write_json(os.path.join(index_dir, CHECKPOINT_FILE),
+                                {"fingerprint": fingerprint, "chunks_done": chunks_done})
+                    print(f"[INGEST] Checkpoint: {chunks_done} chunks")
+                except OSError as e:
+                    print(f"[WARNING] Could not write ingestion checkpoint ({e}), continuing without checkpoints")
+                    checkpointing = False
+
+    elapsed = time.perf_counter() - started
+    print(f"[INGEST] Embedded {chunks_done} chunks in {batches_done} batches in {elapsed:.1f} s")
+    return store
+
+
+def save_index(store: FAISS, index_dir: str, fingerprint: str | None = None):
+    """Save a completed index with its manifest and remove the ingestion checkpoint"""
+    os.makedirs(index_dir, exist_ok=True)
+    store.save_local(index_dir)
+    if fingerprint is not None:
+        write_manifest(index_dir, {"fingerprint": fingerprint, "chunks": store.index.ntotal})
+    checkpoint_path = os.path.join(index_dir, CHECKPOINT_FILE)
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
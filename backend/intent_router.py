@@ -0,0 +1,197 @@
+"""
+Intent router for chat messages.
+Classifies a message into an FAQ question, a CV evaluation request, a position
+list request or an HR tool query, and extracts the job position key for CV
+evaluations. Keyword tables are frozen once at import and each keyword is only
+scanned when the decision actually depends on it.
+"""
+
+from dataclasses import dataclass
+
+INTENT_FAQ = "faq"
+INTENT_CV_EVAL = "cv_eval"
+INTENT_POSITION_LIST = "position_list"
+INTENT_TOOL_QUERY = "tool_query"
+
+# Message prefix used by the CV upload widget: "Evaluate my CV for <position> | <file> | <base64>"
+CV_UPLOAD_PREFIX = "evaluate my cv"
+
+# Any of these marks the message as CV-related
+CV_CHECK_KEYWORDS = ["cv", "resume", "evaluate", "check", "score", "assess", "đánh giá", "kiểm tra"]
+# Any of these marks an explicit evaluation request
+CV_EVAL_KEYWORDS = ["evaluate", "score", "assess", "đánh giá"]
+# CV-related messages with 2+ of these already contain CV content
+CV_REQUEST_CONTENT_KEYWORDS = ["experience", "skill", "education", "bachelor", "master", "project", "responsibility"]
+# Any message with 3+ of these is treated as a pasted CV
+CV_TEXT_CONTENT_KEYWORDS = ["experience", "skill", "education", "bachelor", "master", "python", "java", "javascript",
+                            "developer", "engineer", "project", "responsibility", "achievement"]
+# Generic words that should not turn an HR tool query into a CV request
+WEAK_CV_KEYWORDS = ["check", "score", "kiểm tra"]
+
+# Position aliases for uploaded CVs (longest alias found wins)
+POSITION_ALIASES = {
+    "python developer": "python_developer",
+    "java developer": "java_developer",
+    "ai/ml engineer": "ai_ml_engineer",
+    "ai/ml": "ai_ml_engineer",
+    "machine learning": "ai_ml_engineer",
+    "frontend developer": "frontend_developer",
+    "backend developer": "python_developer",
+    "devops engineer": "devops_engineer",
+    "full stack developer": "full_stack_developer",
+    "data engineer": "data_engineer",
+    "qa engineer": "qa_engineer",
+    # Also try lowercase without "developer" suffix
+    "python": "python_developer",
+    "java": "java_developer",
+    "frontend": "frontend_developer",
+    "backend": "python_developer",
+    "devops": "devops_engineer",
+    "full stack": "full_stack_developer",
+    "data": "data_engineer",
+    "qa": "qa_engineer",
+    "ai": "ai_ml_engineer",
+    "ml": "ai_ml_engineer",
+}
+
+# Position mentions for pasted CV text (first in this order wins)
+PASTED_CV_POSITIONS = {
+    "python": "python_developer",
+    "java": "java_developer",
+    "ai": "ai_ml_engineer",
+    "ml": "ai_ml_engineer",
+    "frontend": "frontend_developer",
+    "backend": "python_developer",  # default backend
+    "devops": "devops_engineer",
+    "full stack": "full_stack_developer",
+    "data": "data_engineer",
+    "qa": "qa_engineer",
+}
+
+DEFAULT_POSITION_KEY = "python_developer"
+
+# Phrases that identify questions answerable by an HR function tool
+TOOL_KEYWORDS = {
+    "check_leave_balance": [
+        "leave balance", "leave days", "days of leave", "leave remaining",
+        "remaining leave", "leave left",
+        "số ngày phép", "ngày phép còn lại", "ngày nghỉ phép còn lại", "phép còn lại", "bao nhiêu ngày phép",
+    ],
+    "check_pay_date": [
+        "payday", "pay day", "pay date", "next salary", "salary date", "when is pay", "get paid",
+        "ngày trả lương", "ngày nhận lương", "nhận lương khi nào", "khi nào nhận lương", "khi nào có lương",
+        "khi nào được trả lương", "trả lương khi nào", "ngày lương",
+    ],
+    "get_employee_department": [
+        "which department", "what department", "department of", "department is",
+        "phòng ban nào", "phòng ban của", "làm ở phòng", "bộ phận nào",
+    ],
+}
+
+# Every tool phrase contains one of these, so most messages skip the phrase scan
+TOOL_ANCHORS = ["leave", "pay", "paid", "salary", "department", "phép", "lương", "phòng", "bộ phận"]
+
+
+@dataclass(frozen=True)
+class Intent:
+    """Result of routing a chat message"""
+    kind: str
+    position_key: str | None = None
+    from_upload: bool = False
+    tool_name: str | None = None
+
+
+FAQ_INTENT = Intent(INTENT_FAQ)
+POSITION_LIST_INTENT = Intent(INTENT_POSITION_LIST)
+
+
+def _count_at_least(text: str, keywords: tuple, minimum: int) -> bool:
+    """Check whether at least `minimum` of the keywords occur in the text (stops early)"""
+    count = 0
+    for keyword in keywords:
+        if keyword in text:
+            count += 1
+            if count >= minimum:
+                return True
+    return False
+
+
+class IntentRouter:
+    """Classifies chat messages using keyword tables prepared once"""
+
+    def __init__(self):
+        for keyword in (keyword for keywords in TOOL_KEYWORDS.values() for keyword in keywords):
+            if not any(anchor in keyword for anchor in TOOL_ANCHORS):
+                raise ValueError(f"Tool keyword '{keyword}' does not contain any TOOL_ANCHORS entry")
+        self._strong_cv = tuple(keyword for keyword in CV_CHECK_KEYWORDS if keyword not in WEAK_CV_KEYWORDS)
+        self._weak_cv = tuple(WEAK_CV_KEYWORDS)
+        self._request_content = tuple(CV_REQUEST_CONTENT_KEYWORDS)
+        self._text_content = tuple(CV_TEXT_CONTENT_KEYWORDS)
+        self._tool_anchors = tuple(TOOL_ANCHORS)
+        self._tool_keywords = tuple(
+            (tool, tuple(keywords)) for tool, keywords in TOOL_KEYWORDS.items()
+        )
+        # Longer aliases first, so "java developer" wins over "java"
+        self._position_aliases = tuple(
+            sorted(POSITION_ALIASES.items(), key=lambda item: len(item[0]), reverse=True)
+        )
+        self._pasted_positions = tuple(PASTED_CV_POSITIONS.items())
+
+    def _routing_text(self, message: str) -> str:
+        """Lowercased part of the message that carries routing information"""
+        if message[:len(CV_UPLOAD_PREFIX)].lower() == CV_UPLOAD_PREFIX:
+            # Uploaded CV: only the "<position> | <file name>" header matters, not the base64 payload
+            first = message.find("|")
+            second = message.find("|", first + 1) if first != -1 else -1
+            if second != -1:
+                return message[:second].lower()
+        return message.lower()
+
+    def _find_tool(self, text: str) -> str | None:
+        if not any(anchor in text for anchor in self._tool_anchors):
+            return None
+        for tool, keywords in self._tool_keywords:
+            if any(keyword in text for keyword in keywords):
+                return tool
+        return None
+
+    def route(self, message: str) -> Intent:
+        """
+        Classify a chat message.
+
+        Args:
+            message: Raw user message
+
+        Returns:
+            Intent with the message kind and, for CV evaluations, the position key
+        """
+        text = self._routing_text(message)
+
+        is_strong_cv = any(keyword in text for keyword in self._strong_cv)
+        if not is_strong_cv:
+            # e.g. "check leave balance for alice" is an HR lookup, not a CV request
+            tool_name = self._find_tool(text)
+            if tool_name:
+                return Intent(INTENT_TOOL_QUERY, tool_name=tool_name)
+
+        if is_strong_cv or any(keyword in text for keyword in self._weak_cv):
+            # "Evaluate my CV for positions: <content>" is an evaluation request
+            if "evaluate" not in text and not _count_at_least(text, self._request_content, 2):
+                return POSITION_LIST_INTENT
+
+        if text.startswith(CV_UPLOAD_PREFIX):
+            position_key = next(
+                (key for alias, key in self._position_aliases if alias in text), DEFAULT_POSITION_KEY
+            )
+            return Intent(INTENT_CV_EVAL, position_key=position_key, from_upload=True)
+
+        if _count_at_least(text, self._text_content, 3):
+            position_key = next((key for alias, key in self._pasted_positions if alias in text), None)
+            if position_key:
+                return Intent(INTENT_CV_EVAL, position_key=position_key)
+
+        return FAQ_INTENT
+
+
+# Shared router, prepared once at import
+INTENT_ROUTER = IntentRouter()
@@ -0,0 +1,245 @@
+"""
+Hedged LLM requests for tail-latency reduction.
+If the first LLM call has not answered by a percentile of recently observed
+latencies, an identical second request is sent and whichever finishes first
+wins; the other one is cancelled. Hedges are capped to a fraction of calls so
+token spend cannot double.
+"""
+
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+
+from metrics import METRICS
+from rate_limiter import (
+    get_scheduler, estimate_llm_call_tokens, get_token_usage, get_retry_after, PRIORITY_INTERACTIVE
+)
+
+
+def get_hedging_settings():
+    """Get LLM hedging settings from environment variables"""
+    return {
+        "enabled": os.getenv("LLM_HEDGING_ENABLED", "false").lower() in ("1", "true", "yes"),
+        "percentile": float(os.getenv("LLM_HEDGE_PERCENTILE", "95")),
+        "min_delay_ms": float(os.getenv("LLM_HEDGE_MIN_DELAY_MS", "300")),
+        "default_delay_ms": float(os.getenv("LLM_HEDGE_DEFAULT_DELAY_MS", "2000")),
+        "max_hedge_rate": float(os.getenv("LLM_HEDGE_MAX_RATE", "0.1")),
+        "window_size": int(os.getenv("LLM_HEDGE_WINDOW_SIZE", "200")),
+        "min_samples": int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20")),
+    }
+
+
+def request_timeout_kwargs(deadline: float | None) -> dict:
+    """Per-call timeout passed to the OpenAI client, so a request is dropped at the deadline"""
+    if deadline is None:
+        return {}
+    return {"timeout": max(0.0, deadline - time.monotonic())}
+
+
+def give_up_if_expired(scheduler, deadline: float | None, estimated_tokens: int):
+    """
+    Drop a call whose deadline passed while it waited for the quota.
+
+    Raises:
+        TimeoutError: If the deadline has passed (the call's quota tokens are given back)
+    """
+    if deadline is not None and time.monotonic() >= deadline:
+        scheduler.settle(estimated_tokens, 0)
+        raise TimeoutError(f"{scheduler.name} call deadline passed while waiting for the quota")
+
+
+async def call_llm(llm, messages, priority: int = PRIORITY_INTERACTIVE, timeout: float | None = None):
+    """
+    Invoke the LLM without blocking the event loop.
+
+    Remote LLM calls first wait for the outbound quota scheduler. Uses the
+    native async API when the LLM has one (so the call can be cancelled),
+    otherwise runs the blocking invoke in a worker thread. With a timeout,
+    both the quota wait and the HTTP request give up once it has elapsed.
+    """
+    if getattr(llm, "is_local", False):
+        return await asyncio.to_thread(llm.invoke, messages)
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    scheduler = get_scheduler("llm")
+    estimated_tokens = estimate_llm_call_tokens(messages)
+    await scheduler.acquire_async(estimated_tokens, priority, timeout=timeout)
+    give_up_if_expired(scheduler, deadline, estimated_tokens)
+    try:
+        if hasattr(llm, "ainvoke"):
+            response = await llm.ainvoke(messages, **request_timeout_kwargs(deadline))
+        else:
+            response = await asyncio.to_thread(llm.invoke, messages, **request_timeout_kwargs(deadline))
+    except Exception as e:
+        retry_after = get_retry_after(e)
+        if retry_after is not None:
+            scheduler.backoff(retry_after)
+        raise
+    scheduler.settle(estimated_tokens, get_token_usage(response))
+    return response
+
+
+async def call_llm_batch(llm, messages_list: list, priority: int = PRIORITY_INTERACTIVE,
+                         timeout: float | None = None) -> list:
+    """
+    Invoke the LLM for several independent prompts in one dispatch.
+
+    Args:
+        llm: LangChain chat model (or fallback LLM)
+        messages_list: One list of messages per prompt
+        priority: Quota scheduler priority
+        timeout: Seconds after which the requests are dropped (None: the client's default)
+
+    Returns:
+        One response per prompt, in order; failed prompts are returned as exceptions
+    """
+    if len(messages_list) == 1:
+        try:
+            return [await call_llm(llm, messages_list[0], priority, timeout)]
+        except Exception as e:
+            return [e]
+
+    if getattr(llm, "is_local", False):
+        def invoke_all():
+            results = []
+            for messages in messages_list:
+                try:
+                    results.append(llm.invoke(messages))
+                except Exception as e:
+                    results.append(e)
+            return results
+        return await asyncio.to_thread(invoke_all)
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    scheduler = get_scheduler("llm")
+    estimated_tokens = sum(estimate_llm_call_tokens(messages) for messages in messages_list)
+    # Nobody cancels a micro-batch dispatch when its callers give up: the deadline bounds the quota wait too
+    await scheduler.acquire_async(estimated_tokens, priority, timeout=timeout, requests=len(messages_list))
+    give_up_if_expired(scheduler, deadline, estimated_tokens)
+    results = await llm.abatch(messages_list, return_exceptions=True, **request_timeout_kwargs(deadline))
+    actual_tokens = 0
+    for result in results:
+        if isinstance(result, Exception):
+            retry_after = get_retry_after(result)
+            if retry_after is not None:
+                scheduler.backoff(retry_after)
+        else:
+            actual_tokens += get_token_usage(result) or 0
+    if actual_tokens:
+        scheduler.settle(estimated_tokens, actual_tokens)
+    return results
+
+
+class LatencyTracker:
+    """Sliding window of recent LLM latencies"""
+
+    def __init__(self, window_size: int):
+        self._samples = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms: float):
+        """Add a latency sample in milliseconds"""
+        with self._lock:
+            self._samples.append(latency_ms)
+
+    def percentile(self, pct: float, min_samples: int = 1) -> float | None:
+        """
+        Get the latency at the given percentile.
+
+        Returns:
+            Latency in milliseconds, or None if there are fewer than `min_samples` samples
+        """
+        with self._lock:
+            if len(self._samples) < max(min_samples, 1):
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class HedgedLLMCaller:
+    """Calls the LLM, sending a capped second request when the first is slow"""
+
+    def __init__(self, settings: dict | None = None):
+        self.settings = settings or get_hedging_settings()
+        self.latencies = LatencyTracker(self.settings["window_size"])
+        # Each primary call earns `max_hedge_rate` credits and a hedge costs one,
+        # so the long-run hedge rate can never exceed max_hedge_rate.
+        self._hedge_credits = 1.0
+        self._lock = threading.Lock()
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for the first call before hedging"""
+        observed = self.latencies.percentile(self.settings["percentile"], self.settings["min_samples"])
+        delay_ms = observed if observed is not None else self.settings["default_delay_ms"]
+        return max(delay_ms, self.settings["min_delay_ms"]) / 1000.0
+
+    def _earn_hedge_credit(self):
+        with self._lock:
+            self._hedge_credits = min(1.0, self._hedge_credits + self.settings["max_hedge_rate"])
+
+    def _take_hedge_credit(self) -> bool:
+        with self._lock:
+            if self._hedge_credits >= 1.0:
+                self._hedge_credits -= 1.0
+                return True
+            return False
+
+    async def _timed_call(self, llm, messages, deadline: float | None = None):
+        started = time.monotonic()
+        timeout = None if deadline is None else max(0.0, deadline - started)
+        response = await call_llm(llm, messages, timeout=timeout)
+        latency_ms = (time.monotonic() - started) * 1000.0
+        self.latencies.record(latency_ms)
+        METRICS.observe("llm.latency", latency_ms)
+        return response
+
+    async def invoke(self, llm, messages, timeout: float | None = None):
+        """
+        Invoke the LLM, hedging slow calls when hedging is enabled.
+
+        Args:
+            llm: LangChain chat model (or fallback LLM)
+            messages: Messages to send
+            timeout: Seconds after which the requests (hedge included) are dropped
+
+        Returns:
+            The LLM response from whichever request finished first
+        """
+        METRICS.increment("llm.calls")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if not self.settings["enabled"]:
+            return await self._timed_call(llm, messages, deadline)
+
+        self._earn_hedge_credit()
+        primary = asyncio.create_task(self._timed_call(llm, messages, deadline))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.hedge_delay())
+            if done or not self._take_hedge_credit():
+                return await primary
+
+            print("[HEDGE] First LLM call is slow, sending hedged request")
+            METRICS.increment("llm.hedges")
+            hedge = asyncio.create_task(self._timed_call(llm, messages, deadline))
+            pending = {primary, hedge}
+            last_error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            METRICS.increment("llm.hedge_wins")
+                        return task.result()
+                    last_error = task.exception()
+            raise last_error
+        finally:
+            # Cancel whichever request lost (or everything, if we were cancelled)
+            for task in pending:
+                task.cancel()
+
+
+# Shared caller so latency history and hedge credits are process-wide
+LLM_CALLER = HedgedLLMCaller()
@@ -0,0 +1,50 @@
+"""
+In-process metrics for the HR Assistant backend.
+Simple thread-safe counters and timing summaries exposed via /api/metrics.
+"""
+
+import threading
+
+
+class Metrics:
+    """Thread-safe counters and latency summaries"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._timings = {}
+
+    def increment(self, name: str, amount: int = 1):
+        """Increase a counter by `amount`"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def observe(self, name: str, value_ms: float):
+        """Record a timing observation in milliseconds"""
+        with self._lock:
+            timing = self._timings.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            timing["count"] += 1
+            timing["total_ms"] += value_ms
+            timing["max_ms"] = max(timing["max_ms"], value_ms)
+
+    def get(self, name: str) -> int:
+        """Get the current value of a counter"""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> dict:
+        """Get a copy of all counters and timing summaries"""
+        with self._lock:
+            timings = {
+                name: {
+                    "count": t["count"],
+                    "avg_ms": round(t["total_ms"] / t["count"], 2) if t["count"] else 0.0,
+                    "max_ms": round(t["max_ms"], 2),
+                }
+                for name, t in self._timings.items()
+            }
+            return {"counters": dict(self._counters), "timings": timings}
+
+
+# Shared metrics registry
+METRICS = Metrics()
@@ -0,0 +1,120 @@
+"""
+Micro-batching of concurrent requests.
+Collects items submitted within a short window (a few milliseconds) and
+dispatches them together in a single batch call, then scatters the
+per-item results back to the waiting callers.
+"""
+
+import os
+import asyncio
+
+from metrics import METRICS
+
+
+def get_micro_batching_settings():
+    """Get micro-batching settings from environment variables"""
+    return {
+        "enabled": os.getenv("MICRO_BATCHING_ENABLED", "false").lower() in ("1", "true", "yes"),
+        "max_wait_ms": float(os.getenv("MICRO_BATCH_MAX_WAIT_MS", "5")),
+        "max_batch_size": int(os.getenv("MICRO_BATCH_MAX_SIZE", "16")),
+    }
+
+
+class MicroBatcher:
+    """
+    Gathers items for up to `max_wait_ms` (or until `max_batch_size` items are
+    waiting) and hands them to `batch_fn` in one call.
+
+    `batch_fn` is an async function taking a list of items and returning a list
+    of results in the same order; a result that is an exception is raised to
+    the caller that submitted the corresponding item.
+    """
+
+    def __init__(self, name: str, batch_fn, max_wait_ms: float = 5.0, max_batch_size: int = 16):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._pending = []
+        self._timer = None
+        self._tasks = set()     # Running dispatches (the event loop only keeps weak references to tasks)
+
+    async def submit(self, item):
+        """
+        Submit an item and wait for its result.
+
+        Args:
+            item: Item to include in the next batch
+
+        Returns:
+            The result produced by batch_fn for this item
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch: list):
+        METRICS.increment(f"batch.{self.name}.dispatches")
+        METRICS.increment(f"batch.{self.name}.items", len(batch))
+        try:
+            try:
+                results = await self.batch_fn([item for item, _ in batch])
+            except Exception as e:
+                results = [e] * len(batch)
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    # The caller gave up (e.g. its deadline passed)
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        finally:
+            # A cancelled dispatch or a short result list must not leave callers waiting
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError(f"{self.name} batch ended without a result for this item"))
+
+
+async def dispatch_grouped(items: list, batch_fn) -> list:
+    """
+    Dispatch (target, payload) items with one batch call per distinct target.
+
+    Args:
+        items: List of (target, payload) tuples, e.g. (llm, messages)
+        batch_fn: Async function taking (target, payloads) and returning results in order
+
+    Returns:
+        Results in the same order as `items`
+    """
+    groups = {}
+    for position, (target, _) in enumerate(items):
+        groups.setdefault(id(target), (target, []))[1].append(position)
+
+    # The groups run concurrently: a mixed flush costs its slowest group, not their sum
+    group_results = await asyncio.gather(
+        *(batch_fn(target, [items[position][1] for position in positions]) for target, positions in groups.values()),
+        return_exceptions=True
+    )
+    results = [None] * len(items)
+    for (_, positions), outcome in zip(groups.values(), group_results):
+        if isinstance(outcome, BaseException):
+            outcome = [outcome] * len(positions)
+        for position, result in zip(positions, outcome):
+            results[position] = result
+    return results
@@ -0,0 +1,252 @@
+"""
+Outbound scheduler for Azure OpenAI tokens-per-minute and requests-per-minute quotas.
+Every outbound LLM or embeddings call reserves its estimated token cost first;
+calls are queued by priority (interactive chat ahead of index rebuilds) and
+paced to stay under quota instead of running into 429 responses.
+"""
+
+import os
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+
+from metrics import METRICS
+from token_utils import count_message_tokens
+
+# Lower value = served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+# How often a queued call re-checks the buckets (seconds)
+POLL_INTERVAL = 0.05
+
+
+def get_quota_settings(name: str) -> dict:
+    """
+    Get quota settings for an Azure deployment from environment variables.
+
+    Args:
+        name: Deployment kind ('llm' or 'embedding')
+
+    Returns:
+        Dictionary with tokens/requests per minute (0 means unlimited)
+    """
+    prefix = f"AZURE_OPENAI_{name.upper()}"
+    return {
+        "tokens_per_minute": int(os.getenv(f"{prefix}_TPM", "0")),
+        "requests_per_minute": int(os.getenv(f"{prefix}_RPM", "0")),
+        "headroom": float(os.getenv("AZURE_QUOTA_HEADROOM", "0.9")),
+        "burst_seconds": float(os.getenv("AZURE_QUOTA_BURST_SECONDS", "10")),
+    }
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate"""
+
+    def __init__(self, per_minute: float, burst_seconds: float):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (requests larger than the bucket wait for a full bucket)"""
+        needed = min(amount, self.capacity)
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        # May go negative for oversized requests; later callers then wait off the debt
+        self.tokens -= amount
+
+    def give_back(self, amount: float):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class OutboundScheduler:
+    """Priority queue that paces outbound calls against TPM/RPM buckets"""
+
+    def __init__(self, name: str, tokens_per_minute: int = 0, requests_per_minute: int = 0,
+                 headroom: float = 0.9, burst_seconds: float = 10.0):
+        self.name = name
+        self.token_bucket = TokenBucket(tokens_per_minute * headroom, burst_seconds) if tokens_per_minute else None
+        self.request_bucket = TokenBucket(requests_per_minute * headroom, burst_seconds) if requests_per_minute else None
+        self.paused_until = 0.0
+        self._queue = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def limited(self) -> bool:
+        return self.token_bucket is not None or self.request_bucket is not None
+
+    def _enqueue(self, tokens: int, priority: int, requests: int = 1) -> list:
+        ticket = [priority, next(self._sequence), tokens, requests]
+        with self._lock:
+            heapq.heappush(self._queue, ticket)
+        return ticket
+
+    def _dequeue(self, ticket: list):
+        with self._lock:
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+
+    def _try_grant(self, ticket: list) -> float:
+        """Grant the ticket if it is first in line and the buckets allow it; otherwise return seconds to wait"""
+        with self._lock:
+            now = time.monotonic()
+            if self.paused_until > now:
+                return self.paused_until - now
+            if self._queue[0] is not ticket:
+                return POLL_INTERVAL
+            wait = 0.0
+            if self.token_bucket:
+                self.token_bucket.refill(now)
+                wait = max(wait, self.token_bucket.wait_time(ticket[2]))
+            if self.request_bucket:
+                self.request_bucket.refill(now)
+                wait = max(wait, self.request_bucket.wait_time(ticket[3]))
+            if wait > 0:
+                return wait
+            heapq.heappop(self._queue)
+            if self.token_bucket:
+                self.token_bucket.take(ticket[2])
+            if self.request_bucket:
+                self.request_bucket.take(ticket[3])
+            return 0.0
+
+    def _record_wait(self, started: float):
+        waited_ms = (time.monotonic() - started) * 1000.0
+        if waited_ms >= 1.0:
+            METRICS.increment(f"quota.{self.name}.queued")
+            METRICS.observe(f"quota.{self.name}.wait", waited_ms)
+
+    def acquire(self, tokens: int, priority: int = PRIORITY_INTERACTIVE, timeout: float | None = None,
+                requests: int = 1):
+        """
+        Block until the call may be sent.
+
+        Args:
+            tokens: Estimated token cost of the call
+            priority: PRIORITY_INTERACTIVE or PRIORITY_BULK
+            timeout: Maximum seconds to wait (None waits indefinitely)
+            requests: Number of HTTP requests the call makes (batched calls make several)
+
+        Raises:
+            TimeoutError: If the quota does not allow the call within `timeout`
+        """
+        if not self.limited:
+            return
+        started = time.monotonic()
+        ticket = self._enqueue(tokens, priority, requests)
+        try:
+            while True:
+                wait = self._try_grant(ticket)
+                if wait == 0.0:
+                    self._record_wait(started)
+                    return
+                if timeout is not None and time.monotonic() - started + wait > timeout:
+                    raise TimeoutError(f"{self.name} quota wait exceeded {timeout:.2f}s")
+                time.sleep(min(wait, POLL_INTERVAL))
+        except BaseException:
+            self._dequeue(ticket)
+            raise
+
+    async def acquire_async(self, tokens: int, priority: int = PRIORITY_INTERACTIVE, timeout: float | None = None,
+                            requests: int = 1):
+        """Async version of acquire(); cancelling the caller releases its place in the queue"""
+        if not self.limited:
+            return
+        started = time.monotonic()
+        ticket = self._enqueue(tokens, priority, requests)
+        try:
+            while True:
+                wait = self._try_grant(ticket)
+                if wait == 0.0:
+                    self._record_wait(started)
+                    return
+                if timeout is not None and time.monotonic() - started + wait > timeout:
+                    raise TimeoutError(f"{self.name} quota wait exceeded {timeout:.2f}s")
+                await asyncio.sleep(min(wait, POLL_INTERVAL))
+        except BaseException:
+            self._dequeue(ticket)
+            raise
+
+    def settle(self, estimated_tokens: int, actual_tokens: int | None):
+        """Correct the token bucket once the real usage of a call is known"""
+        if not self.token_bucket or actual_tokens is None:
+            return
+        with self._lock:
+            self.token_bucket.give_back(estimated_tokens - actual_tokens)
+
+    def backoff(self, seconds: float):
+        """Pause all outbound calls, e.g. after a 429 with Retry-After"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        METRICS.increment(f"quota.{self.name}.rate_limited")
+
+    def stats(self) -> dict:
+        """Current queue length and bucket levels"""
+        with self._lock:
+            return {
+                "queued": len(self._queue),
+                "tokens_available": round(self.token_bucket.tokens) if self.token_bucket else None,
+                "requests_available": round(self.request_bucket.tokens, 1) if self.request_bucket else None,
+                "paused_for_s": round(max(0.0, self.paused_until - time.monotonic()), 2),
+            }
+
+
+def estimate_llm_call_tokens(messages) -> int:
+    """Estimate the quota cost of a chat completion: prompt tokens plus expected completion"""
+    return count_message_tokens(messages) + int(os.getenv("LLM_EXPECTED_COMPLETION_TOKENS", "300"))
+
+
+def get_token_usage(response) -> int | None:
+    """Get the total tokens billed for an LLM response, if the provider reported it"""
+    metadata = getattr(response, "response_metadata", None) or {}
+    usage = metadata.get("token_usage") or {}
+    return usage.get("total_tokens")
+
+
+def get_retry_after(error: Exception) -> float | None:
+    """
+    Get the Retry-After delay from a rate-limit (HTTP 429) error.
+
+    Returns:
+        Seconds to back off, or None if the error is not a rate-limit error
+    """
+    if getattr(error, "status_code", None) != 429 and type(error).__name__ != "RateLimitError":
+        return None
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", 1))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(name: str) -> OutboundScheduler:
+    """Get the shared scheduler for an Azure deployment ('llm' or 'embedding')"""
+    with _schedulers_lock:
+        if name not in _schedulers:
+            settings = get_quota_settings(name)
+            _schedulers[name] = OutboundScheduler(
+                name,
+                tokens_per_minute=settings["tokens_per_minute"],
+                requests_per_minute=settings["requests_per_minute"],
+                headroom=settings["headroom"],
+                burst_seconds=settings["burst_seconds"],
+            )
+        return _schedulers[name]
@@ -0,0 +1,66 @@
+"""
+Per-request latency budget for the chat pipeline.
+Tracks a deadline so each stage (retrieval, LLM, source formatting) can check
+how much time is left and degrade gracefully instead of blowing the SLO.
+"""
+
+import os
+import time
+
+
+def get_budget_settings():
+    """Get latency budget settings from environment variables"""
+    return {
+        "default_deadline_ms": int(os.getenv("CHAT_DEADLINE_MS", "8000")),
+        "max_deadline_ms": int(os.getenv("CHAT_MAX_DEADLINE_MS", "30000")),
+        "min_llm_budget_ms": int(os.getenv("CHAT_MIN_LLM_BUDGET_MS", "1500")),
+    }
+
+
+class RequestBudget:
+    """Deadline for a single request, measured on the monotonic clock"""
+
+    def __init__(self, deadline_ms: int):
+        self.deadline_ms = deadline_ms
+        self.started_at = time.monotonic()
+        self.deadline = self.started_at + deadline_ms / 1000.0
+
+    @classmethod
+    def for_request(cls, deadline_ms: int | None = None) -> "RequestBudget":
+        """
+        Create a budget for a request, applying the configured default and cap.
+
+        Args:
+            deadline_ms: Deadline requested by the client (None uses the default)
+
+        Returns:
+            RequestBudget instance
+        """
+        settings = get_budget_settings()
+        if not deadline_ms or deadline_ms <= 0:
+            deadline_ms = settings["default_deadline_ms"]
+        return cls(min(deadline_ms, settings["max_deadline_ms"]))
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)"""
+        return max(0.0, self.deadline - time.monotonic())
+
+    def remaining_ms(self) -> float:
+        """Milliseconds left before the deadline (never negative)"""
+        return self.remaining() * 1000.0
+
+    def elapsed_ms(self) -> float:
+        """Milliseconds spent since the request started"""
+        return (time.monotonic() - self.started_at) * 1000.0
+
+    def expired(self) -> bool:
+        """True once the deadline has passed"""
+        return self.remaining() <= 0.0
+
+    def can_afford(self, needed_ms: float) -> bool:
+        """True if at least `needed_ms` milliseconds are left"""
+        return self.remaining_ms() >= needed_ms
+
+    def can_afford_llm(self) -> bool:
+        """True if enough time is left to make an LLM call"""
+        return self.can_afford(get_budget_settings()["min_llm_budget_ms"])
@@ -0,0 +1,246 @@
+"""
+Autocomplete suggestions for the chat input.
+Known questions (FAQ questions in English and Vietnamese), CV checks for each
+job position and leave-balance questions for each employee are indexed in an
+in-memory compressed prefix trie (radix trie). Every word start of a
+suggestion is a key, and each trie node stores its best completions, so a
+lookup is one walk down the trie with no search below the matched node.
+"""
+
+import os
+import csv
+import heapq
+import itertools
+import time
+from dataclasses import dataclass
+
+from employee_directory import normalize_name
+
+SUGGESTION_FAQ = "faq"
+SUGGESTION_POSITION = "position"
+SUGGESTION_EMPLOYEE = "employee"
+
+# Lower ranks are suggested first: known FAQ questions hit the cheapest path
+KIND_PRIORITY = {SUGGESTION_FAQ: 0, SUGGESTION_POSITION: 1, SUGGESTION_EMPLOYEE: 2}
+
+# Question templates; the employee ones are phrased so the tool fast path answers them
+POSITION_TEMPLATES = {
+    "en": "Check my CV for the {name} position",
+    "vi": "Kiểm tra CV cho vị trí {name}",
+}
+EMPLOYEE_TEMPLATES = {
+    "en": "How many leave days does {name} have?",
+    "vi": "{name} còn bao nhiêu ngày phép?",
+}
+
+
+def get_suggestion_settings():
+    """Get autocomplete settings from environment variables"""
+    return {
+        "top_k": int(os.getenv("SUGGEST_TOP_K", "8")),
+        "max_employees": int(os.getenv("SUGGEST_MAX_EMPLOYEES", "20000")),
+    }
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    """A completion offered to the user (for employees, the text is the employee's name)"""
+    text: str
+    kind: str
+
+    def to_dict(self, language: str = "en") -> dict:
+        if self.kind == SUGGESTION_EMPLOYEE:
+            template = EMPLOYEE_TEMPLATES.get(language, EMPLOYEE_TEMPLATES["en"])
+            return {"text": template.format(name=self.text), "kind": self.kind}
+        return {"text": self.text, "kind": self.kind}
+
+
+class _Node:
+    __slots__ = ("label", "children", "top")
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.children = {}  # first character of the child's label -> child
+        self.top = ()       # best (rank, value) pairs in this subtree
+
+
+class RadixTrie:
+    """Compressed prefix trie that keeps the top-k values of every subtree"""
+
+    def __init__(self, items: list[tuple[str, int, int]], top_k: int = 8):
+        """
+        Build the trie in one pass over the sorted keys.
+
+        Args:
+            items: (key, rank, value) tuples; lower ranks are better
+            top_k: Number of best values kept per node
+        """
+        self.top_k = top_k
+        self._items = sorted(items)
+        self.root = _Node()
+        self._build(self.root, 0, len(self._items), 0)
+        del self._items
+
+    def _build(self, node: _Node, lo: int, hi: int, depth: int):
+        # items[lo:hi] all start with the node's prefix, which is `depth` characters long
+        items = self._items
+        candidates = []
+        i = lo
+        while i < hi and len(items[i][0]) == depth:
+            candidates.append((items[i][1], items[i][2]))
+            i += 1
+        while i < hi:
+            first = items[i][0]
+            char = first[depth]
+            j = i + 1
+            while j < hi and items[j][0][depth] == char:
+                j += 1
+            # The keys are sorted, so the first and last key of the group bound its common prefix
+            last = items[j - 1][0]
+            end = depth + 1
+            limit = min(len(first), len(last))
+            while end < limit and first[end] == last[end]:
+                end += 1
+            child = _Node(first[depth:end])
+            node.children[char] = child
+            self._build(child, i, j, end)
+            candidates.extend(child.top)
+            i = j
+
+        candidates.sort()
+        best, seen = [], set()
+        for rank, value in candidates:
+            if value not in seen:
+                seen.add(value)
+                best.append((rank, value))
+                if len(best) == self.top_k:
+                    break
+        node.top = tuple(best)
+
+    def lookup(self, prefix: str) -> tuple:
+        """Best (rank, value) pairs of the keys starting with the prefix"""
+        node, i = self.root, 0
+        while i < len(prefix):
+            child = node.children.get(prefix[i])
+            if child is None:
+                return ()
+            label = child.label
+            if prefix.startswith(label, i):
+                node, i = child, i + len(label)
+            elif label.startswith(prefix[i:]):
+                return child.top
+            else:
+                return ()
+        return node.top
+
+
+def normalize_query(text: str) -> str:
+    """Normalize typed text like the trie keys, keeping a trailing space (a finished word)"""
+    normalized = normalize_name(text)
+    if normalized and text[-1:].isspace():
+        normalized += " "
+    return normalized
+
+
+class SuggestionIndex:
+    """Autocomplete over known questions, with one trie per language and one for employees"""
+
+    def __init__(self, top_k: int = 8):
+        self.top_k = top_k
+        self.suggestions = []
+        self._keys = {"en": [], "vi": [], SUGGESTION_EMPLOYEE: []}
+        self._tries = {}
+
+    def add(self, text: str, kind: str, language: str | None = None):
+        """
+        Index a suggestion under every word start of its text.
+
+        Args:
+            text: Suggested text (the name, for employees)
+            kind: SUGGESTION_FAQ, SUGGESTION_POSITION or SUGGESTION_EMPLOYEE
+            language: Language whose trie gets the suggestion (employees go to the shared trie)
+        """
+        keys = self._keys[SUGGESTION_EMPLOYEE if kind == SUGGESTION_EMPLOYEE else language]
+        suggestion_id = len(self.suggestions)
+        self.suggestions.append(Suggestion(text, kind))
+        words = normalize_name(text).split()
+        for position in range(len(words)):
+            # Completions of the beginning of the text come first, then by kind, then in order added
+            rank = (position > 0) << 40 | KIND_PRIORITY[kind] << 32 | suggestion_id
+            keys.append((" ".join(words[position:]), rank, suggestion_id))
+
+    def finalize(self):
+        """Build the tries from the added suggestions"""
+        self._tries = {name: RadixTrie(keys, self.top_k) for name, keys in self._keys.items()}
+        self._keys = None
+
+    def suggest(self, text: str, language: str = "en", limit: int = 5) -> list[dict]:
+        """
+        Get completions for the text typed so far.
+
+        Args:
+            text: Partial user input
+            language: "en" or "vi"
+            limit: Maximum number of suggestions (at most top_k)
+
+        Returns:
+            Suggestion dicts with text and kind, best first
+        """
+        prefix = normalize_query(text)
+        if not prefix:
+            return []
+        trie = self._tries["vi" if language == "vi" else "en"]
+        merged = heapq.merge(trie.lookup(prefix), self._tries[SUGGESTION_EMPLOYEE].lookup(prefix))
+        return [self.suggestions[value].to_dict(language) for _, value in itertools.islice(merged, limit)]
+
+
+def load_faq_questions(csv_path: str) -> list[str]:
+    """Questions of the FAQ CSV"""
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        return [row["Question"].strip() for row in csv.DictReader(f) if row.get("Question")]
+
+
+def build_suggestion_index(faq_questions: list[str], translations: dict, positions: dict,
+                           directory=None, settings: dict | None = None) -> SuggestionIndex:
+    """
+    Build the autocomplete index.
+
+    Args:
+        faq_questions: English FAQ questions
+        translations: English question -> Vietnamese question
+        positions: Job positions (JOB_POSITIONS)
+        directory: Employee directory (employees are skipped if None)
+        settings: Autocomplete settings (defaults to get_suggestion_settings())
+
+    Returns:
+        Finalized SuggestionIndex
+    """
+    settings = settings or get_suggestion_settings()
+    started = time.perf_counter()
+    index = SuggestionIndex(settings["top_k"])
+
+    for question in faq_questions:
+        index.add(question, SUGGESTION_FAQ, "en")
+        index.add(translations.get(question, question), SUGGESTION_FAQ, "vi")
+
+    for position in positions.values():
+        index.add(POSITION_TEMPLATES["en"].format(name=position["name"]), SUGGESTION_POSITION, "en")
+        index.add(POSITION_TEMPLATES["vi"].format(name=position["name_vi"]), SUGGESTION_POSITION, "vi")
+
+    employee_count = 0
+    if directory is not None:
+        seen_names = set()
+        for employee in directory.list_employees(settings["max_employees"]):
+            # A shared name is one suggestion (the tool answer then lists the matching employees)
+            name_key = normalize_name(employee["name"])
+            if name_key in seen_names:
+                continue
+            seen_names.add(name_key)
+            # Keyed by the name only, so typing a name completes to the question about it
+            index.add(employee["name"], SUGGESTION_EMPLOYEE)
+            employee_count += 1
+
+    index.finalize()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"[SUGGEST] Indexed {len(index.suggestions)} suggestions ({employee_count} employees) in {elapsed_ms:.0f} ms")
+    return index
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Concurrency test of the candidate store: CVs evaluated by the chat are stored
+while a re-scoring job runs, without waiting for the whole job (SQLite busy
+timeout) and without losing either the new candidates or the new scores.
+
+Usage:
+    python test_candidate_store.py
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import threading
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_candidate_store import edited_positions
+from bench_skill_matrix import synthetic_cv
+from candidate_store import CandidateStore
+from cv_features import extract_cv_features
+from cv_scoring import score_matrix
+
+CANDIDATES = 20000
+ADDED = 20
+
+
+def test_add_cv_during_rescore():
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "candidates.db")
+        store = CandidateStore(path)
+        store.load()
+        store.add_many([(extract_cv_features(synthetic_cv(rng)), None, "test", str(i)) for i in range(CANDIDATES)])
+        store._connection.close()
+
+        edited = CandidateStore(path, positions=edited_positions())
+        edited.load()
+        assert edited.stale_positions, "the edited positions should need re-scoring"
+        texts = [f"Added {i}\n{synthetic_cv(rng)}" for i in range(ADDED)]
+        added = []
+        add_times = []
+        errors = []
+
+        def add_during_rescore():
+            try:
+                for text in texts:
+                    started = time.perf_counter()
+                    added.append(edited.add_cv(text, source="chat"))
+                    add_times.append(time.perf_counter() - started)
+            except Exception as e:
+                errors.append(e)
+
+        adder = threading.Thread(target=add_during_rescore)
+
+        def start_adding(job):
+            if not adder.is_alive() and not added:
+                adder.start()
+                time.sleep(0.05)    # Let the adder wait on the next batch's write lock
+
+        rescorer_errors = []
+
+        def run_rescore():
+            try:
+                edited.rescore(batch_size=500, progress=start_adding)
+            except Exception as e:
+                rescorer_errors.append(e)
+
+        rescorer = threading.Thread(target=run_rescore)
+        rescorer.start()
+        rescorer.join(60)
+        adder.join(60)
+
+        assert not errors and not rescorer_errors, (errors, rescorer_errors)
+        assert edited.job["state"] == "done", edited.job
+        assert len(added) == ADDED and max(add_times) < 5, add_times
+        assert edited.job["elapsed_s"] < 10, edited.job
+        totals, missing = score_matrix(edited.skills, edited.bases, edited.positions)
+        assert (totals == edited.totals).all() and (missing == edited.missing).all(), "re-scored scores differ"
+
+        reloaded = CandidateStore(path, positions=edited_positions())
+        reloaded.load()
+        assert not reloaded.stale_positions, reloaded.stale_positions
+        assert len(reloaded.ids) == CANDIDATES + ADDED
+        assert (reloaded.totals == edited.totals).all() and (reloaded.missing == edited.missing).all()
+        for opened in (edited, reloaded):
+            opened._connection.close()
+
+
+if __name__ == "__main__":
+    test_add_cv_during_rescore()
+    print("✅ Candidates stored during a re-scoring job without waiting for it")
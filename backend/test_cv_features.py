@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Feature checks of extract_cv_features(): degrees, certifications and
+employment years read from CV phrases, on word boundaries.
+
+Usage:
+    python test_cv_features.py
+"""
+
+import os
+import sys
+from datetime import date
+sys.path.insert(0, os.path.dirname(__file__))
+
+from cv_features import extract_cv_features
+
+TODAY = date(2026, 1, 1)
+
+
+def test_degrees():
+    assert extract_cv_features("M.Sc. in Data Science").degree == "Master's"
+    assert extract_cv_features("MBA, PMP").degree == "Master's"
+    assert extract_cv_features("PhD in Machine Learning\nMaster of Science").degree == "PhD"
+    assert extract_cv_features("Bachelor of Science in Computer Science").degree == "Bachelor's"
+    assert extract_cv_features("Worked in teams of 5 engineers").degree == "None"
+
+
+def test_scrum_master_is_not_a_degree():
+    features = extract_cv_features("Certified Scrum Master, 5 years experience")
+    assert features.degree == "None", features.degree
+    assert features.certifications == ("Scrum Master",)
+    assert extract_cv_features("Scrum Master at Acme\nMaster of Science in CS").degree == "Master's"
+    assert extract_cv_features("Certified Scrum Master (CSM)\nBachelor of Science").degree == "Bachelor's"
+
+
+def test_scrum_master_job_counts_as_employment():
+    features = extract_cv_features(
+        "Scrum Master, Acme | 2019 - 2023\nDeveloper, Beta | 2015 - 2019\nMaster of Science, HCMUT | 2013 - 2015",
+        today=TODAY
+    )
+    assert features.range_years == 8.0, features.range_years
+    assert features.degree == "Master's"
+
+
+if __name__ == "__main__":
+    test_degrees()
+    test_scrum_master_is_not_a_degree()
+    test_scrum_master_job_counts_as_employment()
+    print("✅ CV feature checks passed")
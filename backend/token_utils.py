@@ -0,0 +1,77 @@
+"""
+Token counting helpers.
+Uses tiktoken when it is installed (it ships with langchain-openai) and falls
+back to a characters-per-token estimate otherwise.
+"""
+
+import os
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Rough average for English/Vietnamese text when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+# Per-message overhead of the chat completion format
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+@lru_cache(maxsize=1)
+def get_encoding():
+    """Get the tiktoken encoding (None if tiktoken is unavailable)"""
+    if not tiktoken:
+        return None
+    try:
+        return tiktoken.get_encoding(os.getenv("TOKENIZER_ENCODING", "cl100k_base"))
+    except Exception as e:
+        print(f"[WARNING] Could not load tokenizer ({str(e)[:60]}), using character estimate")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens in a piece of text.
+
+    Args:
+        text: Text to count
+
+    Returns:
+        Number of tokens (estimated if no tokenizer is available)
+    """
+    if not text:
+        return 0
+    encoding = get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def count_message_tokens(messages) -> int:
+    """Count the prompt tokens for a list of chat messages"""
+    return sum(count_tokens(str(msg.content)) + MESSAGE_OVERHEAD_TOKENS for msg in messages) + 2
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut text to at most `max_tokens` tokens.
+
+    Args:
+        text: Text to cut
+        max_tokens: Token limit
+
+    Returns:
+        The longest prefix of the text within the limit
+    """
+    if max_tokens <= 0:
+        return ""
+    encoding = get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        # A token boundary can split a multi-byte character; drop the partial character
+        return encoding.decode(tokens[:max_tokens]).rstrip("\ufffd")
+    return text[:max_tokens * CHARS_PER_TOKEN]
@@ -0,0 +1,264 @@
+"""
+Tool-calling loop for the LLM.
+Binds the HR function tools to the chat model, runs the tool calls of one
+model turn concurrently in a thread pool, feeds the results back to the model
+and caps the number of tool-call rounds. Results of deterministic tools are
+cached with a per-tool TTL.
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.messages import ToolMessage
+
+from metrics import METRICS
+
+# Tools whose results only depend on their arguments (and slowly changing data),
+# with how long a cached result stays valid in seconds
+TOOL_CACHE_TTLS = {
+    "get_job_positions": 3600,
+    "check_company_info": 3600,
+    "check_pay_date": 300,
+}
+
+
+def get_tool_settings():
+    """Get tool-calling settings from environment variables"""
+    return {
+        "enabled": os.getenv("TOOL_CALLING_ENABLED", "true").lower() in ("1", "true", "yes"),
+        "max_rounds": int(os.getenv("TOOL_MAX_ROUNDS", "3")),
+        "max_workers": int(os.getenv("TOOL_MAX_WORKERS", "4")),
+        "cache_enabled": os.getenv("TOOL_CACHE_ENABLED", "true").lower() in ("1", "true", "yes"),
+        "cache_max_entries": int(os.getenv("TOOL_CACHE_MAX_ENTRIES", "256")),
+    }
+
+
+# Mentions of the tools parameters in an API error body
+TOOLS_PARAMETER_PATTERN = re.compile(r"\btool_choice\b|\btools\b", re.IGNORECASE)
+
+
+def rejects_tools(error: Exception) -> bool:
+    """Whether an LLM error is the API rejecting the tools parameters (not the prompt itself)"""
+    if getattr(error, "status_code", None) != 400:
+        return False
+    body = getattr(error, "body", None)
+    return bool(TOOLS_PARAMETER_PATTERN.search(f"{json.dumps(body, default=str) if body else ''} {error}"))
+
+
+def describe_tool_call(tool_name: str, args: dict, elapsed_ms: float, cached: bool = False) -> str:
+    """Format a tool call for ChatResponse.function_calls"""
+    arg_text = ", ".join(f"{name}={value!r}" for name, value in args.items())
+    timing = "cached" if cached else f"{elapsed_ms:.2f} ms"
+    return f"{tool_name}({arg_text}) [{timing}]"
+
+
+def extract_tool_calls(response) -> list[dict]:
+    """
+    Get the tool calls requested by a model response.
+
+    Args:
+        response: AIMessage returned by the chat model
+
+    Returns:
+        List of {"name", "args", "id"} dicts (empty if the model answered directly)
+    """
+    tool_calls = getattr(response, "tool_calls", None)
+    if tool_calls:
+        return [{"name": call["name"], "args": call.get("args") or {}, "id": call.get("id")} for call in tool_calls]
+
+    # Older message objects only carry the raw OpenAI payload
+    raw_calls = getattr(response, "additional_kwargs", {}).get("tool_calls") or []
+    parsed = []
+    for call in raw_calls:
+        function = call.get("function", {})
+        try:
+            args = json.loads(function.get("arguments") or "{}")
+        except json.JSONDecodeError:
+            args = {}
+        parsed.append({"name": function.get("name"), "args": args, "id": call.get("id")})
+    return parsed
+
+
+class ToolResultCache:
+    """In-memory cache of tool results with per-tool TTLs"""
+
+    def __init__(self, ttls: dict, max_entries: int = 256):
+        self.ttls = ttls
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _key(self, tool_name: str, args: dict):
+        return tool_name, json.dumps(args, sort_keys=True, default=str)
+
+    def get(self, tool_name: str, args: dict) -> str | None:
+        """Get a cached result, or None if missing, expired or not cacheable"""
+        if tool_name not in self.ttls:
+            return None
+        key = self._key(tool_name, args)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, result = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            return result
+
+    def put(self, tool_name: str, args: dict, result: str):
+        """Cache a result if the tool is cacheable"""
+        ttl = self.ttls.get(tool_name)
+        if not ttl:
+            return
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                # Drop the entry closest to expiry
+                oldest = min(self._entries, key=lambda key: self._entries[key][0])
+                del self._entries[oldest]
+            self._entries[self._key(tool_name, args)] = (time.monotonic() + ttl, result)
+
+
+class ToolExecutor:
+    """Runs the bind -> call -> execute tools -> call loop for a chat prompt"""
+
+    def __init__(self, tools: list, settings: dict | None = None):
+        self.settings = settings or get_tool_settings()
+        self.tools = {tool.name: tool for tool in tools}
+        self.cache = ToolResultCache(TOOL_CACHE_TTLS, self.settings["cache_max_entries"])
+        self._pool = None
+        self._bindings = {}
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.settings["max_workers"], thread_name_prefix="tool"
+                )
+            return self._pool
+
+    def bind(self, model):
+        """
+        Get the model with the tools bound (cached per model).
+
+        Returns:
+            Tuple of (model that may call tools, model that must answer without tools),
+            or None if the model does not support tool calling
+        """
+        if not self.settings["enabled"] or getattr(model, "is_local", False) or not hasattr(model, "bind_tools"):
+            return None
+        key = id(model)
+        with self._lock:
+            binding = self._bindings.get(key)
+            if binding is not None and binding[0] is model:
+                return binding[1]
+        tools = list(self.tools.values())
+        try:
+            bound = (model.bind_tools(tools), model.bind_tools(tools, tool_choice="none"))
+        except Exception as e:
+            print(f"[WARNING] Could not bind tools to the LLM: {str(e)[:100]}")
+            bound = None
+        with self._lock:
+            self._bindings[key] = (model, bound)
+        return bound
+
+    def _run_tool(self, tool_name: str, args: dict) -> tuple[str, float]:
+        started = time.perf_counter()
+        tool = self.tools.get(tool_name)
+        if tool is None:
+            result = f"Error: unknown tool '{tool_name}'"
+        else:
+            try:
+                result = str(tool.invoke(args))
+            except Exception as e:
+                # Returned to the model so it can correct the call or answer without it
+                result = f"Error: {tool_name} failed: {str(e)}"
+        return result, (time.perf_counter() - started) * 1000
+
+    async def execute(self, tool_calls: list[dict]) -> list[tuple[str, str]]:
+        """
+        Run the tool calls of one model turn concurrently.
+
+        Args:
+            tool_calls: Calls returned by extract_tool_calls()
+
+        Returns:
+            One (result, function call description) tuple per call, in order
+        """
+        loop = asyncio.get_running_loop()
+        use_cache = self.settings["cache_enabled"]
+        pending = {}
+        outcomes = [None] * len(tool_calls)
+        for position, call in enumerate(tool_calls):
+            cached = self.cache.get(call["name"], call["args"]) if use_cache else None
+            if cached is not None:
+                METRICS.increment("tools.cache_hits")
+                outcomes[position] = (cached, describe_tool_call(call["name"], call["args"], 0.0, cached=True))
+            else:
+                pending[position] = loop.run_in_executor(self._get_pool(), self._run_tool, call["name"], call["args"])
+
+        if pending:
+            results = await asyncio.gather(*pending.values())
+            for position, (result, elapsed_ms) in zip(pending, results):
+                call = tool_calls[position]
+                METRICS.increment("tools.calls")
+                METRICS.observe(f"tools.{call['name']}", elapsed_ms)
+                if use_cache and not result.startswith("Error:"):
+                    self.cache.put(call["name"], call["args"], result)
+                outcomes[position] = (result, describe_tool_call(call["name"], call["args"], elapsed_ms))
+        return outcomes
+
+    async def run(self, invoke, model, messages: list):
+        """
+        Get the model's answer, executing any tool calls it makes.
+
+        Args:
+            invoke: Async function (messages, model) -> response used for every LLM call
+            model: Chat model (tools are bound to it when supported)
+            messages: Prompt messages
+
+        Returns:
+            Tuple of (final response, list of function call descriptions)
+        """
+        bound = self.bind(model)
+        if bound is None:
+            return await invoke(messages, model), []
+        with_tools, without_tools = bound
+
+        messages = list(messages)
+        function_calls = []
+        for round_number in range(self.settings["max_rounds"]):
+            try:
+                response = await invoke(messages, with_tools)
+            except Exception as e:
+                if round_number or not rejects_tools(e):
+                    # Other 400s (content filter, context length, malformed messages) are
+                    # about this prompt: the model keeps its tools for the next requests
+                    raise
+                # The deployment rejected the tools parameter (e.g. an API version without
+                # tool support): stop binding tools to this model and answer without them
+                print(f"[WARNING] LLM rejected tool definitions ({str(e)[:80]}), disabling tool calling")
+                with self._lock:
+                    self._bindings[id(model)] = (model, None)
+                return await invoke(messages, model), []
+            tool_calls = extract_tool_calls(response)
+            if not tool_calls:
+                return response, function_calls
+
+            print(f"[TOOLS] Round {round_number + 1}: {', '.join(call['name'] for call in tool_calls)}")
+            METRICS.increment("tools.rounds")
+            messages.append(response)
+            for call, (result, description) in zip(tool_calls, await self.execute(tool_calls)):
+                messages.append(ToolMessage(content=result, tool_call_id=call["id"] or call["name"]))
+                function_calls.append(description)
+
+        # Round limit reached: the model must answer with what it has
+        print(f"[TOOLS] Reached {self.settings['max_rounds']} tool rounds, asking for a final answer")
+        METRICS.increment("tools.round_limit_hits")
+        return await invoke(messages, without_tools), function_calls
@@ -1,31 +1,93 @@
 // components/InputBar.jsx
-import { useState } from 'react';
+import { useState, useEffect, useRef } from 'react';
+import axios from 'axios';
 import { Send } from 'lucide-react';
 
+const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
+const SUGGEST_DELAY_MS = 120;
+const SUGGEST_MIN_CHARS = 2;
+
 export default function InputBar({ onSendMessage, isLoading, placeholder, language }) {
     const [message, setMessage] = useState('');
+    const [suggestions, setSuggestions] = useState([]);
+    const [activeIndex, setActiveIndex] = useState(-1);
+    const latestQuery = useRef('');
 
     const defaultPlaceholder = language === 'vi'
         ? 'Hỏi tôi về chính sách HR, nghỉ phép, lương bổng, hoặc phúc lợi công ty...'
         : 'Ask me about HR policies, leave, pay, or company benefits...';
 
     const helpText = language === 'vi'
-        ? 'Shift+Enter để xuống dòng • Enter để gửi'
-        : 'Shift+Enter for new line • Enter to send';
+        ? 'Shift+Enter để xuống dòng • Enter để gửi • ↑↓ để chọn gợi ý'
+        : 'Shift+Enter for new line • Enter to send • ↑↓ to pick a suggestion';
 
     const sendTitle = language === 'vi'
         ? 'Gửi tin nhắn (Shift+Enter để xuống dòng)'
         : 'Send message (Shift+Enter for new line)';
 
+    // Fetch suggestions once the user pauses typing
+    useEffect(() => {
+        const query = message.trim();
+        latestQuery.current = message;
+        if (query.length < SUGGEST_MIN_CHARS || message.includes('\n')) {
+            setSuggestions([]);
+            return undefined;
+        }
+        const timer = setTimeout(async () => {
+            try {
+                const response = await axios.get(`${API_URL}/api/suggest`, {
+                    params: { q: message, language, limit: 5 },
+                });
+                // Ignore responses for text the user has already changed
+                if (latestQuery.current !== message) return;
+                const items = response.data.suggestions || [];
+                // Hide the list once the input already is a suggestion
+                setSuggestions(items.some((item) => item.text === query) ? [] : items);
+                setActiveIndex(-1);
+            } catch (err) {
+                setSuggestions([]);
+            }
+        }, SUGGEST_DELAY_MS);
+        return () => clearTimeout(timer);
+    }, [message, language]);
+
+    const pickSuggestion = (suggestion) => {
+        setMessage(suggestion.text);
+        setSuggestions([]);
+        setActiveIndex(-1);
+    };
+
     const handleSubmit = (e) => {
         e.preventDefault();
         if (message.trim() && !isLoading) {
             onSendMessage(message);
             setMessage('');
+            setSuggestions([]);
         }
     };
 
     const handleKeyDown = (e) => {
+        if (suggestions.length > 0) {
+            if (e.key === 'ArrowDown') {
+                e.preventDefault();
+                setActiveIndex((index) => (index + 1) % suggestions.length);
+                return;
+            }
+            if (e.key === 'ArrowUp') {
+                e.preventDefault();
+                setActiveIndex((index) => (index <= 0 ? suggestions.length - 1 : index - 1));
+                return;
+            }
+            if (e.key === 'Escape') {
+                setSuggestions([]);
+                return;
+            }
+            if (e.key === 'Enter' && !e.shiftKey && activeIndex >= 0) {
+                e.preventDefault();
+                pickSuggestion(suggestions[activeIndex]);
+                return;
+            }
+        }
         if (e.key === 'Enter' && !e.shiftKey && !isLoading) {
             handleSubmit(e);
         }
@@ -34,15 +96,37 @@ export default function InputBar({ onSendMessage, isLoading, placeholder, langua
     return (
         <form onSubmit={handleSubmit} className="border-t border-gray-200 bg-white p-4">
             <div className="flex gap-3">
-                <textarea
-                    value={message}
-                    onChange={(e) => setMessage(e.target.value)}
-                    onKeyDown={handleKeyDown}
-                    placeholder={placeholder || defaultPlaceholder}
-                    className="flex-1 resize-none rounded-lg border border-gray-300 p-3 focus:border-blue-500 focus:outline-none focus:ring-2 focus:ring-blue-200 text-sm"
-                    rows="3"
-                    disabled={isLoading}
-                />
+                <div className="relative flex-1">
+                    {suggestions.length > 0 && (
+                        <ul className="absolute bottom-full left-0 right-0 mb-2 overflow-hidden rounded-lg border border-gray-200 bg-white shadow-lg z-10">
+                            {suggestions.map((suggestion, index) => (
+                                <li key={`${suggestion.kind}-${suggestion.text}`}>
+                                    <button
+                                        type="button"
+                                        // Keep the textarea focused while clicking
+                                        onMouseDown={(e) => e.preventDefault()}
+                                        onClick={() => pickSuggestion(suggestion)}
+                                        className={`w-full px-3 py-2 text-left text-sm ${
+                                            index === activeIndex ? 'bg-blue-50 text-blue-700' : 'text-gray-700 hover:bg-gray-50'
+                                        }`}
+                                    >
+                                        {suggestion.text}
+                                    </button>
+                                </li>
+                            ))}
+                        </ul>
+                    )}
+                    <textarea
+                        value={message}
+                        onChange={(e) => setMessage(e.target.value)}
+                        onKeyDown={handleKeyDown}
+                        onBlur={() => setSuggestions([])}
+                        placeholder={placeholder || defaultPlaceholder}
+                        className="w-full resize-none rounded-lg border border-gray-300 p-3 focus:border-blue-500 focus:outline-none focus:ring-2 focus:ring-blue-200 text-sm"
+                        rows="3"
+                        disabled={isLoading}
+                    />
+                </div>
                 <button
                     type="submit"
                     disabled={!message.trim() || isLoading}